@@ -30,3 +30,10 @@ void O3_CPU::last_branch_result(uint64_t ip, uint8_t taken)
     else if ((taken == 0) && (bimodal_table[cpu][hash] > 0))
         bimodal_table[cpu][hash]--;
 }
+
+void O3_CPU::checkpoint_branch_predictor(FILE *f, bool save)
+{
+    size_t n = save ? fwrite(bimodal_table[cpu], sizeof(bimodal_table[cpu]), 1, f)
+                    : fread(bimodal_table[cpu], sizeof(bimodal_table[cpu]), 1, f);
+    assert(n == 1);
+}
@@ -239,6 +239,7 @@ class O3_CPU {
     uint8_t predict_branch(uint64_t ip);
     void    initialize_branch_predictor(),
             last_branch_result(uint64_t ip, uint8_t taken); 
+    void    checkpoint_branch_predictor(FILE *f, bool save);
 
      void l1i_prefetcher_initialize();
      void l1i_prefetcher_branch_operate(uint64_t ip, uint8_t branch_type, uint64_t branch_target);
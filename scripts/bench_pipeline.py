@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+bench_pipeline.py
+
+End-to-end benchmark of the results pipeline on synthetic logs (synth_logs.py)
+at several scales, e.g. 1k, 10k and 100k runs. For each scale it times every
+stage and records its peak memory:
+
+    parse      parse_all() over every log, no parse cache, on --jobs workers
+    aggregate  results_frame(), the Q1/Q2/Q3 per-trace pivots and loops of
+               parse_and_plot_all_questions.py (question_jobs), the geomean
+               summaries and the Parquet store write
+    render     render_all() of the first --render-limit question plots
+    plots      generate_plots.py over the parsed CSV (--stages ...,plots)
+    multicore  multicore.py's per-CPU parse of every log and the weighted/
+               harmonic speedup and max slowdown of every mix (--stages
+               ...,multicore); synthetic mixes reuse single-core traces, so
+               every core has a single-core baseline
+
+Each stage runs in a fresh process, so its peak RSS (ru_maxrss) is its own;
+worker_rss_mb is the largest worker process of the stage. Stages hand their
+output to the next through files in --work-dir, and that loading is not
+timed. Synthetic logs are generated once per scale and reused while the
+generator settings are unchanged.
+
+--save-csv keeps the results. --against compares them with an earlier CSV and
+flags stages that got slower, or used more memory, by more than --threshold;
+--fail turns flags into exit status 1, to catch tooling regressions.
+
+Scaling on one core (synthetic runs with the default --cores 1,2,4 and
+--heartbeats 0:50; render times a sample of 200 plots):
+
+    runs     logs      parse               aggregate           render
+    200      5.6 MB
+    1k       51 MB     2.1 s,   160 MB     0.6 s,   200 MB     ~8 plots/s, 145 MB
+    10k      560 MB    27 s,    400 MB     3.4 s,   510 MB     ~6 plots/s, 140 MB
+    100k     5.6 GB    364 s,   2.8 GB     46 s,    3.1 GB     ~7 plots/s, 240 MB
+
+Log volume per run is not constant. A mix only exists once its trace has
+single-core runs in enough folders, so at 200 runs there are no 4-core mixes
+and a run averages 28 KB; from 1k runs on, 2- and 4-core mixes make up about
+60% of the runs and the average is 51-56 KB.
+
+The multicore stage takes 6 s and 510 MB at 1k runs (600 mixes) and 53 s and
+3.7 GB at 10k (6600 mixes): its long (run, cpu, metric) table grows by some
+370 KB per run, so it is not a default stage and 100k runs need ~35 GB.
+
+Parsing ran at 480 logs/s per worker at 1k runs, 370/s at 10k and 275/s at
+100k; the larger scales shared their core with other work, so treat the
+drop as an upper bound on the slowdown. Memory grows by about
+26 KB per run because parse_all() keeps every record (some 400 columns) until
+the frame is built, so 100k runs need roughly 3 GB. Rendering is the real
+limit: 100k runs give about 27k traces and 150k Q1/Q2/Q3 plots, which is
+hours on one core; use --jobs, or the summary layout.
+
+Usage:
+    python3 scripts/bench_pipeline.py --scales 1000,10000 --save-csv bench.csv
+    python3 scripts/bench_pipeline.py --scales 1000 --against bench.csv --threshold 0.2 --fail
+    python3 scripts/bench_pipeline.py --scales 100000 --cores 1,2,4 --heartbeats 0:200 --jobs 0
+    python3 scripts/bench_pipeline.py --scales 1000 --stages parse,multicore
+"""
+import os, io, sys, json, time, pickle, shutil, argparse, resource, subprocess, contextlib
+import multiprocessing as mp
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+STAGES = ('parse', 'aggregate', 'render', 'plots', 'multicore')
+
+def _rss():
+    """(peak RSS of this process, of its largest finished child) in MB."""
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024)
+
+def stage_parse(work, jobs):
+    import parse_and_plot_all_questions as papq
+    logs = papq.collect_logs(os.path.join(work, 'output'))
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows = papq.parse_all(logs, jobs)
+    elapsed = time.perf_counter() - t0
+    with open(os.path.join(work, 'rows.pkl'), 'wb') as f:
+        pickle.dump(rows, f)
+    return elapsed, len(rows), 'logs'
+
+def stage_aggregate(work, jobs):
+    import parse_and_plot_all_questions as papq
+    from results_store import write_store
+    from speedup import summarize
+    with open(os.path.join(work, 'rows.pkl'), 'rb') as f:
+        rows = pickle.load(f)
+    t0 = time.perf_counter()
+    df = papq.results_frame(rows)
+    with open(os.devnull, 'w') as null, contextlib.redirect_stdout(null):
+        plot_jobs, ipc = papq.question_jobs(df)
+        for baseline in ('baseline_noninc', 'baseline_exclusive'):
+            if baseline in ipc:
+                summarize(df, baseline)
+    write_store(df, os.path.join(work, 'outputs_parsed_all.parquet'))
+    elapsed = time.perf_counter() - t0
+    df.to_csv(os.path.join(work, 'outputs_parsed_all.csv'), index=False)
+    with open(os.path.join(work, 'plot_jobs.pkl'), 'wb') as f:
+        pickle.dump(plot_jobs, f)
+    return elapsed, len(ipc.index), 'traces'
+
+def stage_render(work, jobs, render_limit=200):
+    from render import render_all
+    with open(os.path.join(work, 'plot_jobs.pkl'), 'rb') as f:
+        plot_jobs = pickle.load(f)[:render_limit]
+    t0 = time.perf_counter()
+    render_all(plot_jobs, os.path.join(work, 'plots'), workers=jobs, force=True, verbose=False)
+    return time.perf_counter() - t0, len(plot_jobs), 'plots'
+
+def stage_plots(work, jobs):
+    plots = os.path.join(work, 'plots_script')
+    os.makedirs(plots, exist_ok=True)
+    csv = os.path.join(plots, 'outputs_parsed_all.csv')
+    if not os.path.exists(csv):
+        os.symlink(os.path.join(work, 'outputs_parsed_all.csv'), csv)
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(SCRIPTS, 'generate_plots.py'), '--jobs', str(jobs), '--force'],
+                   cwd=plots, check=True, stdout=subprocess.DEVNULL)
+    elapsed = time.perf_counter() - t0
+    return elapsed, len([f for f in os.listdir(os.path.join(plots, 'plots')) if f.endswith('.png')]), 'plots'
+
+def stage_multicore(work, jobs):
+    import multicore
+    from parse_and_plot_all_questions import infer_variant
+    t0 = time.perf_counter()
+    cores = multicore.per_cpu(multicore.collect(os.path.join(work, 'output'), jobs))
+    cores['variant'] = cores['file'].map(infer_variant)
+    metrics, _ = multicore.mp_metrics(cores)
+    elapsed = time.perf_counter() - t0
+    metrics.to_csv(os.path.join(work, 'mp_metrics.csv'), index=False)
+    return elapsed, int(metrics['weighted_speedup'].notna().sum()), 'mixes'
+
+def _run_stage(stage, work, jobs, kwargs):
+    # runs in a fresh child process so ru_maxrss reflects this stage only
+    elapsed, items, unit = globals()['stage_' + stage](work, jobs, **kwargs)
+    return elapsed, items, unit, *_rss()
+
+def dataset(work_dir, runs, gen):
+    """The synthetic output/ tree for `runs` logs, generated unless an identical one exists."""
+    from synth_logs import generate, GENERATOR_VERSION
+    work = os.path.join(work_dir, f"runs_{runs}")
+    stamp = os.path.join(work, 'generated.json')
+    settings = dict(gen, runs=runs, version=GENERATOR_VERSION)
+    if os.path.exists(stamp):
+        with open(stamp) as f:
+            if json.load(f) == settings:
+                return work, None
+    shutil.rmtree(work, ignore_errors=True)
+    t0 = time.perf_counter()
+    generate(os.path.join(work, 'output'), runs, **gen)
+    elapsed = time.perf_counter() - t0
+    with open(stamp, 'w') as f:
+        json.dump(settings, f)
+    return work, elapsed
+
+def main(scales, stages, work_dir, jobs, render_limit, gen):
+    ctx = mp.get_context('spawn')
+    rows = []
+    for runs in scales:
+        work, gen_sec = dataset(work_dir, runs, gen)
+        size_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(os.path.join(work, 'output'))
+                      for f in fs) / 2**20
+        print(f"{runs} runs: {size_mb:.0f} MB of logs" + (f", generated in {gen_sec:.1f} s" if gen_sec else ''))
+        for stage in stages:
+            kwargs = {'render_limit': render_limit} if stage == 'render' else {}
+            with ctx.Pool(1, maxtasksperchild=1) as pool:
+                elapsed, items, unit, rss, worker_rss = pool.apply(_run_stage, (stage, work, jobs, kwargs))
+            rows.append({'runs': runs, 'stage': stage, 'seconds': elapsed, 'items': items, 'unit': unit,
+                         'per_second': items / elapsed if elapsed > 0 else float('nan'),
+                         'peak_rss_mb': rss, 'worker_rss_mb': worker_rss, 'log_mb': size_mb, 'jobs': jobs})
+            print(f"  {stage:<9} {elapsed:9.2f} s  {items:>7} {unit:<6} {items / max(elapsed, 1e-9):10.1f}/s  "
+                  f"peak RSS {rss:7.1f} MB  worker RSS {worker_rss:7.1f} MB")
+    return pd.DataFrame(rows)
+
+def compare(df, old, threshold):
+    """Join to an earlier benchmark by (runs, stage) and flag slower or larger stages."""
+    m = df.merge(old[['runs', 'stage', 'seconds', 'peak_rss_mb']], on=['runs', 'stage'], suffixes=('', '_before'))
+    m['time_ratio'] = m['seconds'] / m['seconds_before']
+    m['rss_ratio'] = m['peak_rss_mb'] / m['peak_rss_mb_before']
+    m['regressed'] = (m['time_ratio'] > 1 + threshold) | (m['rss_ratio'] > 1 + threshold)
+    return m
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', default='1000,10000,100000', help='Comma-separated numbers of runs')
+    parser.add_argument('--stages', default='parse,aggregate,render', help=f"Comma-separated stages of {','.join(STAGES)}")
+    parser.add_argument('--work-dir', default='/tmp/bench_pipeline', help='Where synthetic logs and stage outputs go')
+    parser.add_argument('--jobs', type=int, default=1, help='Worker processes for parse and render (0 = one per CPU)')
+    parser.add_argument('--render-limit', type=int, default=200, help='Plots rendered by the render stage')
+    parser.add_argument('--output-dir', default='./output', help='Real logs the synthetic ones are modelled on')
+    parser.add_argument('--cores', default='1,2,4', help='Core counts of the synthetic runs')
+    parser.add_argument('--heartbeats', default='0:50', help='MIN:MAX heartbeats per core')
+    parser.add_argument('--seed', type=int, default=0, help='Generator seed')
+    parser.add_argument('--save-csv', default=None, help='Write the results to this CSV')
+    parser.add_argument('--against', default=None, help='Earlier results CSV to compare with')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Flag stages slower or larger by more than this')
+    parser.add_argument('--fail', action='store_true', help='Exit with status 1 if a stage regressed')
+    args = parser.parse_args()
+    unknown = set(args.stages.split(',')) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages {', '.join(sorted(unknown))}")
+    lo, _, hi = args.heartbeats.partition(':')
+    gen = {'templates_dir': os.path.abspath(args.output_dir), 'cores': [int(c) for c in args.cores.split(',')],
+           'heartbeats': [int(lo), int(hi or lo)], 'seed': args.seed}
+    df = main([int(s) for s in args.scales.split(',')], args.stages.split(','), args.work_dir,
+              args.jobs or os.cpu_count(), args.render_limit, gen)
+    if args.save_csv:
+        df.to_csv(args.save_csv, index=False)
+        print(f"Saved benchmark results to {args.save_csv}")
+    if args.against:
+        cmp = compare(df, pd.read_csv(args.against), args.threshold)
+        print(cmp[['runs', 'stage', 'seconds', 'seconds_before', 'time_ratio', 'rss_ratio', 'regressed']]
+              .to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+        if args.fail and cmp['regressed'].any():
+            sys.exit(1)
@@ -0,0 +1,424 @@
+"""
+champsim_stats.py
+
+Schema-driven, single-pass extractor for ChampSim logs.
+
+Every line is dispatched on its first token to the LINE_RULES that can match
+it, and each rule names its columns from templates, so every cache level gets
+the same namespaced column set:
+
+    ipc, instructions, cycles                 ROI `CPU n cumulative IPC` line
+    trace                                     `CPU n runs <trace>` header line
+    <lvl>_<type>_{access,hit,miss,mpki}       lvl = itlb/dtlb/stlb/l1i/l1d/l2c/llc/btb/pscl2-5
+                                              type = total/load/rfo/prefetch/writeback/translation
+                                              (BTB rows use the branch type, e.g. btb_branch_return_*)
+    <lvl>_pf_{requested,issued,useful,useless,useful_load,issued_lower,accuracy,timely,late,dropped}
+    <lvl>_{rq,wq,pq}_{access,forward,merged,to_cache}
+    <lvl>_avg_miss_latency, l2c_data_load_mpki, l2c_instruction_prefetch_mpki, ...
+    branch_{accuracy,mpki,rob_occupancy}, branch_<type>_count
+    pruned_{at_instructions,speedup,speedup_upper}  `Pruned CPU n ...` line sweep.py appends to pruned runs
+    warmup_{instructions,cycles,seconds,kips}  `Warmup complete CPU n` line
+    roi_{seconds,kips}, sim_seconds           from the `Finished CPU n` line: ROI instructions per
+                                              wall-second since warmup completed (KIPS), total wall time
+    dram_{rq,wq}_row_buffer_{hit,miss}, dram_wq_full, dram_dbus_congested (summed over channels)
+    <namespace>_<field>                       prefetcher summary blocks, see below
+
+Prefetcher summary blocks (`=== Title ===` ... `=====`) are looked up in
+PREFETCHER_BLOCKS by title. New prefetchers are added with
+register_prefetcher_block() instead of new regexes; a block that is not
+registered still comes through, with its title and labels slugified.
+
+Multi-core logs are split per CPU: a stats line belongs to the CPU it names,
+or else to the CPU of the last `CPU n ...` line, and the k-th prefetcher block
+with a given title belongs to CPU k. DRAM stats are shared by all CPUs. Only
+Region of Interest values are kept (the `Total Simulation Statistics` section
+that multi-core builds print first is skipped). Within a CPU the first value
+seen for a column wins.
+
+Logs may be compressed (.gz, .xz, .zst); open_log() streams them through the
+decompressor without writing anything to disk. Plain logs of MMAP_MIN_BYTES or
+more are mmapped instead of read: only the header and the final stats section
+(found by searching backward from the end for `ChampSim completed all CPUs`)
+are scanned, plus each CPU's `Warmup complete` and `Finished` lines, so parse time does not grow with the number of heartbeat lines.
+
+parse_file() returns one flat record per log: CPU 0 plus the shared stats,
+with the legacy columns used by the plotting scripts (RECORD_FIELDS) derived
+from it. parse_file_cpus() returns every CPU, and cpu_frame() turns those into
+a long (run, cpu, metric, value) table.
+"""
+import io, os, re, gzip, lzma, mmap, shutil, subprocess
+from contextlib import contextmanager
+import pandas as pd
+
+# bump whenever parse_file's output changes so cached records are re-parsed
+PARSER_VERSION = 5
+
+CACHE_LEVELS = ('ITLB', 'DTLB', 'STLB', 'L1I', 'L1D', 'L2C', 'LLC', 'BTB',
+                'PSCL5', 'PSCL4', 'PSCL3', 'PSCL2')
+ACCESS_TYPES = {'TOTAL': 'total', 'LOAD': 'load', 'RFO': 'rfo', 'PREFETCH': 'prefetch',
+                'WRITEBACK': 'writeback', 'LOAD TRANSLATION': 'translation'}
+BRANCH_TYPES = ('NOT_BRANCH', 'BRANCH_DIRECT_JUMP', 'BRANCH_INDIRECT', 'BRANCH_CONDITIONAL',
+                'BRANCH_DIRECT_CALL', 'BRANCH_INDIRECT_CALL', 'BRANCH_RETURN', 'BRANCH_OTHER')
+
+# legacy column -> full-record column it is taken from
+LEGACY_ALIASES = {
+    'ipc': 'ipc',
+    'l1d_mpki': 'l1d_total_mpki',
+    'l2_mpki': 'l2c_total_mpki',
+    'llc_mpki': 'llc_total_mpki',
+    'prefetch_issued': 'offset_issued',
+    'prefetch_useful': 'offset_useful',
+}
+RECORD_FIELDS = list(LEGACY_ALIASES)
+
+def num(s):
+    """'123' -> 123, '0.52' -> 0.52, '-nan' -> nan; None for anything else."""
+    try:
+        return int(s)
+    except ValueError:
+        pass
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+re_slug = re.compile(r'[^a-z0-9]+')
+
+def slug(s):
+    return re_slug.sub('_', s.lower()).strip('_')
+
+# --- line rules: (first tokens, regex, {column template: group}, aggregation) ---
+# Templates are formatted with the lowercased/slugified named groups `lvl`, `typ`
+# and `kind`; aggregation is 'first' (keep first value), 'text' (keep first value
+# as a string) or 'sum' (shared by all CPUs, summed).
+_LVL = '(?P<lvl>' + '|'.join(CACHE_LEVELS) + ')'
+_TYP = '(?P<typ>' + '|'.join(sorted(ACCESS_TYPES, key=len, reverse=True)) + r'|BRANCH_\w+)'
+LINE_RULES = [
+    (('CPU',), re.compile(r'^CPU (?P<cpu>\d+) runs (?P<trace>\S+)'), {'trace': 'trace'}, 'text'),
+    (('CPU',), re.compile(r'^CPU (?P<cpu>\d+) cumulative IPC: (?P<ipc>\S+) '
+                          r'instructions: (?P<instructions>\d+) cycles: (?P<cycles>\d+)'),
+     {'ipc': 'ipc', 'instructions': 'instructions', 'cycles': 'cycles'}, 'first'),
+    (('CPU',), re.compile(r'^CPU (?P<cpu>\d+) Branch Prediction Accuracy: (?P<acc>\S+)% '
+                          r'MPKI: (?P<mpki>\S+) Average ROB Occupancy at Mispredict: (?P<rob>\S+)'),
+     {'branch_accuracy': 'acc', 'branch_mpki': 'mpki', 'branch_rob_occupancy': 'rob'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + ' ' + _TYP + r'\s+ACCESS:\s*(?P<access>\d+)\s+HIT:\s*(?P<hit>\d+)'
+                              r'\s+MISS:\s*(?P<miss>\d+)(?:.*MPKI:\s*(?P<mpki>\S+))?'),
+     {'{lvl}_{typ}_access': 'access', '{lvl}_{typ}_hit': 'hit',
+      '{lvl}_{typ}_miss': 'miss', '{lvl}_{typ}_mpki': 'mpki'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' PREFETCH\s+REQUESTED:\s*(?P<req>\d+)\s+ISSUED:\s*(?P<iss>\d+)'
+                              r'\s+USEFUL:\s*(?P<use>\d+)\s+USELESS:\s*(?P<useless>\d+)'),
+     {'{lvl}_pf_requested': 'req', '{lvl}_pf_issued': 'iss',
+      '{lvl}_pf_useful': 'use', '{lvl}_pf_useless': 'useless'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' USEFUL LOAD PREFETCHES:\s*(?P<use>\d+) PREFETCH ISSUED TO '
+                              r'LOWER LEVEL:\s*(?P<lower>\d+)\s+ACCURACY:\s*(?P<acc>\S+)'),
+     {'{lvl}_pf_useful_load': 'use', '{lvl}_pf_issued_lower': 'lower', '{lvl}_pf_accuracy': 'acc'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' TIMELY PREFETCHES:\s*(?P<timely>\d+) LATE PREFETCHES:\s*'
+                              r'(?P<late>\d+) DROPPED PREFETCHES:\s*(?P<dropped>\d+)'),
+     {'{lvl}_pf_timely': 'timely', '{lvl}_pf_late': 'late', '{lvl}_pf_dropped': 'dropped'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' (?P<kind>RQ|WQ|PQ)\s+ACCESS:\s*(?P<access>\d+)\s+FORWARD:\s*'
+                              r'(?P<fwd>\d+)\s+MERGED:\s*(?P<merged>\d+)\s+TO_CACHE:\s*(?P<to_cache>\d+)'),
+     {'{lvl}_{kind}_access': 'access', '{lvl}_{kind}_forward': 'fwd',
+      '{lvl}_{kind}_merged': 'merged', '{lvl}_{kind}_to_cache': 'to_cache'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' AVERAGE MISS LATENCY:\s*(?P<lat>\S+) cycles'),
+     {'{lvl}_avg_miss_latency': 'lat'}, 'first'),
+    (CACHE_LEVELS, re.compile('^' + _LVL + r' (?P<kind>DATA|INSTRUCTION) (?P<typ>LOAD|PREFETCH) MPKI:\s*(?P<mpki>\S+)'),
+     {'{lvl}_{kind}_{typ}_mpki': 'mpki'}, 'first'),
+    (tuple(t + ':' for t in BRANCH_TYPES), re.compile(r'^(?P<typ>NOT_BRANCH|BRANCH_\w+): (?P<count>\d+) '),
+     {'branch_{typ}_count': 'count'}, 'first'),
+    (('',), re.compile(r'^\s+(?P<kind>RQ|WQ) ROW_BUFFER_HIT:\s*(?P<hit>\d+)\s+ROW_BUFFER_MISS:\s*(?P<miss>\d+)'
+                       r'(?:\s+FULL:\s*(?P<full>\d+))?'),
+     {'dram_{kind}_row_buffer_hit': 'hit', 'dram_{kind}_row_buffer_miss': 'miss', 'dram_{kind}_full': 'full'}, 'sum'),
+    (('',), re.compile(r'^\s+DBUS_CONGESTED:\s*(?P<n>\d+)'), {'dram_dbus_congested': 'n'}, 'sum'),
+    (('Major',), re.compile(r'^Major fault: (?P<major>\d+) Minor fault: (?P<minor>\d+)'),
+     {'major_faults': 'major', 'minor_faults': 'minor'}, 'first'),
+    (('Average',), re.compile(r'^Average branch resolution latency \(in cycles\): (?P<lat>\S+)'),
+     {'branch_resolution_latency': 'lat'}, 'first'),
+    (('Pruned',), re.compile(r'^Pruned CPU (?P<cpu>\d+) at instructions: (?P<at>\d+) speedup: (?P<sp>\S+) '
+                             r'upper bound: (?P<ub>\S+)'),
+     {'pruned_at_instructions': 'at', 'pruned_speedup': 'sp', 'pruned_speedup_upper': 'ub'}, 'first'),
+    (('Warmup',), re.compile(r'^Warmup complete CPU (?P<cpu>\d+) instructions: (?P<instr>\d+) cycles: (?P<cyc>\d+) '
+                             r'\(Simulation time: (?P<h>\d+) hr (?P<m>\d+) min (?P<s>\d+) sec\)'),
+     {'warmup_instructions': 'instr', 'warmup_cycles': 'cyc',
+      'warmup_time_hr': 'h', 'warmup_time_min': 'm', 'warmup_time_sec': 's'}, 'first'),
+    (('Finished',), re.compile(r'^Finished CPU (?P<cpu>\d+) instructions: (?P<instr>\d+) cycles: \d+ .*'
+                               r'\(Simulation time: (?P<h>\d+) hr (?P<m>\d+) min (?P<s>\d+) sec\)'),
+     {'finished_time_hr': 'h', 'finished_time_min': 'm', 'finished_time_sec': 's'}, 'first'),
+]
+
+_DISPATCH = {}
+for _rule in LINE_RULES:
+    for _tok in _rule[0]:
+        _DISPATCH.setdefault(_tok, []).append(_rule)
+
+# --- prefetcher summary blocks ---
+PREFETCHER_BLOCKS = {}
+re_block_header = re.compile(r'^=== (?P<title>.+?) ===\s*$')
+
+def register_prefetcher_block(title, namespace, fields):
+    """Register a `=== title ===` block; `fields` maps each printed label to a column suffix.
+
+    Columns are named <namespace>_<suffix>. Suffixes `issued` and `useful` of
+    the `offset` namespace feed the legacy prefetch_issued/prefetch_useful.
+    """
+    PREFETCHER_BLOCKS[title] = (namespace, dict(fields))
+
+register_prefetcher_block('L2 Offset Prefetcher Stats', 'offset', {
+    'Prefetches issued': 'issued',
+    'Prefetches useful': 'useful',
+    'Accuracy': 'accuracy',
+    'Table size': 'table_size',
+    'CONF_THRESH': 'conf_thresh',
+})
+register_prefetcher_block('L2 Offset Prefetcher (exclusive-aware)', 'offset', {
+    'Prefetches issued': 'issued',
+    'Useful (timely)': 'useful_timely',
+    'Useful (late)': 'useful_late',
+    'Useful (total)': 'useful',
+    'Timely accuracy': 'timely_accuracy',
+    'Table size': 'table_size',
+    'TOPK': 'topk',
+    'CONF_THRESH': 'conf_thresh',
+})
+
+# --- log access ---
+COMPRESSED_SUFFIXES = ('.gz', '.xz', '.zst')
+MMAP_MIN_BYTES = 4 << 20
+HEADER_MAX_BYTES = 64 << 10
+FINAL_STATS_MARKER = b'ChampSim completed all CPUs'
+re_runs = re.compile(r'^CPU \d+ runs ', re.M)
+
+@contextmanager
+def open_log(path):
+    """Text stream over a log, decompressing .gz/.xz/.zst on the fly."""
+    if path.endswith('.gz'):
+        f = gzip.open(path, 'rt', errors='ignore')
+    elif path.endswith('.xz'):
+        f = lzma.open(path, 'rt', errors='ignore')
+    elif path.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        if zstandard is not None:
+            raw = open(path, 'rb')
+            f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), errors='ignore')
+        elif shutil.which('zstd'):
+            proc = subprocess.Popen(['zstd', '-dc', path], stdout=subprocess.PIPE)
+            try:
+                yield io.TextIOWrapper(proc.stdout, errors='ignore')
+            finally:
+                proc.stdout.close()
+                proc.kill()
+                proc.wait()
+            return
+        else:
+            raise RuntimeError("reading .zst logs needs the zstandard module (pip install zstandard) or the zstd tool")
+    else:
+        f = open(path, 'r', errors='ignore')
+    with f:
+        yield f
+
+@contextmanager
+def _stats_lines(path):
+    """Lines of a log that can hold stats: the whole stream, or for large plain
+    logs the mmapped header plus everything from the final stats marker on."""
+    if path.endswith(COMPRESSED_SUFFIXES) or os.path.getsize(path) < MMAP_MIN_BYTES:
+        with open_log(path) as f:
+            yield f
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        tail = mm.rfind(FINAL_STATS_MARKER)
+        if tail < 0:   # unfinished run: no final section to seek to
+            yield io.TextIOWrapper(f, errors='ignore')
+            return
+        head_end = min(tail, HEADER_MAX_BYTES)
+        for marker in (b'\nHeartbeat ', b'\nWarmup complete'):
+            i = mm.find(marker, 0, head_end)
+            if i >= 0:
+                head_end = i + 1
+        head = mm[:head_end].decode(errors='ignore')
+        head = head[:head.rfind('\n') + 1]
+        # one `Warmup complete` and one `Finished` line per CPU, found by searching
+        # forward from the header and backward from the final stats
+        n_cpus = max(1, len(re_runs.findall(head)))
+        phase_lines, pos = [], len(head)
+        for _ in range(n_cpus):
+            i = mm.find(b'\nWarmup complete CPU', max(pos - 1, 0), tail)
+            if i < 0:
+                break
+            pos = mm.find(b'\n', i + 1) + 1
+            phase_lines.append(mm[i + 1:pos])
+        pos = tail
+        for _ in range(n_cpus):
+            i = mm.rfind(b'\nFinished CPU', 0, pos)
+            if i < 0:
+                break
+            phase_lines.append(mm[i + 1:mm.find(b'\n', i + 1) + 1])
+            pos = i
+        yield io.StringIO(head + b''.join(phase_lines).decode(errors='ignore') + mm[tail:].decode(errors='ignore'))
+
+_COLUMN_CACHE = {}
+
+def _columns(rule, groups):
+    """[(column name, group)] for a rule match, memoised per (rule, lvl, typ, kind)."""
+    key = (id(rule), groups.get('lvl'), groups.get('typ'), groups.get('kind'))
+    cols = _COLUMN_CACHE.get(key)
+    if cols is None:
+        names = {k: slug(groups[k]) for k in ('lvl', 'typ', 'kind') if groups.get(k)}
+        if 'typ' in names:
+            names['typ'] = ACCESS_TYPES.get(groups['typ'], names['typ'])
+        cols = _COLUMN_CACHE[key] = [(t.format(**names), g) for t, g in rule[2].items()]
+    return cols
+
+def _apply(rule, m, res, found):
+    groups = m.groupdict()
+    for col, group in _columns(rule, groups):
+        raw = groups.get(group)
+        if raw is None:
+            continue
+        val = raw if rule[3] == 'text' else num(raw)
+        if col in res:
+            if rule[3] == 'sum' and val is not None and res[col] is not None:
+                res[col] += val
+            continue
+        res[col] = val
+        found.append(col)
+
+def _throughput(stats):
+    """Replace the raw `Simulation time` parts of a CPU's stats with wall seconds and KIPS.
+
+    The stamps have one-second resolution, so KIPS of phases shorter than a
+    few seconds are coarse, and None when the phase took under a second.
+    """
+    secs = {}
+    for phase in ('warmup', 'finished'):
+        parts = [stats.pop(f"{phase}_time_{u}", None) for u in ('hr', 'min', 'sec')]
+        if None not in parts:
+            secs[phase] = parts[0] * 3600 + parts[1] * 60 + parts[2]
+    if 'warmup' in secs:
+        stats['warmup_seconds'] = secs['warmup']
+        instr = stats.get('warmup_instructions')
+        stats['warmup_kips'] = instr / secs['warmup'] / 1000 if instr and secs['warmup'] > 0 else None
+    if 'finished' in secs:
+        stats['sim_seconds'] = secs['finished']
+        roi = secs['finished'] - secs.get('warmup', 0)
+        stats['roi_seconds'] = roi
+        instr = stats.get('instructions')
+        stats['roi_kips'] = instr / roi / 1000 if instr and roi > 0 else None
+
+def _scan(path, wanted=None):
+    """Stream a ChampSim log once; returns ({cpu: stats}, shared stats).
+
+    If `wanted` (a set of full column names) is given, stops as soon as CPU 0
+    and the shared stats have all of them.
+    """
+    cpus = {0: {}}
+    shared = {}
+    res = cpus[0]
+    block = None            # (namespace, fields, target dict or None while skipping)
+    block_count = {}
+    skipping = False        # inside the non-ROI `Total Simulation Statistics` section
+    with _stats_lines(path) as f:
+        for line in f:
+            found = []
+            if block is not None:
+                if line.startswith('==='):
+                    block = None
+                    continue
+                label, sep, value = line.partition(':')
+                if sep and block[2] is not None:
+                    namespace, block_fields, target = block
+                    label = label.strip()
+                    col = f"{namespace}_{block_fields.get(label) or slug(label)}"
+                    if col not in target:
+                        target[col] = num(value.strip())
+                        if target is cpus[0]: found.append(col)
+            elif line.startswith('=== '):
+                m = re_block_header.match(line)
+                if m:
+                    title = m.group('title')
+                    namespace, block_fields = PREFETCHER_BLOCKS.get(title, (slug(title), {}))
+                    target = None
+                    if not skipping:
+                        k = block_count[title] = block_count.get(title, -1) + 1
+                        target = cpus.setdefault(k, {})
+                    block = (namespace, block_fields, target)
+                continue
+            else:
+                sp = line.find(' ')
+                tok = line[:sp] if sp >= 0 else line.rstrip('\n')
+                if tok == 'Total' and line.startswith('Total Simulation Statistics'):
+                    skipping = True
+                    continue
+                if tok == 'Region' and line.startswith('Region of Interest Statistics'):
+                    skipping = False
+                    continue
+                rules = _DISPATCH.get(tok)
+                if not rules or skipping:
+                    continue
+                for rule in rules:
+                    m = rule[1].match(line)
+                    if m:
+                        if rule[3] == 'sum':
+                            _apply(rule, m, shared, found)
+                        else:
+                            if 'cpu' in rule[1].groupindex:
+                                res = cpus.setdefault(int(m.group('cpu')), {})
+                            _apply(rule, m, res, found if res is cpus[0] else [])
+                        break
+            if wanted is not None and found:
+                wanted.difference_update(found)
+                if not wanted:
+                    break
+    for stats in cpus.values():
+        _throughput(stats)
+    return cpus, shared
+
+def parse_file(path, fields=None):
+    """Stream a ChampSim log once and return its stats record (CPU 0 + shared stats).
+
+    Reads line by line in bounded memory. If `fields` is given (full or legacy
+    column names), stops as soon as all of them have been seen.
+    """
+    wanted = None if fields is None else {LEGACY_ALIASES.get(f, f) for f in fields}
+    cpus, shared = _scan(path, wanted)
+    res = dict(cpus[0])
+    res.update(shared)
+    rec = {'file': os.path.basename(path)}
+    rec.update({legacy: res.get(col) for legacy, col in LEGACY_ALIASES.items()})
+    rec.update((k, v) for k, v in res.items() if k not in rec)
+    return rec
+
+def parse_file_cpus(path):
+    """Stream a ChampSim log once and return one stats dict per CPU ({'cpu': n, ...}), in CPU order."""
+    cpus, _ = _scan(path)
+    return [dict(stats, cpu=cpu) for cpu, stats in sorted(cpus.items()) if stats]
+
+def cpu_frame(rows, keys=('trace_folder', 'file')):
+    """Long (run keys..., cpu, trace, metric, value) table from per-CPU dicts carrying the run keys."""
+    id_cols = [*keys, 'cpu', 'trace']
+    wide = pd.DataFrame(rows)
+    for col in id_cols:
+        if col not in wide:
+            wide[col] = None
+    long = wide.melt(id_vars=id_cols, var_name='metric', value_name='value').dropna(subset=['value'])
+    long['value'] = pd.to_numeric(long['value'], errors='coerce')
+    long['cpu'] = long['cpu'].astype('int64')
+    return long.sort_values([*keys, 'cpu', 'metric'], kind='stable').reset_index(drop=True)
+
+def records_to_frame(records, leading=()):
+    """Build a typed DataFrame: integer-valued columns become nullable Int64, the rest float64/object.
+
+    `leading` columns (those present) are placed first, the others keep first-seen order.
+    """
+    df = pd.DataFrame(records)
+    int_cols = set(df.columns)
+    for rec in records:
+        for k, v in rec.items():
+            if k in int_cols and v is not None and (isinstance(v, bool) or not isinstance(v, int)):
+                int_cols.discard(k)
+    for col in df.columns:
+        if col in int_cols and df[col].notna().any():
+            df[col] = df[col].astype('Int64')
+    lead = [c for c in leading if c in df.columns]
+    return df[lead + [c for c in df.columns if c not in lead]]
@@ -1,86 +1,85 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import os
+import os, sys, argparse
 
-# Load parsed data
-df = pd.read_csv("outputs_parsed_all.csv")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from results_store import load_results
+from speedup import pivot, normalize
+from render import job, render_all, summary_jobs
 
-# Create output dir for plots
-os.makedirs("plots", exist_ok=True)
+parser = argparse.ArgumentParser()
+parser.add_argument("--jobs", type=int, default=1, help="Render on N worker processes (0 = one per CPU)")
+parser.add_argument("--force", action="store_true", help="Re-render plots even if their data is unchanged")
+parser.add_argument("--layout", choices=["separate", "summary", "both"], default="separate",
+                    help="One PNG per plot, multi-panel PNGs of up to 16 plots per question, or both")
+args = parser.parse_args()
 
-# Helper function: calculate speedup
-def calc_speedup(ipc, baseline_ipc):
-    return ipc / baseline_ipc
+# Load parsed data (Parquet store if present, else the CSV), only the plotted columns
+df = load_results(columns=["trace_folder", "variant", "ipc", "l2_mpki"])
+ipc = pivot(df, "ipc")
+speedup_noninc = normalize(ipc, "baseline_noninc")    # NaN where a trace has no usable baseline
+speedup_excl = normalize(ipc, "baseline_exclusive")
+by_trace = {trace: sub.set_index("variant") for trace, sub in df.groupby("trace_folder")}
+
+# Plots are collected as render jobs and drawn at the end
+jobs = []
+
+def bar(name, x, y, title, ylabel):
+    jobs.append(job(name, name.split("_")[0], "bar", x=list(x), y=list(y), title=title, ylabel=ylabel))
 
 # ---------------- Q1: Non-inclusive Prefetcher Speedup & MPKI ----------------
-q1_traces = [t for t in df['trace_folder'].unique() if t.startswith("1st_trace")]
+q1_traces = [t for t in by_trace if t.startswith("1st_trace")]
 for trace in q1_traces:
-    sub = df[df['trace_folder'] == trace]
-    base_ipc = sub[sub['variant'] == "baseline_noninc"]['ipc'].values[0]
-    base_mpki = sub[sub['variant'] == "baseline_noninc"]['l2_mpki'].values[0]
+    sub = by_trace[trace]
+    if "baseline_noninc" not in sub.index:
+        continue
+    base_ipc = sub.at["baseline_noninc", "ipc"]
+    base_mpki = sub.at["baseline_noninc", "l2_mpki"]
 
     variants = ["baseline_noninc", "table32", "table64", "table128"]
-    sub = sub[sub['variant'].isin(variants)]
+    sub = sub.loc[[v for v in variants if v in sub.index]]
 
     # Speedup
-    speedups = [calc_speedup(ipc, base_ipc) for ipc in sub['ipc']]
-    plt.bar(sub['variant'], speedups)
-    plt.title(f"Q1 Speedup ({trace})")
-    plt.ylabel("Speedup (IPC / Baseline IPC)")
-    plt.savefig(f"plots/q1_speedup_{trace}.png")
-    plt.close()
+    speedups = speedup_noninc.loc[trace, sub.index]
+    bar(f"q1_speedup_{trace}.png", sub.index, speedups,
+        f"Q1 Speedup ({trace})", "Speedup (IPC / Baseline IPC)")
 
     # MPKI
-    mpkis = sub['l2_mpki']
-    plt.bar(sub['variant'], mpkis)
-    plt.title(f"Q1 L2 MPKI ({trace})")
-    plt.ylabel("L2 MPKI")
-    plt.savefig(f"plots/q1_mpki_{trace}.png")
-    plt.close()
+    bar(f"q1_mpki_{trace}.png", sub.index, sub['l2_mpki'],
+        f"Q1 L2 MPKI ({trace})", "L2 MPKI")
 
 # ---------------- Q2: IPC & MPKI Comparison (Exclusive vs Non-Inclusive) ----------------
-q2_traces = [t for t in df['trace_folder'].unique() if t.startswith("2nd_trace")]
+q2_traces = [t for t in by_trace if t.startswith("2nd_trace")]
 for trace in q2_traces:
-    sub = df[df['trace_folder'] == trace]
+    sub = by_trace[trace]
     variants = ["baseline_noninc", "baseline_exclusive"]
-    sub = sub[sub['variant'].isin(variants)]
+    sub = sub.loc[[v for v in variants if v in sub.index]]
 
     # IPC comparison
-    plt.bar(sub['variant'], sub['ipc'])
-    plt.title(f"Q2 IPC Comparison ({trace})")
-    plt.ylabel("IPC")
-    plt.savefig(f"plots/q2_ipc_cmp_{trace}.png")
-    plt.close()
+    bar(f"q2_ipc_cmp_{trace}.png", sub.index, sub['ipc'],
+        f"Q2 IPC Comparison ({trace})", "IPC")
 
     # MPKI comparison
-    plt.bar(sub['variant'], sub['l2_mpki'])
-    plt.title(f"Q2 L2 MPKI Comparison ({trace})")
-    plt.ylabel("L2 MPKI")
-    plt.savefig(f"plots/q2_mpki_cmp_{trace}.png")
-    plt.close()
+    bar(f"q2_mpki_cmp_{trace}.png", sub.index, sub['l2_mpki'],
+        f"Q2 L2 MPKI Comparison ({trace})", "L2 MPKI")
 
 # ---------------- Q3: Exclusive Prefetcher Speedups ----------------
-q3_traces = [t for t in df['trace_folder'].unique() if t.startswith("3rd_trace")]
+q3_traces = [t for t in by_trace if t.startswith("3rd_trace")]
 for trace in q3_traces:
-    sub = df[df['trace_folder'] == trace]
-    base_noninc = sub[sub['variant'] == "baseline_noninc"]['ipc'].values[0]
-    base_excl = sub[sub['variant'] == "baseline_exclusive"]['ipc'].values[0]
+    sub = by_trace[trace]
+    if not all(v in sub.index for v in ["baseline_noninc", "baseline_exclusive"]):
+        continue
 
     # Non-inclusive baseline speedup
-    sub_pref = sub[sub['variant'].str.startswith("table")]
-    speedups_noninc = [calc_speedup(ipc, base_noninc) for ipc in sub_pref['ipc']]
-    plt.bar(sub_pref['variant'], speedups_noninc)
-    plt.title(f"Q3 Speedup vs Non-Inclusive Baseline ({trace})")
-    plt.ylabel("Speedup")
-    plt.savefig(f"plots/q3_speedup_noninc_baseline_{trace}.png")
-    plt.close()
+    sub_pref = sub[sub.index.str.startswith("exclusive_table")]
+    speedups_noninc = speedup_noninc.loc[trace, sub_pref.index]
+    bar(f"q3_speedup_noninc_baseline_{trace}.png", sub_pref.index, speedups_noninc,
+        f"Q3 Speedup vs Non-Inclusive Baseline ({trace})", "Speedup")
 
     # Exclusive baseline speedup
-    speedups_excl = [calc_speedup(ipc, base_excl) for ipc in sub_pref['ipc']]
-    plt.bar(sub_pref['variant'], speedups_excl)
-    plt.title(f"Q3 Speedup vs Exclusive Baseline ({trace})")
-    plt.ylabel("Speedup")
-    plt.savefig(f"plots/q3_speedup_excl_baseline_{trace}.png")
-    plt.close()
+    speedups_excl = speedup_excl.loc[trace, sub_pref.index]
+    bar(f"q3_speedup_excl_baseline_{trace}.png", sub_pref.index, speedups_excl,
+        f"Q3 Speedup vs Exclusive Baseline ({trace})", "Speedup")
+
+render_jobs = (jobs if args.layout != "summary" else []) + (summary_jobs(jobs) if args.layout != "separate" else [])
+render_all(render_jobs, "plots", workers=args.jobs or os.cpu_count(), force=args.force)
 
 print("✅ All plots generated in 'plots/' folder.")
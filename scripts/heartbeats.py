@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+heartbeats.py
+
+Heartbeat time-series extraction and phase-aware IPC analysis.
+
+Every `Heartbeat CPU n instructions: I cycles: C heartbeat IPC: x cumulative IPC: y
+(Simulation time: H hr M min S sec)` line becomes one sample of a per-run
+series held in NumPy arrays (cpu, instructions, cycles, heartbeat IPC,
+cumulative IPC, wall seconds, roi flag). Instructions and cycles are cumulative
+from the start of the trace, so per-interval deltas come from np.diff.
+
+Phases are found on the baseline run of each trace: a new phase starts at the
+warmup boundary and wherever heartbeat IPC moves by more than --threshold
+(relative, in log space) from the previous interval. Each variant's intervals
+are aligned to the baseline's by instruction count, and per-phase speedup is
+baseline cycles / variant cycles over the same instruction range, alongside
+the simulator wall time each phase cost.
+
+Usage:
+    python3 scripts/heartbeats.py --output-dir ./output --save-series heartbeats.npz --save-csv heartbeat_phases.csv
+    python3 scripts/heartbeats.py --baseline baseline_exclusive --threshold 0.3
+"""
+import os, re, sys, argparse
+from array import array
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parse_and_plot_all_questions import collect_logs, infer_variant
+from manifest import load_manifest
+from champsim_stats import open_log
+
+re_heartbeat = re.compile(
+    r'^Heartbeat CPU (\d+) instructions: (\d+) cycles: (\d+) heartbeat IPC: (\S+) '
+    r'cumulative IPC: (\S+) \(Simulation time: (\d+) hr (\d+) min (\d+) sec\)')
+re_warmup_done = re.compile(r'^Warmup complete CPU (\d+) instructions: (\d+) cycles: (\d+)')
+
+SERIES_FIELDS = ('cpu', 'instructions', 'cycles', 'heartbeat_ipc', 'cumulative_ipc', 'wall_sec', 'roi')
+_TYPECODES = {'cpu': 'l', 'instructions': 'q', 'cycles': 'q', 'heartbeat_ipc': 'd',
+              'cumulative_ipc': 'd', 'wall_sec': 'l', 'roi': 'b'}
+
+def parse_heartbeats(path):
+    """Return {field: np.ndarray} with one element per heartbeat line of `path`."""
+    cols = {k: array(_TYPECODES[k]) for k in SERIES_FIELDS}
+    warmed = set()
+    with open_log(path) as f:
+        for line in f:
+            if line.startswith('Heartbeat'):
+                m = re_heartbeat.match(line)
+                if not m: continue
+                cpu = int(m.group(1))
+                cols['cpu'].append(cpu)
+                cols['instructions'].append(int(m.group(2)))
+                cols['cycles'].append(int(m.group(3)))
+                cols['heartbeat_ipc'].append(float(m.group(4)))
+                cols['cumulative_ipc'].append(float(m.group(5)))
+                cols['wall_sec'].append(int(m.group(6)) * 3600 + int(m.group(7)) * 60 + int(m.group(8)))
+                cols['roi'].append(cpu in warmed)
+            elif line.startswith('Warmup complete'):
+                m = re_warmup_done.match(line)
+                if m: warmed.add(int(m.group(1)))
+    return {k: np.frombuffer(v, dtype=v.typecode) if len(v) else np.array([], dtype=v.typecode)
+            for k, v in cols.items()}
+
+def cpu_series(series, cpu=0):
+    """Restrict a series to one CPU and add per-interval deltas."""
+    sel = series['cpu'] == cpu
+    s = {k: v[sel] for k, v in series.items()}
+    s['d_instructions'] = np.diff(s['instructions'], prepend=0)
+    s['d_cycles'] = np.diff(s['cycles'], prepend=0)
+    s['d_wall_sec'] = np.diff(s['wall_sec'], prepend=0)
+    return s
+
+def detect_phases(heartbeat_ipc, roi, threshold=0.25):
+    """Phase id per interval: new phase at the warmup boundary or on a >threshold log-IPC jump."""
+    if len(heartbeat_ipc) == 0:
+        return np.array([], dtype=np.int64)
+    log_ipc = np.log(np.clip(heartbeat_ipc, 1e-9, None))
+    jump = np.abs(np.diff(log_ipc, prepend=log_ipc[0])) > threshold
+    boundary = jump | (np.diff(roi.astype(np.int8), prepend=roi[0]) != 0)
+    boundary[0] = False
+    return np.cumsum(boundary)
+
+def phase_speedup(base, var, threshold=0.25):
+    """Per-phase comparison of a variant series against its baseline (both from cpu_series).
+
+    Variant intervals are mapped onto baseline phases by the instruction count
+    at which they end, so heartbeats that land a few instructions apart still
+    line up. Returns a DataFrame with one row per baseline phase.
+    """
+    phase = detect_phases(base['heartbeat_ipc'], base['roi'], threshold)
+    if len(phase) == 0 or len(var['instructions']) == 0:
+        return pd.DataFrame()
+    n_phases = int(phase[-1]) + 1
+    # baseline interval each variant interval ends in, tolerating small offsets
+    tol = int(np.median(base['d_instructions'])) // 2
+    idx = np.clip(np.searchsorted(base['instructions'], var['instructions'] - tol), 0, len(phase) - 1)
+    var_phase = phase[idx]
+
+    def per_phase(values, ids):
+        return np.bincount(ids, weights=values, minlength=n_phases)
+
+    b_instr = per_phase(base['d_instructions'], phase)
+    b_cyc = per_phase(base['d_cycles'], phase)
+    v_instr = per_phase(var['d_instructions'], var_phase)
+    v_cyc = per_phase(var['d_cycles'], var_phase)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        b_ipc = b_instr / b_cyc
+        v_ipc = v_instr / v_cyc
+    starts = np.searchsorted(phase, np.arange(n_phases))
+    ends = np.searchsorted(phase, np.arange(n_phases), side='right') - 1
+    return pd.DataFrame({
+        'phase': np.arange(n_phases),
+        'roi': base['roi'][starts].astype(bool),
+        'start_instructions': base['instructions'][starts] - base['d_instructions'][starts],
+        'end_instructions': base['instructions'][ends],
+        'intervals': ends - starts + 1,
+        'baseline_ipc': b_ipc,
+        'variant_ipc': v_ipc,
+        'speedup': v_ipc / b_ipc,
+        'baseline_wall_sec': per_phase(base['d_wall_sec'], phase),
+        'variant_wall_sec': per_phase(var['d_wall_sec'], var_phase),
+    })
+
+def save_series(runs, path):
+    """Store {(trace_folder, variant): series} as one compressed .npz (concatenated arrays + offsets)."""
+    keys = sorted(runs)
+    lengths = np.array([len(runs[k]['cpu']) for k in keys], dtype=np.int64)
+    out = {'trace_folder': np.array([k[0] for k in keys]), 'variant': np.array([k[1] for k in keys]),
+           'offsets': np.concatenate([[0], np.cumsum(lengths)])}
+    for field in SERIES_FIELDS:
+        parts = [runs[k][field] for k in keys]
+        out[field] = np.concatenate(parts) if parts else np.array([])
+    np.savez_compressed(path, **out)
+
+def load_series(path):
+    """Inverse of save_series()."""
+    with np.load(path) as z:
+        off = z['offsets']
+        return {(str(t), str(v)): {f: z[f][off[i]:off[i + 1]] for f in SERIES_FIELDS}
+                for i, (t, v) in enumerate(zip(z['trace_folder'], z['variant']))}
+
+def main(output_dir, baseline, threshold, cpu, save_series_path, save_csv, manifest_path=None):
+    manifest = load_manifest(manifest_path) if manifest_path else None
+    runs = {}
+    for trace_folder, fname, path in collect_logs(output_dir):
+        variant = manifest.variant(trace_folder, fname) if manifest else infer_variant(fname)
+        runs[(trace_folder, variant)] = parse_heartbeats(path)
+    n_samples = sum(len(s['cpu']) for s in runs.values())
+    print(f"Extracted {n_samples} heartbeats from {len(runs)} runs")
+    if save_series_path:
+        save_series(runs, save_series_path)
+        print(f"Saved heartbeat series to {save_series_path}")
+
+    frames = []
+    for (trace_folder, variant), series in sorted(runs.items()):
+        if variant == baseline or (trace_folder, baseline) not in runs:
+            continue
+        base = cpu_series(runs[(trace_folder, baseline)], cpu)
+        df = phase_speedup(base, cpu_series(series, cpu), threshold)
+        if df.empty: continue
+        df.insert(0, 'trace_folder', trace_folder)
+        df.insert(1, 'variant', variant)
+        frames.append(df)
+    if not frames:
+        print(f"No variant/{baseline} pairs with heartbeats found.")
+        return
+    phases = pd.concat(frames, ignore_index=True)
+    if save_csv:
+        phases.to_csv(save_csv, index=False)
+        print(f"Saved per-phase speedups to {save_csv}")
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(phases.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Path to output folder')
+    parser.add_argument('--baseline', default='baseline_noninc', help='Variant that defines phases and speedup')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Log-IPC jump that starts a new phase')
+    parser.add_argument('--cpu', type=int, default=0, help='CPU whose heartbeats are analysed')
+    parser.add_argument('--save-series', default=None, help='Write all heartbeat series to this .npz')
+    parser.add_argument('--save-csv', default=None, help='Write the per-phase speedup table to this CSV')
+    parser.add_argument('--manifest', default=None, help='Experiment manifest giving each log its variant')
+    args = parser.parse_args()
+    main(args.output_dir, args.baseline, args.threshold, args.cpu, args.save_series, args.save_csv,
+         args.manifest)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+manifest.py
+
+Declarative experiment manifest: the configuration of each run is listed
+explicitly instead of being guessed from its log's filename by infer_variant().
+
+A manifest is JSON or YAML:
+
+    {
+      "defaults": {"hierarchy": "non_inclusive_cache", "l2c_prefetcher": "no",
+                   "replacement": "lru", "warmup_instructions": 25000000,
+                   "simulation_instructions": 25000000},
+      "runs": [
+        {"trace_folder": "1st_trace1", "log": "table32.txt",
+         "trace": "../traces/trace1.champsimtrace.xz",
+         "l2c_prefetcher": "offset_prefetcher", "table_size": 32},
+        ...
+      ]
+    }
+
+Each run is keyed by (trace_folder, log), i.e. output/<trace_folder>/<log>.
+Missing fields come from "defaults". `hierarchy` names a file in
+cache_hierarchies/ (without .cc) and `l2c_prefetcher` one in prefetcher/
+(without .l2c_pref). `variant` may be given explicitly. Otherwise it is derived
+from the configuration with the labels the plotting scripts use
+(baseline_noninc, baseline_exclusive, table64, exclusive_table64, ...).
+
+The runs are resolved into a dict index, and parsed stats are joined to them
+with a single merge on the exact key.
+
+Usage:
+    python3 scripts/manifest.py --generate --output-dir ./output --save experiments.json
+    python3 scripts/manifest.py --check experiments.json --output-dir ./output
+"""
+import os, re, sys, json, argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from champsim_stats import open_log
+
+KEY = ('trace_folder', 'log')
+DEFAULTS = {'hierarchy': 'non_inclusive_cache', 'l2c_prefetcher': 'no', 'replacement': 'lru'}
+
+def variant_name(run):
+    """Plot label for a run configuration, e.g. baseline_noninc or exclusive_table64."""
+    excl = run.get('hierarchy') == 'exclusive_cache'
+    pf = run.get('l2c_prefetcher') or 'no'
+    if pf == 'no':
+        name = 'baseline_exclusive' if excl else 'baseline_noninc'
+    elif run.get('table_size'):
+        name = f"{'exclusive_' if excl else ''}table{int(run['table_size'])}"
+    else:
+        name = f"{'exclusive_' if excl else ''}{pf}"
+    for param, value in sorted((run.get('pf_params') or {}).items()):
+        name += f"_{param.lower()}{value}"
+    repl = run.get('replacement') or 'lru'
+    return name if repl == 'lru' else f"{name}_{repl}"
+
+class Manifest:
+    def __init__(self, runs, defaults=None):
+        base = dict(DEFAULTS, **(defaults or {}))
+        self.runs = []
+        self.index = {}
+        for i, r in enumerate(runs):
+            missing = [k for k in KEY if not r.get(k)]
+            if missing:
+                raise ValueError(f"manifest run #{i} is missing {', '.join(missing)}")
+            run = {k: r[k] for k in KEY}
+            run.update(base)
+            run.update(r)
+            run.setdefault('variant', variant_name(run))
+            key = (run['trace_folder'], run['log'])
+            if key in self.index:
+                raise ValueError(f"manifest lists {key[0]}/{key[1]} more than once")
+            self.index[key] = run
+            self.runs.append(run)
+
+    def __len__(self):
+        return len(self.runs)
+
+    def get(self, trace_folder, log):
+        return self.index.get((trace_folder, log))
+
+    def variant(self, trace_folder, log, default='unknown'):
+        run = self.index.get((trace_folder, log))
+        return run['variant'] if run else default
+
+    def frame(self):
+        """One row per run: trace_folder, file, variant and the configuration fields."""
+        cols = ['trace_folder', 'log', 'variant'] + [
+            c for c in dict.fromkeys(k for r in self.runs for k in r) if c not in ('trace_folder', 'log', 'variant')]
+        df = pd.DataFrame(self.runs, columns=cols).rename(columns={'log': 'file'})
+        if 'table_size' in df:
+            df['table_size'] = df['table_size'].astype('Int64')
+        return df
+
+    def join(self, stats):
+        """Attach variant + configuration to parsed stats by exact (trace_folder, file) key.
+
+        Logs that are not in the manifest get variant 'unknown'; both those and
+        manifest runs without a log are reported.
+        """
+        meta = self.frame()
+        merged = stats.drop(columns=[c for c in meta.columns if c in stats.columns and c not in ('trace_folder', 'file')]) \
+                      .merge(meta, on=['trace_folder', 'file'], how='left', validate='one_to_one', indicator=True)
+        unlisted = merged['_merge'] == 'left_only'
+        if unlisted.any():
+            print(f"WARNING: {int(unlisted.sum())} logs are not in the manifest, e.g. "
+                  f"{merged.loc[unlisted, 'trace_folder'].iloc[0]}/{merged.loc[unlisted, 'file'].iloc[0]}")
+        merged['variant'] = merged['variant'].fillna('unknown')
+        pending = len(meta) - int((merged['_merge'] == 'both').sum())
+        if pending:
+            print(f"NOTE: {pending} manifest runs have no log yet")
+        return merged.drop(columns='_merge')
+
+def load_manifest(path):
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise SystemExit("PyYAML is needed for YAML manifests (pip install pyyaml), or use JSON")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    if isinstance(data, list):
+        data = {'runs': data}
+    return Manifest(data.get('runs', []), data.get('defaults'))
+
+def save_manifest(manifest, path, defaults=None):
+    data = {'defaults': defaults or {}, 'runs': manifest.runs}
+    with open(path, 'w') as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            yaml.safe_dump(data, f, sort_keys=False)
+        else:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
+# --- bootstrap a manifest from existing logs (what the log says actually ran) ---
+re_binary = re.compile(r'bin/champsim-(\S+)')
+re_offset_table = re.compile(r'OFFSET_TABLE=(\d+)')
+re_header = {
+    'warmup_instructions': re.compile(r'^Warmup Instructions: (\d+)'),
+    'simulation_instructions': re.compile(r'^Simulation Instructions: (\d+)'),
+    'num_cores': re.compile(r'^Number of CPUs: (\d+)'),
+    'trace': re.compile(r'^CPU 0 runs (\S+)'),
+    'replacement': re.compile(r'^LLC has (\S+) replacement policy'),
+    'table_size': re.compile(r'offset prefetcher.*table(?: size)?=\s*(\d+)'),
+}
+
+def run_from_log(path, max_lines=60):
+    """Read the command line and header of a log into a manifest run (no filename guessing)."""
+    run = {}
+    with open_log(path) as f:
+        head = [line for _, line in zip(range(max_lines), f)]
+    # the shell prompt line may be wrapped by the terminal; rejoin it before matching
+    prompt = ''.join(l.rstrip('\n') for l in head[:3])
+    m = re_binary.search(prompt)
+    if m:
+        name = m.group(1)
+        if name.startswith('exclusive-'):
+            run['hierarchy'], name = 'exclusive_cache', name[len('exclusive-'):]
+        else:
+            run['hierarchy'] = 'non_inclusive_cache'
+        run['l2c_prefetcher'] = name
+    m = re_offset_table.search(prompt)
+    if m:
+        run['table_size'] = int(m.group(1))
+    for line in head:
+        for field, rx in re_header.items():
+            if field in run: continue
+            m = rx.search(line)
+            if m:
+                v = m.group(1)
+                run[field] = v.lower() if field == 'replacement' else (v if field == 'trace' else int(v))
+    if run.get('l2c_prefetcher', 'no') == 'no':
+        run.pop('table_size', None)
+    return run
+
+def manifest_from_logs(output_dir, label=None):
+    """Build a Manifest for every log under output_dir from the logs' own headers.
+
+    `label(fname)` may supply an explicit variant (e.g. infer_variant to keep
+    the labels an existing CSV already uses).
+    """
+    from parse_and_plot_all_questions import collect_logs
+    runs = []
+    for trace_folder, fname, path in collect_logs(output_dir):
+        run = {'trace_folder': trace_folder, 'log': fname}
+        run.update(run_from_log(path))
+        if label:
+            run['variant'] = label(fname)
+        runs.append(run)
+    return Manifest(runs)
+
+def main(args):
+    if args.generate:
+        label = None
+        if args.keep_labels:
+            from parse_and_plot_all_questions import infer_variant
+            label = infer_variant
+        m = manifest_from_logs(args.output_dir, label)
+        save_manifest(m, args.save)
+        print(f"Wrote {len(m)} runs to {args.save}")
+        for run in m.runs:
+            derived = variant_name(run)
+            if run['variant'] != derived:
+                print(f"  {run['trace_folder']}/{run['log']}: labelled {run['variant']}, "
+                      f"configuration says {derived}")
+    if args.check:
+        from parse_and_plot_all_questions import collect_logs
+        m = load_manifest(args.check)
+        logs = {(t, f) for t, f, _ in collect_logs(args.output_dir)}
+        missing = sorted(set(m.index) - logs)
+        unlisted = sorted(logs - set(m.index))
+        print(f"{args.check}: {len(m)} runs, {len(missing)} without a log, {len(unlisted)} logs not listed")
+        for t, f in unlisted:
+            print(f"  not listed: {t}/{f}")
+        for t, f in missing:
+            print(f"  no log:     {t}/{f}")
+        return 1 if unlisted else 0
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Path to output folder')
+    parser.add_argument('--generate', action='store_true', help='Write a manifest describing the existing logs')
+    parser.add_argument('--keep-labels', action='store_true',
+                        help='With --generate, keep the filename-derived variant labels instead of deriving them')
+    parser.add_argument('--save', default='experiments.json', help='Manifest written by --generate (.json/.yaml)')
+    parser.add_argument('--check', default=None, help='Compare a manifest against the logs in --output-dir')
+    sys.exit(main(parser.parse_args()))
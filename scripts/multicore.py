@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+multicore.py
+
+Per-CPU results and multi-programmed metrics for NUM_CPUS > 1 runs.
+
+Every log is split per CPU (champsim_stats.parse_file_cpus) into a long
+(trace_folder, file, cpu, trace, metric, value) table, so 4- and 8-core mixes
+keep every core's IPC and cache blocks instead of only core 0's.
+
+Each core of a multi-core run is matched to the single-core run of the same
+benchmark (the trace it ran; a run with one CPU is a single-core run). The
+match is done in one merge, and per mix:
+
+    weighted speedup  = sum_i IPC_shared_i / IPC_alone_i
+    harmonic speedup  = N / sum_i (IPC_alone_i / IPC_shared_i)
+    max slowdown      = max_i IPC_alone_i / IPC_shared_i
+
+By default a core is compared with the single-core run of the same variant
+(e.g. table64 in a mix vs table64 alone). --baseline-variant compares every
+mix with one fixed single-core configuration instead. Mixes with a core
+lacking a single-core baseline get NaN metrics and are reported.
+
+Usage:
+    python3 scripts/multicore.py --output-dir ./output --manifest experiments.json --save-csv mp_metrics.csv
+    python3 scripts/multicore.py --baseline-variant baseline_noninc --save-long per_cpu.csv
+"""
+import os, re, sys, argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from champsim_stats import parse_file_cpus, cpu_frame
+from parse_and_plot_all_questions import collect_logs, infer_variant
+from manifest import load_manifest
+
+RUN = ['trace_folder', 'file']
+re_trace_suffix = re.compile(r'(\.champsimtrace)?(\.(xz|gz|zst|bz2))?$')
+
+def benchmark_name(trace):
+    """'../traces/602.gcc_s-734B.champsimtrace.xz' -> '602.gcc_s-734B'."""
+    if not isinstance(trace, str):
+        return None
+    return re_trace_suffix.sub('', os.path.basename(trace))
+
+def _parse(item):
+    trace_folder, fname, path = item
+    try:
+        return [dict(r, trace_folder=trace_folder, file=fname) for r in parse_file_cpus(path)], None
+    except Exception as e:
+        return [], f"{path}: {type(e).__name__}: {e}"
+
+def collect(output_dir, jobs=1):
+    """Long per-CPU table for every log under output_dir."""
+    logs = collect_logs(output_dir)
+    if jobs > 1 and len(logs) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(_parse, logs, chunksize=max(1, len(logs) // (jobs * 4))))
+    else:
+        results = [_parse(item) for item in logs]
+    rows = []
+    for recs, err in results:
+        if err: print(f"WARNING: failed to parse {err}")
+        rows.extend(recs)
+    long = cpu_frame(rows, keys=RUN)
+    long.insert(long.columns.get_loc('trace') + 1, 'benchmark', long['trace'].map(benchmark_name))
+    return long
+
+def per_cpu(long, metrics=('ipc', 'instructions', 'cycles', 'l1d_total_mpki', 'l2c_total_mpki', 'llc_total_mpki')):
+    """(run, cpu) rows with the requested metrics as columns, plus `cores` per run."""
+    sel = long[long['metric'].isin(metrics)]
+    wide = sel.pivot_table(index=[*RUN, 'cpu'], columns='metric', values='value', aggfunc='first').reset_index()
+    wide.columns.name = None
+    wide = long[[*RUN, 'cpu', 'benchmark']].drop_duplicates([*RUN, 'cpu']).merge(wide, on=[*RUN, 'cpu'])
+    wide = wide.dropna(subset=[m for m in metrics if m in wide], how='all')
+    wide['cores'] = wide.groupby(RUN)['cpu'].transform('size')
+    return wide
+
+def mp_metrics(cores, baseline_variant=None):
+    """Weighted/harmonic speedup and max slowdown per multi-core run.
+
+    `cores` is per_cpu() output with a `variant` column. Single-core runs
+    (cores == 1) supply IPC_alone per (benchmark, variant), or per benchmark
+    from `baseline_variant` only.
+    """
+    alone = cores.loc[cores['cores'] == 1, ['benchmark', 'variant', 'ipc']].rename(columns={'ipc': 'ipc_alone'})
+    if baseline_variant:
+        alone = alone[alone['variant'] == baseline_variant].drop(columns='variant')
+        on = ['benchmark']
+    else:
+        on = ['benchmark', 'variant']
+    alone = alone[alone['ipc_alone'] > 0].drop_duplicates(on)
+
+    mixes = cores[cores['cores'] > 1].merge(alone, on=on, how='left')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mixes['speedup'] = mixes['ipc'] / mixes['ipc_alone']
+        mixes['slowdown'] = mixes['ipc_alone'] / mixes['ipc'].where(mixes['ipc'] > 0)
+    g = mixes.groupby([*RUN, 'variant'], sort=True)
+    out = g.agg(cores=('cpu', 'size'), missing_baselines=('ipc_alone', lambda s: int(s.isna().sum())),
+                weighted_speedup=('speedup', 'sum'), sum_slowdown=('slowdown', 'sum'),
+                max_slowdown=('slowdown', 'max')).reset_index()
+    out['harmonic_speedup'] = out['cores'] / out['sum_slowdown']
+    incomplete = out['missing_baselines'] > 0
+    out.loc[incomplete, ['weighted_speedup', 'harmonic_speedup', 'max_slowdown']] = np.nan
+    return out.drop(columns='sum_slowdown')[[*RUN, 'variant', 'cores', 'weighted_speedup', 'harmonic_speedup',
+                                             'max_slowdown', 'missing_baselines']], mixes
+
+def main(output_dir, manifest_path, jobs, baseline_variant, save_long, save_csv):
+    long = collect(output_dir, jobs)
+    if long.empty:
+        print("No per-CPU stats found.")
+        return
+    cores = per_cpu(long)
+    if manifest_path:
+        manifest = load_manifest(manifest_path)
+        cores['variant'] = [manifest.variant(t, f) for t, f in zip(cores['trace_folder'], cores['file'])]
+    else:
+        cores['variant'] = cores['file'].map(infer_variant)
+    n_runs = cores[RUN].drop_duplicates().shape[0]
+    print(f"Parsed {len(long)} (run, cpu, metric) values: {n_runs} runs, "
+          f"{int((cores.groupby(RUN)['cores'].first() > 1).sum())} multi-core")
+    if save_long:
+        (long.to_parquet if save_long.endswith('.parquet') else long.to_csv)(save_long, index=False)
+        print(f"Saved per-CPU table to {save_long}")
+
+    metrics, mixes = mp_metrics(cores, baseline_variant)
+    if metrics.empty:
+        print("No multi-core runs to evaluate.")
+        return
+    lacking = mixes[mixes['ipc_alone'].isna()].groupby(RUN)['benchmark'].agg(lambda s: ', '.join(map(str, s)))
+    for (trace_folder, fname), names in lacking.items():
+        print(f"WARNING: {trace_folder}/{fname}: no single-core baseline for {names}")
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(metrics.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if save_csv:
+        metrics.to_csv(save_csv, index=False)
+        print(f"Saved multi-programmed metrics to {save_csv}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Path to output folder')
+    parser.add_argument('--manifest', default=None, help='Experiment manifest giving each log its variant')
+    parser.add_argument('--jobs', type=int, default=1, help='Parse logs on N worker processes (0 = one per CPU)')
+    parser.add_argument('--baseline-variant', default=None,
+                        help='Compare every mix with single-core runs of this variant (default: same variant)')
+    parser.add_argument('--save-long', default=None, help='Write the long per-CPU table (.csv or .parquet)')
+    parser.add_argument('--save-csv', default=None, help='Write the per-mix metrics to this CSV')
+    args = parser.parse_args()
+    main(args.output_dir, args.manifest, args.jobs or os.cpu_count(), args.baseline_variant,
+         args.save_long, args.save_csv)
@@ -12,19 +12,29 @@ Generates CSV and PNG plots for:
 
 Usage:
     python3 scripts/parse_and_plot_all_questions.py --output-dir ./output --save-csv outputs_parsed_all.csv
+    python3 scripts/parse_and_plot_all_questions.py --jobs 0   # parse on every core
+    python3 scripts/parse_and_plot_all_questions.py --rebuild  # ignore the parse cache
+    python3 scripts/parse_and_plot_all_questions.py --manifest experiments.json
+    python3 scripts/parse_and_plot_all_questions.py --layout summary   # multi-panel PNGs, 16 plots each
+    python3 scripts/parse_and_plot_all_questions.py --watch 10 # follow running simulations live
+
+With --manifest, each log's variant and configuration come from the manifest
+(see scripts/manifest.py) instead of infer_variant()'s filename heuristics.
+
+Parsed records are cached in <save-csv stem>.parsecache.sqlite, so re-runs only
+parse logs that are new or whose size/mtime changed. Logs may be compressed
+(.txt.gz, .txt.xz, .txt.zst); they are decompressed while streaming. Plots are rendered by
+scripts/render.py (Agg, --jobs workers), skipping those whose data is unchanged.
 """
-import os, re, argparse
+import os, re, time, argparse
 import pandas as pd
-import matplotlib.pyplot as plt
-from collections import defaultdict
-
-# --- regexes for extracting values ---
-re_finished = re.compile(r'CPU\s+\d+\s+cumulative\s+IPC:\s*([0-9]*\.?[0-9]+)', re.IGNORECASE)
-re_l1d_mpki = re.compile(r'L1D TOTAL.*MPKI:\s*([0-9]*\.?[0-9]+)', re.IGNORECASE)
-re_l2c_mpki = re.compile(r'L2C TOTAL.*MPKI:\s*([0-9]*\.?[0-9]+)', re.IGNORECASE)
-re_llc_mpki = re.compile(r'LLC TOTAL.*MPKI:\s*([0-9]*\.?[0-9]+)', re.IGNORECASE)
-re_pref_issued = re.compile(r'Prefetches issued[:\s]+([0-9]+)', re.IGNORECASE)
-re_pref_useful = re.compile(r'Prefetches useful[:\s]+(?:\(approx\):\s*)?([0-9]+)', re.IGNORECASE)
+from concurrent.futures import ProcessPoolExecutor
+from parse_cache import ParseCache, cache_path_for
+from champsim_stats import parse_file, records_to_frame, RECORD_FIELDS, PARSER_VERSION, COMPRESSED_SUFFIXES
+from manifest import load_manifest
+from results_store import write_store
+from speedup import pivot, normalize, summarize
+from render import job, render_all, summary_jobs
 
 # flexible variant inference from filename
 def infer_variant(fname):
@@ -63,217 +73,234 @@ def infer_variant(fname):
     # fallback unknown
     return 'unknown'
 
-def parse_file(path):
-    with open(path, 'r', errors='ignore') as f:
-        text = f.read()
-    res = {
-        'file': os.path.basename(path),
-        'ipc': None,
-        'l1d_mpki': None,
-        'l2_mpki': None,
-        'llc_mpki': None,
-        'prefetch_issued': None,
-        'prefetch_useful': None,
-    }
-    m = re_finished.search(text)
-    if m:
-        try:
-            res['ipc'] = float(m.group(1))
-        except:
-            res['ipc'] = None
-    # MPKIs
-    m = re_l1d_mpki.search(text)
-    if m: res['l1d_mpki'] = float(m.group(1))
-    m = re_l2c_mpki.search(text)
-    if m: res['l2_mpki'] = float(m.group(1))
-    m = re_llc_mpki.search(text)
-    if m: res['llc_mpki'] = float(m.group(1))
-    # prefetch stats if present
-    m = re_pref_issued.search(text)
-    if m: res['prefetch_issued'] = int(m.group(1))
-    m = re_pref_useful.search(text)
-    if m: res['prefetch_useful'] = int(m.group(1))
-    return res
-
-def main(output_dir, save_csv):
-    rows = []
-    # walk trace subfolders
+LOG_SUFFIXES = ('.txt', '.out', '.log')
+
+def is_log(fname):
+    """True for simulator logs, plain or compressed (e.g. table64.txt, table64.txt.zst)."""
+    s = fname.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if s.endswith(suffix):
+            s = s[:-len(suffix)]
+            break
+    return s.endswith(LOG_SUFFIXES)
+
+def collect_logs(output_dir):
+    """Return (trace_folder, fname, path) for every log under output/<trace_folder>/, sorted."""
+    logs = []
     for trace_folder in sorted(os.listdir(output_dir)):
         folder = os.path.join(output_dir, trace_folder)
         if not os.path.isdir(folder): continue
         for fname in sorted(os.listdir(folder)):
-            if not fname.lower().endswith(('.txt', '.out', '.log')): continue
-            path = os.path.join(folder, fname)
-            parsed = parse_file(path)
-            variant = infer_variant(fname)
-            parsed['trace_folder'] = trace_folder
-            parsed['variant'] = variant
-            rows.append(parsed)
-
-    df = pd.DataFrame(rows)
+            if not is_log(fname): continue
+            logs.append((trace_folder, fname, os.path.join(folder, fname)))
+    return logs
+
+def annotate(parsed, trace_folder, fname):
+    parsed['trace_folder'] = trace_folder
+    parsed['variant'] = infer_variant(fname)
+    return parsed
+
+def parse_log(item):
+    """Parse one (trace_folder, fname, path) entry; returns (record, error message or None)."""
+    path = item[2]
+    try:
+        return parse_file(path), None
+    except Exception as e:
+        return None, f"{path}: {type(e).__name__}: {e}"
+
+def parse_all(logs, jobs=1, chunksize=None, cache=None):
+    """Parse every log, serially or on a pool of `jobs` processes.
+
+    Results come back in the order of `logs` so the CSV is identical whatever
+    the job count. A file that fails to parse is reported and skipped. With a
+    ParseCache, only logs that are new or changed since the last run are parsed.
+    """
+    t0 = time.perf_counter()
+    records, keys = {}, {}
+    if cache is not None:
+        for _, _, path in logs:
+            records[path], keys[path] = cache.get(path)
+    todo = [item for item in logs if records.get(item[2]) is None]
+
+    if jobs > 1 and len(todo) > 1:
+        if chunksize is None:
+            chunksize = max(1, len(todo) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(parse_log, todo, chunksize=chunksize))
+    else:
+        results = [parse_log(item) for item in todo]
+    elapsed = time.perf_counter() - t0
+
+    errors = []
+    for (_, _, path), (parsed, err) in zip(todo, results):
+        if err: errors.append(err)
+        else: records[path] = parsed
+    if cache is not None:
+        cache.put_many([(keys[path], records[path]) for _, _, path in todo if records.get(path)])
+        cache.evict_missing()
+    rows = [annotate(dict(records[path]), trace_folder, fname)
+            for trace_folder, fname, path in logs if records.get(path) is not None]
+
+    for err in errors:
+        print(f"WARNING: failed to parse {err}")
+    rate = len(todo) / elapsed if elapsed > 0 else float('inf')
+    print(f"Parsed {len(todo) - len(errors)}/{len(todo)} files in {elapsed:.2f} s "
+          f"({rate:.1f} files/sec, jobs={jobs}, {len(errors)} failed, "
+          f"{len(logs) - len(todo)} cached)")
+    if cache is not None:
+        print(cache.summary())
+    return rows
+
+def results_frame(rows, manifest=None):
+    """Parsed rows -> results DataFrame, joined to the manifest's configuration columns if given."""
+    df = records_to_frame(rows, leading=['file', *RECORD_FIELDS, 'trace_folder', 'variant'])
+    if manifest is not None:
+        df = manifest.join(df)
+        lead = ['file', *RECORD_FIELDS, 'trace_folder', 'variant', *manifest.frame().columns]
+        df = df[list(dict.fromkeys(c for c in lead if c in df.columns)) + [c for c in df.columns if c not in lead]]
+    return df
+
+def main(output_dir, save_csv, jobs=1, use_cache=True, rebuild=False, manifest_path=None, save_store=None,
+         layout='separate', force_plots=False):
+    cache = ParseCache(cache_path_for(save_csv), PARSER_VERSION, rebuild) if use_cache else None
+    rows = parse_all(collect_logs(output_dir), jobs, cache=cache)
+    if cache is not None: cache.close()
+
+    df = results_frame(rows, load_manifest(manifest_path) if manifest_path else None)
     df.to_csv(save_csv, index=False)
     print(f"Saved parsed data to {save_csv}")
+    if 'pruned_at_instructions' in df:
+        pruned = df[df['pruned_at_instructions'].notna()]
+        print(f"{len(pruned)} runs were pruned by the sweep (no final stats): "
+              + ', '.join(pruned['trace_folder'] + '/' + pruned['file']))
+    if save_store:
+        write_store(df, save_store)
+        print(f"Saved Parquet results store to {save_store}")
     print(df)
 
-    # For each trace, make Q1/Q2/Q3 plots as available
-    traces = sorted(df['trace_folder'].unique())
-    for t in traces:
-        sub = df[df['trace_folder'] == t]
-        print(f"\n=== Trace: {t} ===")
-        # find non-inclusive baseline
-        base_non = sub[sub['variant'] == 'baseline_noninc']
-        base_excl = sub[sub['variant'] == 'baseline_exclusive']
+    plot_jobs, ipc = question_jobs(df)
+    print("\nRendering plots...")
+    render_jobs = (plot_jobs if layout != 'summary' else []) + (summary_jobs(plot_jobs) if layout != 'separate' else [])
+    render_all(render_jobs, output_dir, workers=jobs, force=force_plots)
+
+    for baseline in ('baseline_noninc', 'baseline_exclusive'):
+        if baseline in ipc:
+            print(f"\n=== Geomean speedup over {baseline} across traces ===")
+            print(summarize(df, baseline).to_string(float_format=lambda x: f"{x:.4f}"))
+
+    print("\nAll done. CSV and PNGs saved to output directory.")
+
+def question_jobs(df):
+    """Print the per-trace Q1/Q2/Q3 numbers and return (plot jobs, trace x variant IPC matrix)."""
+    # (trace x variant) matrices; speedups are NaN wherever a baseline is missing
+    ipc = pivot(df, 'ipc')
+    mpki = {m: pivot(df, m) for m in ('l1d_mpki', 'l2_mpki', 'llc_mpki')}
+    sp_non = normalize(ipc, 'baseline_noninc')
+    sp_excl = normalize(ipc, 'baseline_exclusive')
+
+    def lookup(matrix, t, v):
+        x = matrix.at[t, v] if v in matrix else float('nan')
+        return None if pd.isnull(x) else float(x)
 
-        if not base_non.empty:
-            base_non_ipc = float(base_non['ipc'].iloc[0])
+    # For each trace, queue Q1/Q2/Q3 plots as available (rendered together below)
+    plot_jobs = []
+    for t in ipc.index:
+        print(f"\n=== Trace: {t} ===")
+        base_non_ipc = lookup(ipc, t, 'baseline_noninc')
+        base_excl_ipc = lookup(ipc, t, 'baseline_exclusive')
+        if base_non_ipc is not None:
             print(f"Non-inclusive baseline IPC: {base_non_ipc:.6f}")
         else:
-            base_non_ipc = None
             print("No non-inclusive baseline found for this trace.")
-
-        if not base_excl.empty:
-            base_excl_ipc = float(base_excl['ipc'].iloc[0])
+        if base_excl_ipc is not None:
             print(f"Exclusive baseline IPC: {base_excl_ipc:.6f}")
         else:
-            base_excl_ipc = None
             print("No exclusive baseline found for this trace.")
 
-        # Q1: prefetcher table sizes (non-exclusive)
-        variants_q1 = ['table32','table64','table128']
-        xs, ys, mpki_vals = [], [], []
-        for v in variants_q1:
-            row = sub[sub['variant'] == v]
-            if row.empty: continue
-            ipc_v = float(row['ipc'].iloc[0])
-            xs.append(int(v.replace('table','')))
-            # speedup wrt non-inclusive baseline if exists; else skip
-            if base_non_ipc:
-                ys.append(ipc_v / base_non_ipc)
-            else:
-                ys.append(None)
-            mpki_vals.append(row['l2_mpki'].iloc[0] if pd.notnull(row['l2_mpki'].iloc[0]) else None)
+        # Q1: prefetcher table sizes (non-exclusive), speedup wrt non-inclusive baseline
+        variants_q1 = [v for v in ('table32', 'table64', 'table128') if lookup(ipc, t, v) is not None]
+        xs = [int(v.replace('table', '')) for v in variants_q1]
+        ys = [lookup(sp_non, t, v) for v in variants_q1]
+        mpki_vals = [lookup(mpki['l2_mpki'], t, v) for v in variants_q1]
 
         # plot Q1 speedup vs table size (single baseline: non-inclusive)
         if xs and any(y is not None for y in ys):
-            plt.figure(figsize=(6,4))
-            plt.plot(xs, ys, marker='o')
-            plt.title(f"Q1: Prefetcher Speedup vs Table Size — {t}")
-            plt.xlabel("Table size (entries)")
-            plt.ylabel("Speedup (IPC_prefetch / IPC_noninc_baseline)")
-            plt.grid(True)
-            plt.axhline(1.0, color='gray', linestyle='--')
-            out = os.path.join(output_dir, f"q1_speedup_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
+            plot_jobs.append(job(f"q1_speedup_{t}.png", 'q1', 'line', figsize=(6,4), x=xs, y=ys,
+                            title=f"Q1: Prefetcher Speedup vs Table Size — {t}",
+                            xlabel="Table size (entries)",
+                            ylabel="Speedup (IPC_prefetch / IPC_noninc_baseline)", hline=1.0))
 
         # Q1: L2 MPKI vs table size
         if xs and any(m is not None for m in mpki_vals):
-            plt.figure(figsize=(6,4))
-            plt.bar(xs, mpki_vals)
-            plt.title(f"Q1: L2 MPKI vs Table Size — {t}")
-            plt.xlabel("Table size (entries)")
-            plt.ylabel("L2 MPKI")
-            plt.grid(axis='y', linestyle='--', alpha=0.5)
-            out = os.path.join(output_dir, f"q1_mpki_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
+            plot_jobs.append(job(f"q1_mpki_{t}.png", 'q1', 'bar', figsize=(6,4), x=xs, y=mpki_vals,
+                            title=f"Q1: L2 MPKI vs Table Size — {t}",
+                            xlabel="Table size (entries)", ylabel="L2 MPKI", grid='y'))
 
         # Q2: Exclusive vs Non-Inclusive comparison (IPC + MPKIs)
-        if (not base_non.empty) and (not base_excl.empty):
-            excl_row = base_excl.iloc[0]
-            ipc_non = base_non_ipc
-            ipc_excl = float(excl_row['ipc'])
-            speedup = ipc_excl / ipc_non if ipc_non else None
-            l1d_non = float(base_non['l1d_mpki'].iloc[0]) if pd.notnull(base_non['l1d_mpki'].iloc[0]) else None
-            l2_non  = float(base_non['l2_mpki'].iloc[0]) if pd.notnull(base_non['l2_mpki'].iloc[0]) else None
-            llc_non = float(base_non['llc_mpki'].iloc[0]) if pd.notnull(base_non['llc_mpki'].iloc[0]) else None
-            l1d_ex = float(excl_row['l1d_mpki']) if pd.notnull(excl_row['l1d_mpki']) else None
-            l2_ex  = float(excl_row['l2_mpki']) if pd.notnull(excl_row['l2_mpki']) else None
-            llc_ex = float(excl_row['llc_mpki']) if pd.notnull(excl_row['llc_mpki']) else None
+        if base_non_ipc is not None and base_excl_ipc is not None:
+            ipc_non, ipc_excl = base_non_ipc, base_excl_ipc
+            speedup = lookup(sp_non, t, 'baseline_exclusive')
+            l1d_non, l2_non, llc_non = (lookup(mpki[m], t, 'baseline_noninc') for m in ('l1d_mpki', 'l2_mpki', 'llc_mpki'))
+            l1d_ex, l2_ex, llc_ex = (lookup(mpki[m], t, 'baseline_exclusive') for m in ('l1d_mpki', 'l2_mpki', 'llc_mpki'))
 
             print("Q2: Exclusive vs Non-Inclusive")
-            print(f"  Non-inc IPC: {ipc_non:.6f}, Exclusive IPC: {ipc_excl:.6f}, Speedup: {speedup:.4f}")
+            print(f"  Non-inc IPC: {ipc_non:.6f}, Exclusive IPC: {ipc_excl:.6f}, Speedup: {'n/a' if speedup is None else f'{speedup:.4f}'}")
             print(f"  L1D MPKI: non-inc {l1d_non}, exclusive {l1d_ex}")
             print(f"  L2 MPKI: non-inc {l2_non}, exclusive {l2_ex}")
             print(f"  LLC MPKI: non-inc {llc_non}, exclusive {llc_ex}")
 
             # IPC bar chart
-            plt.figure(figsize=(5,4))
-            plt.bar(['non-inclusive','exclusive'], [ipc_non, ipc_excl], color=['gray','tab:blue'])
-            plt.title(f"Q2: Exclusive vs Non-Inclusive IPC — {t}")
-            plt.ylabel("IPC")
-            plt.grid(axis='y', linestyle='--', alpha=0.5)
-            out = os.path.join(output_dir, f"q2_ipc_cmp_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
+            plot_jobs.append(job(f"q2_ipc_cmp_{t}.png", 'q2', 'bar', figsize=(5,4),
+                            x=['non-inclusive','exclusive'], y=[ipc_non, ipc_excl], color=['gray','tab:blue'],
+                            title=f"Q2: Exclusive vs Non-Inclusive IPC — {t}", ylabel="IPC", grid='y'))
 
             # MPKI grouped bar chart for L1D, L2, LLC
-            labels = []
-            non_vals = []
-            ex_vals = []
-            for label, nval, evalv in [('L1D', l1d_non, l1d_ex), ('L2', l2_non, l2_ex), ('LLC', llc_non, llc_ex)]:
-                labels.append(label)
-                non_vals.append(nval if nval is not None else 0.0)
-                ex_vals.append(evalv if evalv is not None else 0.0)
-            x = range(len(labels))
-            width = 0.35
-            plt.figure(figsize=(7,4))
-            plt.bar([p - width/2 for p in x], non_vals, width=width, label='non-inclusive')
-            plt.bar([p + width/2 for p in x], ex_vals, width=width, label='exclusive')
-            plt.xticks(x, labels)
-            plt.ylabel("MPKI")
-            plt.title(f"Q2: MPKI Comparison — {t}")
-            plt.legend()
-            plt.grid(axis='y', linestyle='--', alpha=0.5)
-            out = os.path.join(output_dir, f"q2_mpki_cmp_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
+            plot_jobs.append(job(f"q2_mpki_cmp_{t}.png", 'q2', 'grouped_bar', figsize=(7,4),
+                            groups=['L1D', 'L2', 'LLC'],
+                            series=[['non-inclusive', [v or 0.0 for v in (l1d_non, l2_non, llc_non)]],
+                                    ['exclusive', [v or 0.0 for v in (l1d_ex, l2_ex, llc_ex)]]],
+                            title=f"Q2: MPKI Comparison — {t}", ylabel="MPKI"))
 
         # Q3: Exclusive prefetcher study: generate two speedup curves
         # Find exclusive_prefetcher runs (exclusive_table32/64/128)
-        ex_pref_variants = [('exclusive_table32', 32), ('exclusive_table64', 64), ('exclusive_table128', 128)]
-        xs_ex, ys_nonbase, ys_exbase = [], [], []
-        for vname, vsz in ex_pref_variants:
-            r = sub[sub['variant'] == vname]
-            if r.empty: continue
-            ipc_v = float(r['ipc'].iloc[0])
-            xs_ex.append(vsz)
-            # speedup vs non-inclusive baseline
-            if base_non_ipc: ys_nonbase.append(ipc_v / base_non_ipc)
-            else: ys_nonbase.append(None)
-            # speedup vs exclusive baseline
-            if base_excl_ipc: ys_exbase.append(ipc_v / base_excl_ipc)
-            else: ys_exbase.append(None)
-
-        # plot Q3 curve vs non-inclusive baseline
-        if xs_ex and any(y is not None for y in ys_nonbase):
-            plt.figure(figsize=(6,4))
-            plt.plot(xs_ex, ys_nonbase, marker='o')
-            plt.title(f"Q3 (exclusive-pref): Speedup vs Table Size — baseline=non-inclusive — {t}")
-            plt.xlabel("Table size (entries)")
-            plt.ylabel("Speedup")
-            plt.grid(True); plt.axhline(1.0, color='gray', linestyle='--')
-            out = os.path.join(output_dir, f"q3_speedup_noninc_baseline_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
-
-        # plot Q3 curve vs exclusive baseline
-        if xs_ex and any(y is not None for y in ys_exbase):
-            plt.figure(figsize=(6,4))
-            plt.plot(xs_ex, ys_exbase, marker='o')
-            plt.title(f"Q3 (exclusive-pref): Speedup vs Table Size — baseline=exclusive — {t}")
-            plt.xlabel("Table size (entries)")
-            plt.ylabel("Speedup")
-            plt.grid(True); plt.axhline(1.0, color='gray', linestyle='--')
-            out = os.path.join(output_dir, f"q3_speedup_excl_baseline_{t}.png")
-            plt.savefig(out); plt.close()
-            print(f"Saved {out}")
+        ex_pref_variants = [(v, n) for v, n in (('exclusive_table32', 32), ('exclusive_table64', 64),
+                                                ('exclusive_table128', 128)) if lookup(ipc, t, v) is not None]
+        xs_ex = [n for _, n in ex_pref_variants]
+        ys_nonbase = [lookup(sp_non, t, v) for v, _ in ex_pref_variants]
+        ys_exbase = [lookup(sp_excl, t, v) for v, _ in ex_pref_variants]
 
-    print("\nAll done. CSV and PNGs saved to output directory.")
+        # plot Q3 curves vs the non-inclusive and the exclusive baseline
+        for ys_q3, base_name, suffix in ((ys_nonbase, 'non-inclusive', 'noninc'), (ys_exbase, 'exclusive', 'excl')):
+            if xs_ex and any(y is not None for y in ys_q3):
+                plot_jobs.append(job(f"q3_speedup_{suffix}_baseline_{t}.png", 'q3', 'line', figsize=(6,4), x=xs_ex, y=ys_q3,
+                                title=f"Q3 (exclusive-pref): Speedup vs Table Size — baseline={base_name} — {t}",
+                                xlabel="Table size (entries)", ylabel="Speedup", hline=1.0))
+    return plot_jobs, ipc
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
     parser.add_argument('--output-dir', default='./output', help='Path to output folder')
     parser.add_argument('--save-csv', default='outputs_parsed_all.csv', help='CSV output filename')
+    parser.add_argument('--jobs', type=int, default=1,
+                        help='Parse logs and render plots on N worker processes (0 = one per CPU)')
+    parser.add_argument('--manifest', default=None,
+                        help='Experiment manifest (.json/.yaml) giving each run its variant and configuration')
+    parser.add_argument('--save-store', default=None,
+                        help='Also write a partitioned Parquet results store here (e.g. outputs_parsed_all.parquet)')
+    parser.add_argument('--layout', choices=['separate', 'summary', 'both'], default='separate',
+                        help='One PNG per plot, multi-panel PNGs of up to 16 plots per question, or both')
+    parser.add_argument('--force-plots', action='store_true', help='Re-render plots even if their data is unchanged')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write the parse cache')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the parse cache and re-parse every log')
+    parser.add_argument('--watch', type=float, nargs='?', const=10, default=None, metavar='SECONDS',
+                        help='Tail in-flight logs and update progress, live speedup plots and the CSV/store '
+                             'every SECONDS (default 10) instead of a one-shot parse (see scripts/watch.py)')
     args = parser.parse_args()
-    main(args.output_dir, args.save_csv)
+    if args.watch is not None:
+        from watch import watch
+        watch(args.output_dir, args.watch, manifest_path=args.manifest, plots_dir=args.output_dir,
+              save_csv=args.save_csv, save_store=args.save_store)
+        raise SystemExit
+    main(args.output_dir, args.save_csv, args.jobs or os.cpu_count(),
+         use_cache=not args.no_cache, rebuild=args.rebuild, manifest_path=args.manifest,
+         save_store=args.save_store, layout=args.layout, force_plots=args.force_plots)
@@ -0,0 +1,78 @@
+"""
+parse_cache.py
+
+Persistent parse cache for parse_and_plot_all_questions.py.
+
+Parsed records are stored in a SQLite file beside the CSV, keyed by the log's
+real path and validated against its size and mtime, so a re-run only parses
+logs that are new or changed. Entries written by a different PARSER_VERSION are
+treated as misses, and entries whose log no longer exists are evicted.
+"""
+import os, json, sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed (
+    path    TEXT PRIMARY KEY,
+    size    INTEGER NOT NULL,
+    mtime   INTEGER NOT NULL,
+    version TEXT NOT NULL,
+    record  TEXT NOT NULL
+)
+"""
+
+def cache_path_for(save_csv):
+    """outputs_parsed_all.csv -> outputs_parsed_all.parsecache.sqlite"""
+    return os.path.splitext(save_csv)[0] + '.parsecache.sqlite'
+
+def file_key(path):
+    st = os.stat(path)
+    return os.path.realpath(path), st.st_size, st.st_mtime_ns
+
+class ParseCache:
+    def __init__(self, db_path, version, rebuild=False):
+        self.db_path = db_path
+        self.version = str(version)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(SCHEMA)
+        if rebuild:
+            self.conn.execute("DELETE FROM parsed")
+        self.conn.commit()
+        self.hits = self.misses = self.evicted = 0
+
+    def get(self, path):
+        """Return (record or None, stat key) for `path`.
+
+        The stat key is taken before parsing and must be handed back to
+        put_many(), so a log that grows while it is parsed is re-parsed next time.
+        """
+        key = file_key(path)
+        row = self.conn.execute(
+            "SELECT size, mtime, version, record FROM parsed WHERE path = ?", (key[0],)).fetchone()
+        if row and (row[0], row[1]) == key[1:] and row[2] == self.version:
+            self.hits += 1
+            return json.loads(row[3]), key
+        self.misses += 1
+        return None, key
+
+    def put_many(self, items):
+        """Store (stat key, record) pairs."""
+        rows = [(path, size, mtime, self.version, json.dumps(record))
+                for (path, size, mtime), record in items]
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO parsed (path, size, mtime, version, record) VALUES (?, ?, ?, ?, ?)", rows)
+        self.conn.commit()
+
+    def evict_missing(self):
+        """Drop entries whose source log no longer exists."""
+        stale = [p for (p,) in self.conn.execute("SELECT path FROM parsed") if not os.path.exists(p)]
+        self.conn.executemany("DELETE FROM parsed WHERE path = ?", [(p,) for p in stale])
+        self.conn.commit()
+        self.evicted += len(stale)
+        return len(stale)
+
+    def close(self):
+        self.conn.close()
+
+    def summary(self):
+        return (f"parse cache {self.db_path}: {self.hits} hits, {self.misses} misses, "
+                f"{self.evicted} evicted")
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+prefetch_model.py
+
+Replay model of the L2C offset prefetcher (prefetcher/offset_prefetcher.l2c_pref)
+for ranking region-table sizes before running ChampSim.
+
+Input is an L2C access stream dumped by a run with L2C_ACCESS_DUMP=<path>
+(the "no" and offset L2C prefetchers write it): one 16-byte record per access,
+{addr, type | cache_hit << 8 | cpu << 16}. Dump a baseline ("no" prefetcher)
+run, so the misses are the ones a prefetcher could cover. Every core's L2C
+writes to the same dump; each L2C is private, so --cpu picks the one to replay.
+
+Only demand loads (type 0) train and trigger the prefetcher, as in the C++.
+Every table size is replayed in the same three vectorized stages:
+
+ 1. Residency. A page's RegionEntry starts empty whenever the page is not in
+    the direct-mapped table when accessed, i.e. when its slot, page % size,
+    last held another page. This gives the conflict rate (accesses that
+    evicted another page's entry) and splits each page's accesses into
+    episodes that start from an empty entry. Set-associative tables are not
+    modelled: LRU state is sequential per set, and a numpy stack-distance
+    version was slower than a Python loop.
+ 2. Training. The top-K OffsetEntry arrays of all episodes of all
+    configurations sit in one (episodes x TOPK) array and are stepped
+    together, one access per episode per step. Frequency counting and
+    least-frequent replacement are as in update_offset(). Candidates with
+    freq >= FREQ_MIN_FOR_USE, by frequency and then |delta|, are the
+    prefetches each access would issue.
+ 3. Outcome. Prefetches of lines demanded in the last RECENT_DEMAND_MAX
+    loads are dropped, and repeats of a line still outstanding are merged. A
+    prefetch is useful if its line is demanded later; a load miss is covered
+    if a prefetch of its line was outstanding.
+
+The prefetcher adapts its degree to its running accuracy (compute_degree());
+the model reports the fixed degree consistent with the accuracy it gives,
+i.e. the largest degree d whose accuracy maps back to at least d.
+
+Not modelled: timing (a prefetch counts as useful however late), PQ
+rejections, cache pollution and dedup before the degree cut. The numbers are
+for ranking configurations, not for predicting IPC. conf never grows in the
+non-exclusive prefetcher, so CONF_THRESH plays no part.
+
+Usage:
+    L2C_ACCESS_DUMP=/tmp/trace1.l2c ./bin/champsim -warmup_instructions 1000000 -simulation_instructions 10000000 -traces trace1.champsimtrace.xz
+    python3 scripts/prefetch_model.py /tmp/trace1.l2c --sizes 16,32,64,128,256 --save-csv model.csv
+"""
+import os, time, argparse
+import numpy as np
+import pandas as pd
+
+LOG2_BLOCK_SIZE = 6
+LOG2_PAGE_SIZE = 12
+LINES_PER_PAGE = 1 << (LOG2_PAGE_SIZE - LOG2_BLOCK_SIZE)
+DUMP_DTYPE = np.dtype([('addr', '<u8'), ('type', 'u1'), ('hit', 'u1'), ('cpu', '<u2'), ('pad', 'V4')])
+DEGREES = (1, 2, 4, 6, 8)
+
+def load_stream(path, skip=0, limit=None, cpu=0):
+    """Demand loads of one CPU's L2C in a dump as (line address, hit) arrays."""
+    recs = np.fromfile(path, dtype=DUMP_DTYPE)
+    recs = recs[(recs['type'] == 0) & (recs['cpu'] == cpu)][skip:]
+    if limit:
+        recs = recs[:limit]
+    return (recs['addr'] >> LOG2_BLOCK_SIZE).astype(np.int64), recs['hit'].astype(bool)
+
+def degree_for(accuracy):
+    """compute_degree() of the prefetcher."""
+    for threshold, degree in ((0.80, 8), (0.60, 6), (0.40, 4), (0.20, 2)):
+        if accuracy >= threshold:
+            return degree
+    return 1
+
+# ---------------- stage 1: residency ----------------
+def residency(page, size):
+    """(reset, conflict) per access for a direct-mapped `size`-entry table."""
+    n = len(page)
+    slot = page % size
+    order = np.argsort(slot, kind='stable')
+    ps, ss = page[order], slot[order]
+    first = np.r_[True, ss[1:] != ss[:-1]]
+    other = np.r_[True, ps[1:] != ps[:-1]]
+    reset, conflict = np.empty(n, bool), np.empty(n, bool)
+    reset[order] = first | other
+    conflict[order] = ~first & other
+    return reset, conflict
+
+# ---------------- stage 2: training ----------------
+def train(page, offset, resets, topk=5, freq_min=2):
+    """Prefetch candidates of every configuration: (config, access, target line, rank) arrays.
+
+    `resets` holds one reset array per configuration. Episodes of all
+    configurations are stepped together.
+    """
+    n = len(page)
+    by_page = np.argsort(page, kind='stable')
+    ps = page[by_page]
+    page_start = np.r_[True, ps[1:] != ps[:-1]]
+    ep_cfg, ep_access, ep_id = [], [], []
+    n_eps = 0
+    for c, reset in enumerate(resets):
+        new = page_start | reset[by_page]
+        ids = np.cumsum(new) - 1
+        ep_id.append(ids + n_eps)
+        ep_access.append(by_page)
+        ep_cfg.append(np.full(n, c, np.int32))
+        n_eps += int(ids[-1]) + 1 if n else 0
+    ep_id = np.concatenate(ep_id) if n else np.array([], np.int64)
+    access = np.concatenate(ep_access) if n else np.array([], np.int64)
+    cfg = np.concatenate(ep_cfg) if n else np.array([], np.int32)
+    # position of each access within its episode, then group by that position
+    starts = np.r_[0, np.nonzero(np.diff(ep_id))[0] + 1]
+    pos = np.arange(len(ep_id)) - np.repeat(starts, np.diff(np.r_[starts, len(ep_id)]))
+    step_order = np.argsort(pos, kind='stable')
+    bounds = np.searchsorted(pos[step_order], np.arange(pos.max() + 2 if len(pos) else 1))
+
+    last = np.full(n_eps, -1, np.int16)
+    delta = np.zeros((n_eps, topk), np.int16)
+    freq = np.zeros((n_eps, topk), np.int32)
+    col = np.arange(topk)
+    out = []
+    for k in range(len(bounds) - 1):
+        sel = step_order[bounds[k]:bounds[k + 1]]
+        E, A = ep_id[sel], access[sel]
+        L = offset[A]
+        d = L - last[E]
+        ok = (last[E] >= 0) & (d != 0)
+        dl, fr = delta[E], freq[E]
+        match = (fr > 0) & (dl == d[:, None]) & ok[:, None]
+        has = match.any(1)
+        hit_col = match.argmax(1)
+        fr[has, hit_col[has]] += 1
+        repl = ok & ~has
+        repl_col = fr[repl].argmin(1)
+        dl[repl, repl_col] = d[repl]
+        fr[repl, repl_col] = 1
+        delta[E], freq[E], last[E] = dl, fr, L
+        # candidates after training, by frequency then |delta|, as ByConfThenFreq orders them
+        target = L[:, None] + dl
+        cand = (fr >= freq_min) & (target >= 0) & (target < LINES_PER_PAGE)
+        if not cand.any():
+            continue
+        key = np.where(cand, -fr.astype(np.int64) * LINES_PER_PAGE * 2 + np.abs(dl), np.iinfo(np.int64).max)
+        order = np.argsort(key, axis=1, kind='stable')
+        cand_sorted = np.take_along_axis(cand, order, 1)
+        rank = np.cumsum(cand_sorted, 1) - 1
+        rows, j = np.nonzero(cand_sorted)
+        tgt = np.take_along_axis(target, order, 1)[rows, j]
+        out.append((cfg[sel][rows], A[rows], page[A[rows]] * LINES_PER_PAGE + tgt, rank[rows, j]))
+    if not out:
+        empty = np.array([], np.int64)
+        return empty, empty, empty, empty
+    return tuple(np.concatenate(x) for x in zip(*out))
+
+# ---------------- stage 3: outcome ----------------
+class Demands:
+    """Sorted (line, time) index of the demand loads for previous/next-demand lookups."""
+
+    def __init__(self, line):
+        self.n = len(line)
+        self.uniq, dense = np.unique(line, return_inverse=True)
+        self.keys = np.sort(dense.astype(np.int64) * (self.n + 1) + np.arange(self.n))
+
+    def around(self, line, t):
+        """(previous demand time < t or -1, next demand time > t or -1) of each `line`."""
+        i = np.searchsorted(self.uniq, line)
+        known = (i < len(self.uniq)) & (self.uniq[np.minimum(i, len(self.uniq) - 1)] == line)
+        base = np.where(known, i, 0).astype(np.int64) * (self.n + 1)
+        lo = np.searchsorted(self.keys, base + t, 'left') - 1
+        hi = np.searchsorted(self.keys, base + t, 'right')
+        prev_ok = known & (lo >= 0) & (self.keys[np.maximum(lo, 0)] // (self.n + 1) == base // (self.n + 1))
+        next_ok = known & (hi < len(self.keys)) & (
+            self.keys[np.minimum(hi, len(self.keys) - 1)] // (self.n + 1) == base // (self.n + 1))
+        prev = np.where(prev_ok, self.keys[np.maximum(lo, 0)] % (self.n + 1), -1)
+        nxt = np.where(next_ok, self.keys[np.minimum(hi, len(self.keys) - 1)] % (self.n + 1), -1)
+        return prev, nxt
+
+def issue_order(t, target, rank, prev, nxt, n, recent=4096):
+    """(issue rank, outstanding key, next demand) of the prefetches that pass the recency filter.
+
+    Prefetches with the same outstanding key hit the same outstanding line:
+    the key is the next demand of the line, or a per-line id past `n` for
+    lines never demanded again.
+    """
+    keep = ~((prev >= 0) & (prev > t - recent))
+    t, target, rank, nxt = t[keep], target[keep], rank[keep], nxt[keep]
+    order = np.lexsort((rank, t))
+    t, target, nxt = t[order], target[order], nxt[order]
+    starts = np.nonzero(np.r_[True, t[1:] != t[:-1]])[0] if len(t) else np.array([], np.int64)
+    issued_rank = np.arange(len(t)) - np.repeat(starts, np.diff(np.r_[starts, len(t)]))
+    key = nxt.copy()
+    dead = nxt < 0
+    key[dead] = n + np.unique(target[dead], return_inverse=True)[1]
+    return issued_rank, key, nxt
+
+def outcome(issued_rank, key, nxt, hit, degree):
+    """issued, useful and covered misses for one configuration at a fixed degree."""
+    sel = issued_rank < degree
+    keys, first_of = np.unique(key[sel], return_index=True)
+    useful = nxt[sel][first_of]
+    useful = useful[useful >= 0]
+    return len(keys), len(useful), int((~hit[useful]).sum())
+
+def model(line, hit, sizes=(32, 64, 128), topk=5, freq_min=2, recent=4096, degree=None):
+    """One row per table size with conflict rate, degree, issued, useful, accuracy and coverage."""
+    page = line >> (LOG2_PAGE_SIZE - LOG2_BLOCK_SIZE)
+    offset = (line & (LINES_PER_PAGE - 1)).astype(np.int16)
+    res = [residency(page, s) for s in sizes]
+    cfg, t, target, rank = train(page, offset, [r for r, _ in res], topk, freq_min)
+    demands = Demands(line)
+    prev, nxt = demands.around(target, t)
+    misses = int((~hit).sum())
+    rows = []
+    for c, size in enumerate(sizes):
+        m = cfg == c
+        order = issue_order(t[m], target[m], rank[m], prev[m], nxt[m], len(line), recent)
+        results = {d: outcome(*order, hit, d) for d in ((degree,) if degree else DEGREES)}
+        if degree:
+            chosen = degree
+        else:
+            fits = [d for d, (iss, use, _) in results.items() if degree_for(use / iss if iss else 0.0) >= d]
+            chosen = max(fits, default=1)
+        issued, useful, covered = results[chosen]
+        rows.append({'table_size': size, 'loads': len(line), 'misses': misses,
+                     'conflict_rate': float(res[c][1].mean()) if len(line) else 0.0,
+                     'degree': chosen, 'issued': issued, 'useful': useful,
+                     'accuracy': useful / issued if issued else 0.0,
+                     'coverage': covered / misses if misses else 0.0})
+    return pd.DataFrame(rows)
+
+def main(dumps, sizes, topk, freq_min, recent, degree, skip, limit, rank_by, save_csv, cpu=0):
+    frames = []
+    for path in dumps:
+        t0 = time.perf_counter()
+        line, hit = load_stream(path, skip, limit, cpu)
+        df = model(line, hit, sizes, topk, freq_min, recent, degree)
+        df.insert(0, 'dump', os.path.basename(path))
+        df['rank'] = df[rank_by].rank(ascending=False, method='min').astype(int)
+        frames.append(df.sort_values('rank'))
+        print(f"{path}: {len(line)} loads, {len(df)} configurations in {time.perf_counter() - t0:.2f} s")
+        print(df.sort_values('rank').to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    if save_csv and frames:
+        pd.concat(frames).to_csv(save_csv, index=False)
+        print(f"Saved model estimates to {save_csv}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('dumps', nargs='+', help='L2C access dumps (L2C_ACCESS_DUMP=<path> runs)')
+    parser.add_argument('--sizes', default='16,32,64,128,256', help='Comma-separated region-table sizes')
+    parser.add_argument('--topk', type=int, default=5, help='Offsets kept per page (TOPK)')
+    parser.add_argument('--freq-min', type=int, default=2, help='FREQ_MIN_FOR_USE')
+    parser.add_argument('--recent', type=int, default=4096, help='RECENT_DEMAND_MAX')
+    parser.add_argument('--degree', type=int, default=None, help='Fixed prefetch degree (default: self-consistent adaptive)')
+    parser.add_argument('--cpu', type=int, default=0, help='CPU whose L2C accesses are replayed')
+    parser.add_argument('--skip', type=int, default=0, help='Skip the first N loads (e.g. warmup)')
+    parser.add_argument('--limit', type=int, default=None, help='Replay at most N loads')
+    parser.add_argument('--rank-by', default='coverage', choices=['coverage', 'accuracy', 'useful'],
+                        help='Metric configurations are ranked by')
+    parser.add_argument('--save-csv', default=None, help='Write the estimates to this CSV')
+    args = parser.parse_args()
+    main(args.dumps, [int(s) for s in args.sizes.split(',')], args.topk, args.freq_min, args.recent, args.degree,
+         args.skip, args.limit, args.rank_by, args.save_csv, args.cpu)
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+prune.py
+
+Early stopping of sweep runs that are clearly losing to their baseline.
+
+Each prefetcher run is compared with its baseline run: same trace folder,
+hierarchy, replacement, branch predictor and core count, with the "no" L2C
+prefetcher. Only ROI heartbeats are used, with instructions and cycles counted
+from each CPU's `Warmup complete` point (warmup runs with zero latencies, so
+its heartbeats say nothing about the prefetcher). At every heartbeat the
+baseline's ROI cycles are interpolated at the run's ROI instruction counts, so
+both are measured over the same instructions:
+
+    interval speedup k  = baseline cycles / run cycles over heartbeat interval k
+    cumulative speedup  = baseline cycles / run cycles up to the last compared heartbeat
+
+A run is dominated when, on every CPU, after at least --min-heartbeats
+compared intervals, both the cumulative speedup and the upper confidence
+bound of the geometric-mean interval speedup (exp(mean + z * standard error)
+of the log speedups) are below 1 - margin.
+
+sweep.py --prune-margin kills dominated runs, appends one `Pruned CPU n ...`
+line per CPU (at the ROI instructions compared so far) to the log and keeps it
+under its final name. The parser reads those lines into pruned_* columns (the
+stats columns stay empty), so the run is recorded as pruned in the CSV and
+results store, and a re-run of the sweep skips it unless --force.
+
+Run on its own, this replays the rule over finished logs and reports which
+runs would have been pruned and the ROI instructions that would have saved, to
+help pick a margin.
+
+Usage:
+    python3 scripts/sweep.py sweep.json --prune-margin 0.05
+    python3 scripts/prune.py --output-dir ./output --manifest experiments.json --margin 0.05 --z 2
+"""
+import os, sys, argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from heartbeats import re_heartbeat, re_warmup_done
+from champsim_stats import open_log
+from manifest import load_manifest
+from parse_and_plot_all_questions import collect_logs, infer_variant
+
+PRUNED_MARKER = 'Pruned CPU'
+BASELINE_FIELDS = ('trace_folder', 'hierarchy', 'replacement', 'branch', 'num_cores')
+
+def baseline_key(run):
+    return tuple(run.get(k) for k in BASELINE_FIELDS)
+
+def roi_series(path):
+    """ROI heartbeats of a log as {cpu, instructions, cycles}, counted from each CPU's `Warmup complete` point."""
+    start = {}
+    cpu, instr, cyc = [], [], []
+    with open_log(path) as f:
+        for line in f:
+            if line.startswith('Heartbeat'):
+                m = re_heartbeat.match(line)
+                if not m or int(m.group(1)) not in start: continue
+                n = int(m.group(1))
+                cpu.append(n)
+                instr.append(int(m.group(2)) - start[n][0])
+                cyc.append(int(m.group(3)) - start[n][1])
+            elif line.startswith('Warmup complete'):
+                m = re_warmup_done.match(line)
+                if m: start[int(m.group(1))] = (int(m.group(2)), int(m.group(3)))
+    return {'cpu': np.array(cpu, dtype=np.int64), 'instructions': np.array(instr, dtype=np.int64),
+            'cycles': np.array(cyc, dtype=np.int64)}
+
+def compare(base, cand, z=2.0):
+    """{cpu: comparison} of a run's ROI heartbeat series with its baseline's (both roi_series output).
+
+    Only the part of the run the baseline has already simulated is compared.
+    """
+    out = {}
+    for cpu in np.unique(cand['cpu']):
+        b, c = base['cpu'] == cpu, cand['cpu'] == cpu
+        b_instr = np.concatenate([[0], base['instructions'][b]])
+        b_cyc = np.concatenate([[0], base['cycles'][b]])
+        c_instr = np.concatenate([[0], cand['instructions'][c]])
+        c_cyc = np.concatenate([[0], cand['cycles'][c]])
+        reached = c_instr <= b_instr[-1]
+        c_instr, c_cyc = c_instr[reached], c_cyc[reached]
+        if len(c_instr) < 2:
+            continue
+        b_at = np.interp(c_instr, b_instr, b_cyc)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sp = np.diff(b_at) / np.diff(c_cyc)
+        logs = np.log(sp[sp > 0])
+        n = len(logs)
+        if n == 0:
+            continue
+        se = logs.std(ddof=1) / np.sqrt(n) if n > 1 else np.inf
+        out[int(cpu)] = {'intervals': n, 'instructions': int(c_instr[-1]),
+                         'speedup': float(b_at[-1] / c_cyc[-1]), 'upper': float(np.exp(logs.mean() + z * se))}
+    return out
+
+def dominated(comparison, cpus, margin=0.05, min_heartbeats=3):
+    """True if every CPU in `cpus` has been compared often enough and is slower than 1 - margin."""
+    limit = 1 - margin
+    return bool(cpus) and all(
+        cpu in comparison and comparison[cpu]['intervals'] >= min_heartbeats
+        and comparison[cpu]['speedup'] < limit and comparison[cpu]['upper'] < limit
+        for cpu in cpus)
+
+def marker_lines(comparison, baseline_log):
+    return [f"{PRUNED_MARKER} {cpu} at instructions: {c['instructions']} speedup: {c['speedup']:.4f} "
+            f"upper bound: {c['upper']:.4f} baseline: {baseline_log}\n" for cpu, c in sorted(comparison.items())]
+
+class Pruner:
+    """Decides, for a running sweep, whether a run's log shows it dominated by its baseline."""
+
+    def __init__(self, runs, output_dir, margin=0.05, z=2.0, min_heartbeats=3, interval=30):
+        self.output_dir, self.margin, self.z = output_dir, margin, z
+        self.min_heartbeats, self.interval = max(2, min_heartbeats), interval
+        bases = {baseline_key(r): r for r in runs if r['l2c_prefetcher'] == 'no'}
+        self.baseline = {(r['trace_folder'], r['log']): bases[baseline_key(r)] for r in runs
+                         if r['l2c_prefetcher'] != 'no' and baseline_key(r) in bases}
+        self.finished = {}      # baseline log path -> series, once the baseline has finished
+
+    def baseline_series(self, base):
+        final = os.path.join(self.output_dir, base['trace_folder'], base['log'])
+        if final in self.finished:
+            return self.finished[final]
+        if os.path.exists(final):
+            series = self.finished[final] = roi_series(final)
+            return series
+        if os.path.exists(final + '.part'):
+            return roi_series(final + '.part')
+        return None
+
+    def check(self, run, part):
+        """Marker lines to append if the run at `part` is dominated, else None."""
+        base = self.baseline.get((run['trace_folder'], run['log']))
+        if base is None:
+            return None
+        base_series = self.baseline_series(base)
+        if base_series is None or not len(base_series['cpu']):
+            return None
+        cand = roi_series(part)
+        comparison = compare(base_series, cand, self.z)
+        if dominated(comparison, range(run.get('num_cores', 1)), self.margin, self.min_heartbeats):
+            return marker_lines(comparison, base['log'])
+        return None
+
+def replay(output_dir, manifest_path=None, margin=0.05, z=2.0, min_heartbeats=3):
+    """First ROI heartbeat at which each finished run would have been pruned (one row per run)."""
+    logs = collect_logs(output_dir)
+    manifest = load_manifest(manifest_path) if manifest_path else None
+    runs = {}
+    for trace_folder, fname, path in logs:
+        run = manifest.get(trace_folder, fname) if manifest else None
+        if run is None:
+            variant = infer_variant(fname)
+            run = {'trace_folder': trace_folder, 'variant': variant, 'num_cores': 1,
+                   'l2c_prefetcher': 'no' if variant.startswith('baseline') else 'offset_prefetcher',
+                   'hierarchy': 'exclusive_cache' if 'exclusive' in variant else 'non_inclusive_cache'}
+        runs[(trace_folder, fname)] = (run, path)
+    bases = {baseline_key(r): path for r, path in runs.values() if r.get('l2c_prefetcher') == 'no'}
+    rows = []
+    for (trace_folder, fname), (run, path) in sorted(runs.items()):
+        if run.get('l2c_prefetcher') == 'no' or baseline_key(run) not in bases:
+            continue
+        base, cand = roi_series(bases[baseline_key(run)]), roi_series(path)
+        cpus = range(int(run.get('num_cores') or 1))
+        total = int(cand['instructions'].max()) if len(cand['instructions']) else 0
+        row = {'trace_folder': trace_folder, 'file': fname, 'variant': run.get('variant'),
+               'heartbeats': len(cand['cpu']), 'pruned_at_instructions': None, 'pruned_speedup': None,
+               'saved_fraction': 0.0}
+        for k in range(1, len(cand['cpu']) + 1):
+            comparison = compare(base, {f: v[:k] for f, v in cand.items()}, z)
+            if dominated(comparison, cpus, margin, min_heartbeats):
+                at = min(c['instructions'] for c in comparison.values())
+                row.update(pruned_at_instructions=at,
+                           pruned_speedup=min(c['speedup'] for c in comparison.values()),
+                           saved_fraction=1 - at / total if total else 0.0)
+                break
+        final = compare(base, cand, z)
+        row['final_speedup'] = min((c['speedup'] for c in final.values()), default=np.nan)
+        rows.append(row)
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df['pruned_at_instructions'] = df['pruned_at_instructions'].astype('Int64')
+    return df
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Path to output folder')
+    parser.add_argument('--manifest', default=None, help='Experiment manifest giving each log its configuration')
+    parser.add_argument('--margin', type=float, default=0.05, help='Prune runs slower than 1 - margin of their baseline')
+    parser.add_argument('--z', type=float, default=2.0, help='Standard errors above the mean for the upper bound')
+    parser.add_argument('--min-heartbeats', type=int, default=3, help='Compared heartbeat intervals needed first')
+    args = parser.parse_args()
+    df = replay(args.output_dir, args.manifest, args.margin, args.z, args.min_heartbeats)
+    if df.empty:
+        print("No prefetcher runs with a baseline to replay.")
+    else:
+        print(df.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+        pruned = df['pruned_at_instructions'].notna()
+        print(f"\n{int(pruned.sum())}/{len(df)} runs would have been pruned at margin {args.margin}, "
+              f"saving {df['saved_fraction'].mean():.1%} of their ROI instructions on average; "
+              f"{int((pruned & (df['final_speedup'] >= 1 - args.margin)).sum())} of those finished within the margin")
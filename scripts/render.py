@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+render.py
+
+Headless, parallel rendering stage for the plotting scripts.
+
+Plots are described as plain job dicts instead of being drawn inline:
+
+    {'name': 'q1_speedup_1st_trace1.png', 'question': 'q1', 'kind': 'bar',
+     'figsize': [7, 5], 'data': {'x': [...], 'y': [...], 'title': ..., ...}}
+
+render_all() then
+ - forces the Agg backend (no display needed, no GUI toolkit imported),
+ - renders the jobs on a process pool, each worker reusing one figure per
+   figure size instead of creating and closing one per plot,
+ - skips any plot whose job (data + styling + RENDER_VERSION) hashes the same
+   as when its PNG was last written (hashes live in <out_dir>/.render_hashes.json),
+ - reports the render time of every plot.
+
+summary_jobs() folds the jobs of each question into multi-panel figures of at
+most 16 panels (<question>_summary.png, or <question>_summary_01.png,
+_02.png, ... when there are more), for sweeps where hundreds of separate PNGs
+are not useful; one figure of every panel would pass matplotlib's pixel limit.
+Several scripts may render into one out_dir (e.g. watch.py's live plots next
+to the question plots), so saving the hash file keeps every entry whose PNG
+still exists and drops only those whose PNG was deleted.
+
+Kinds: 'bar', 'line' and 'grouped_bar' (see the draw_* functions for the keys).
+"""
+import os, json, time, hashlib, math
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+
+RENDER_VERSION = 1
+HASH_FILE = '.render_hashes.json'
+
+def _plain(v):
+    """numpy/pandas values -> JSON-able Python values (so jobs hash and pickle cheaply)."""
+    if isinstance(v, dict):
+        return {k: _plain(x) for k, x in v.items()}
+    if isinstance(v, (list, tuple)):
+        return [_plain(x) for x in v]
+    if hasattr(v, 'tolist'):
+        return _plain(v.tolist())
+    if isinstance(v, float) and math.isnan(v):
+        return None
+    return v
+
+def job(name, question, kind, figsize=(6.4, 4.8), **data):
+    return {'name': name, 'question': question, 'kind': kind, 'figsize': list(figsize), 'data': _plain(data)}
+
+def job_hash(j):
+    blob = json.dumps([RENDER_VERSION, matplotlib.__version__, j], sort_keys=True)
+    return hashlib.sha1(blob.encode()).hexdigest()
+
+# ---------------- drawing (onto an Axes, so panels and single plots share code) ----------------
+def _nan(values):
+    return [float('nan') if v is None else v for v in values]
+
+def draw_bar(ax, x, y, title=None, xlabel=None, ylabel=None, color=None, edgecolor=None, rotation=None,
+             annotate=False, baseline=None, baseline_label=None, baseline_color='red', grid=None):
+    bars = ax.bar(x, _nan(y), color=color, edgecolor=edgecolor)
+    if annotate:
+        for bar in bars:
+            ax.text(bar.get_x() + bar.get_width()/2, bar.get_height(), f"{bar.get_height():.2f}",
+                    ha='center', va='bottom', fontsize=8)
+    if baseline is not None:
+        ax.axhline(y=baseline, color=baseline_color, linestyle='--', linewidth=1.5,
+                   label=f'{baseline_label or "Baseline"} = {baseline:.2f}')
+        ax.legend()
+    if rotation is not None:
+        ax.tick_params(axis='x', labelrotation=rotation)
+    if grid:
+        ax.grid(axis=grid, linestyle='--', alpha=0.5)
+    _labels(ax, title, xlabel, ylabel)
+
+def draw_line(ax, x, y, title=None, xlabel=None, ylabel=None, hline=None, grid=True):
+    ax.plot(x, _nan(y), marker='o')
+    if grid:
+        ax.grid(True)
+    if hline is not None:
+        ax.axhline(hline, color='gray', linestyle='--')
+    _labels(ax, title, xlabel, ylabel)
+
+def draw_grouped_bar(ax, groups, series, title=None, xlabel=None, ylabel=None, colors=None, grid='y'):
+    """`series` is [[name, values], ...]; one bar per series within each group."""
+    width = 0.8 / max(1, len(series))
+    for i, (label, values) in enumerate(series):
+        offset = (i - (len(series) - 1) / 2) * width
+        ax.bar([p + offset for p in range(len(groups))], _nan(values), width=width, label=label,
+               color=colors[i] if colors else None)
+    ax.set_xticks(range(len(groups)), groups)
+    if len(series) > 1:
+        ax.legend()
+    if grid:
+        ax.grid(axis=grid, linestyle='--', alpha=0.5)
+    _labels(ax, title, xlabel, ylabel)
+
+def _labels(ax, title, xlabel, ylabel):
+    if title: ax.set_title(title)
+    if xlabel: ax.set_xlabel(xlabel)
+    if ylabel: ax.set_ylabel(ylabel)
+
+DRAW = {'bar': draw_bar, 'line': draw_line, 'grouped_bar': draw_grouped_bar}
+
+# ---------------- rendering ----------------
+_figures = {}   # per-process figure reuse, keyed by figure size
+
+def _figure(figsize):
+    key = tuple(figsize)
+    fig = _figures.get(key)
+    if fig is None:
+        fig = _figures[key] = plt.figure(figsize=key)
+    fig.clf()
+    return fig
+
+def render_job(args):
+    """Draw one job to <out_dir>/<name>; returns (name, seconds)."""
+    j, out_dir = args
+    t0 = time.perf_counter()
+    if j['kind'] == 'summary':
+        panels = j['data']['panels']
+        ncols = min(j['data'].get('ncols', 4), len(panels))
+        nrows = math.ceil(len(panels) / ncols)
+        fig = _figure([4.5 * ncols, 3.5 * nrows])
+        for i, p in enumerate(panels):
+            ax = fig.add_subplot(nrows, ncols, i + 1)
+            DRAW[p['kind']](ax, **p['data'])
+            ax.title.set_fontsize(9)
+        fig.suptitle(j['data'].get('title', ''))
+    else:
+        fig = _figure(j['figsize'])
+        DRAW[j['kind']](fig.add_subplot(), **j['data'])
+    fig.tight_layout()
+    fig.savefig(os.path.join(out_dir, j['name']))
+    return j['name'], time.perf_counter() - t0
+
+def summary_jobs(jobs, ncols=4, per_page=16):
+    """Multi-panel jobs of at most `per_page` panels per question, panels in job order."""
+    by_question = {}
+    for j in jobs:
+        by_question.setdefault(j['question'], []).append({'kind': j['kind'], 'data': j['data']})
+    out = []
+    for q, panels in by_question.items():
+        pages = math.ceil(len(panels) / per_page)
+        for k in range(pages):
+            page = panels[k * per_page:(k + 1) * per_page]
+            name, title = f'{q}_summary.png', f'{q.upper()} summary ({len(panels)} plots)'
+            if pages > 1:
+                name = f'{q}_summary_{k + 1:02d}.png'
+                title = f'{q.upper()} summary, page {k + 1}/{pages} (plots {k * per_page + 1}-{k * per_page + len(page)} of {len(panels)})'
+            out.append({'name': name, 'question': q, 'kind': 'summary', 'figsize': None,
+                        'data': {'title': title, 'panels': page, 'ncols': ncols}})
+    return out
+
+def _load_hashes(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def render_all(jobs, out_dir, workers=1, force=False, verbose=True):
+    """Render every job whose hash changed (or whose PNG is missing); returns {name: seconds}."""
+    os.makedirs(out_dir, exist_ok=True)
+    hash_path = os.path.join(out_dir, HASH_FILE)
+    old = _load_hashes(hash_path)
+    hashes = {j['name']: job_hash(j) for j in jobs}
+    todo = [j for j in jobs if force or old.get(j['name']) != hashes[j['name']]
+            or not os.path.exists(os.path.join(out_dir, j['name']))]
+
+    t0 = time.perf_counter()
+    items = [(j, out_dir) for j in todo]
+    if workers > 1 and len(items) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            timings = dict(pool.map(render_job, items, chunksize=max(1, len(items) // (workers * 4))))
+    else:
+        timings = dict(map(render_job, items))
+    wall = time.perf_counter() - t0
+
+    # other callers (watch.py's live plots, the question plots) may share out_dir:
+    # re-read their hashes and drop only entries whose PNG is gone
+    old = _load_hashes(hash_path)
+    old.update({name: hashes[name] for name in timings})
+    with open(hash_path, 'w') as f:
+        json.dump({name: h for name, h in old.items() if os.path.exists(os.path.join(out_dir, name))},
+                  f, indent=1, sort_keys=True)
+    if verbose:
+        for name, sec in timings.items():
+            print(f"  {sec * 1000:8.1f} ms  {os.path.join(out_dir, name)}")
+        print(f"Rendered {len(timings)} plots in {wall:.2f} s (workers={workers}), "
+              f"{len(jobs) - len(todo)} unchanged and skipped")
+    return timings
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+results_store.py
+
+Typed, partitioned Parquet store for parsed results, and the queries the
+plotting/reporting scripts run against it.
+
+Layout (hive partitions, one file per partition, rows sorted by the index):
+
+    <root>/hierarchy=<h>/l2c_prefetcher=<p>/part-0.parquet
+
+Rows are indexed by (trace_folder, hierarchy, l2c_prefetcher, table_size);
+`variant` is kept alongside for the plotting labels. Integer stats stay
+integers (no more 1010958.0), and readers name the columns and partitions
+they need so only those are read from disk.
+
+The store is written by parse_and_plot_all_questions.py --save-store. Writing
+and reading it needs pyarrow; load_results() falls back to the CSV, so the
+plotting scripts work either way.
+
+Usage:
+    python3 scripts/results_store.py --traces 1st_trace1,1st_trace2 --baseline baseline_noninc
+"""
+import os, sys, shutil, argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+INDEX = ['trace_folder', 'hierarchy', 'l2c_prefetcher', 'table_size']
+PARTITION_COLS = ['hierarchy', 'l2c_prefetcher']
+DEFAULT_STORE = 'outputs_parsed_all.parquet'
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise SystemExit("pyarrow is needed for the Parquet results store (pip install pyarrow)")
+
+def _flat(v):
+    if isinstance(v, dict):
+        return ','.join(f"{k}={x}" for k, x in sorted(v.items()))
+    if isinstance(v, (list, tuple)):
+        return ','.join(map(str, v))
+    return v
+
+def write_store(df, root):
+    """Replace the store at `root` with `df` (needs the manifest columns; missing ones become 'unknown')."""
+    _require_pyarrow()
+    df = df.copy()
+    for col in PARTITION_COLS:
+        if col not in df:
+            df[col] = 'unknown'
+        df[col] = df[col].fillna('unknown').astype(str)
+    for col in df.columns[df.dtypes == object]:
+        # multi-core manifest runs list one trace per CPU and pf_params is a dict;
+        # Parquet needs one type per column
+        if df[col].map(lambda v: isinstance(v, (list, tuple, dict))).any():
+            df[col] = df[col].map(_flat)
+    if 'table_size' not in df:
+        df['table_size'] = pd.array([pd.NA] * len(df), dtype='Int64')
+    df = df.sort_values(INDEX + ['variant'], na_position='first', kind='stable')
+    tmp = root.rstrip('/') + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    df.to_parquet(tmp, partition_cols=PARTITION_COLS, index=False,
+                  basename_template='part-{i}.parquet')
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp, root)
+    return root
+
+def load(root, columns=None, traces=None, variants=None, hierarchy=None, l2c_prefetcher=None):
+    """Read selected columns of the store, pruning partitions and rows with filters."""
+    _require_pyarrow()
+    filters = []
+    for col, values in (('trace_folder', traces), ('variant', variants),
+                        ('hierarchy', hierarchy), ('l2c_prefetcher', l2c_prefetcher)):
+        if values is not None:
+            filters.append((col, 'in', list(values) if not isinstance(values, str) else [values]))
+    df = pd.read_parquet(root, columns=list(columns) if columns else None, filters=filters or None)
+    for col in PARTITION_COLS:
+        if col in df and isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+    return df
+
+def load_results(source=None, columns=None, **filters):
+    """Load results from the Parquet store if present, else from the CSV.
+
+    `source` defaults to outputs_parsed_all.parquet, falling back to
+    outputs_parsed_all.csv. Filters (traces=, variants=, ...) apply to both.
+    """
+    if source is None:
+        source = DEFAULT_STORE if os.path.isdir(DEFAULT_STORE) else 'outputs_parsed_all.csv'
+    if os.path.isdir(source):
+        return load(source, columns, **filters)
+    df = pd.read_csv(source, usecols=(lambda c: c in columns) if columns else None)
+    for col, values in (('trace_folder', filters.get('traces')), ('variant', filters.get('variants'))):
+        if values is not None:
+            df = df[df[col].isin([values] if isinstance(values, str) else values)]
+    return df
+
+def with_baseline(df, baseline, metrics=('ipc',), prefix='base_', on=('trace_folder',)):
+    """Join each row to the `baseline` variant's row of the same trace, in one merge.
+
+    Adds <prefix><metric> for each metric and <prefix>speedup = ipc / baseline
+    ipc. Speedup is NaN (never 0 or inf) when the baseline is missing or its
+    IPC is not positive.
+    """
+    on = list(on)
+    metrics = list(metrics)
+    if 'ipc' not in metrics:
+        metrics.append('ipc')
+    base = df.loc[df['variant'] == baseline, on + metrics].drop_duplicates(on)
+    base = base.rename(columns={m: prefix + m for m in metrics})
+    out = df.merge(base, on=on, how='left')
+    base_ipc = out[prefix + 'ipc'].astype(float)
+    out[prefix + 'speedup'] = np.where(base_ipc > 0, out['ipc'].astype(float) / base_ipc.where(base_ipc > 0), np.nan)
+    return out
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--store', default=DEFAULT_STORE, help='Parquet store directory')
+    parser.add_argument('--columns', default='trace_folder,variant,ipc,l2_mpki', help='Comma-separated columns')
+    parser.add_argument('--traces', default=None, help='Comma-separated trace folders')
+    parser.add_argument('--baseline', default=None, help='Join this variant as baseline and add speedup')
+    args = parser.parse_args()
+    cols = args.columns.split(',')
+    df = load(args.store, columns=list(dict.fromkeys(cols + ['trace_folder', 'variant'])),
+              traces=args.traces.split(',') if args.traces else None)
+    if args.baseline:
+        df = with_baseline(df, args.baseline)
+    print(df.to_string(index=False))
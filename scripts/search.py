@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+search.py
+
+Multi-fidelity design-space search over the offset prefetcher's build-time
+knobs (sweep.PF_PARAMS: DEFAULT_TABLE_SIZE, TOPK, CONF_THRESH,
+FREQ_MIN_FOR_USE, RECENT_DEMAND_MAX).
+
+Candidates are compiled with the knobs as OFFSET_PF_<NAME> defines (one
+private build per candidate, see sweep.build_binary). Every candidate is
+first simulated with a short --simulation_instructions budget. Only the best
+1/eta of them move on to the next rung, at eta times the budget, until
+max_budget:
+
+    successive halving  one bracket: n candidates from min_budget up
+    hyperband           several brackets, trading more candidates at small
+                        budgets against fewer candidates started at larger ones
+
+A candidate's score on a rung is the geometric-mean speedup, over the
+traces, of its IPC over the baseline ("no" prefetcher) run at the same budget.
+
+Every simulation result is stored in <search-dir>/results.sqlite, keyed by
+(binary hash, trace, warmup, budget). The binary hash is sweep.build_hash,
+the hash of the build inputs. Re-running the search, or reaching a point
+another bracket already evaluated, never simulates the same thing twice.
+Logs go to <search-dir>/logs/<trace>/<build id>-<budget>.txt. Every scored
+(candidate, budget) is written to <search-dir>/leaderboard.csv. With
+--trace-cache, traces are decompressed once for the whole search (see
+trace_cache.py).
+
+The search config (JSON or YAML):
+
+    {
+      "hierarchy": "non_inclusive_cache", "l2c_prefetcher": "offset_prefetcher",
+      "warmup_instructions": 5000000,
+      "traces": {"trace1": "../traces/trace1.champsimtrace.xz", ...},
+      "space": {"DEFAULT_TABLE_SIZE": [32, 64, 128, 256], "TOPK": [3, 5, 8],
+                "CONF_THRESH": [1, 2, 3], "FREQ_MIN_FOR_USE": [1, 2, 3],
+                "RECENT_DEMAND_MAX": [1024, 4096, 16384]},
+      "candidates": 27, "min_budget": 1000000, "max_budget": 25000000, "eta": 3,
+      "method": "hyperband", "seed": 0
+    }
+
+"candidates" is the bracket size for successive halving (a random sample of
+the grid, or the whole grid if it is smaller). Hyperband sizes its brackets
+from the budgets and eta.
+
+Usage:
+    python3 scripts/search.py search.json --search-dir search_out --jobs 16
+    python3 scripts/search.py search.json --method sh --dry-run
+    python3 scripts/search.py search.json --trace-cache /scratch/trace_cache --trace-cache-budget 200G
+"""
+import os, sys, json, math, time, random, sqlite3, argparse, itertools
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from sweep import (load_config, PF_PARAMS, SWEEP_DEFAULTS, build_key, build_hash, build_id, build_binary,
+                   run_sim)
+from champsim_stats import parse_file
+from speedup import pivot, normalize, geomean
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    binary TEXT NOT NULL,
+    trace TEXT NOT NULL,
+    warmup INTEGER NOT NULL,
+    budget INTEGER NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (binary, trace, warmup, budget)
+)
+"""
+BASELINE = 'baseline'
+
+class ResultCache:
+    """(binary hash, trace, warmup, budget) -> parsed stats record."""
+
+    def __init__(self, db_path):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.hits = self.misses = 0
+
+    def get(self, key):
+        row = self.conn.execute("SELECT record FROM results WHERE binary = ? AND trace = ? AND warmup = ? "
+                                "AND budget = ?", key).fetchone()
+        if row:
+            self.hits += 1
+            return json.loads(row[0])
+        self.misses += 1
+        return None
+
+    def put(self, key, record):
+        self.conn.execute("INSERT OR REPLACE INTO results (binary, trace, warmup, budget, record) "
+                          "VALUES (?, ?, ?, ?, ?)", (*key, json.dumps(record)))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+def candidate_grid(space):
+    names = [n for n in PF_PARAMS if n in space]
+    unknown = set(space) - set(PF_PARAMS)
+    if unknown:
+        raise ValueError(f"unknown parameters {', '.join(sorted(unknown))}; known: {', '.join(PF_PARAMS)}")
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+def rungs(min_budget, max_budget, eta):
+    """Budgets min_budget * eta^i, ending exactly at max_budget."""
+    out, b = [], min_budget
+    while b < max_budget:
+        out.append(int(b))
+        b *= eta
+    return out + [int(max_budget)]
+
+def name(params):
+    return '_'.join(f"{k.lower()}{v}" for k, v in params.items()) or 'defaults'
+
+class Search:
+    def __init__(self, cfg, search_dir, build_root, jobs=1, dry_run=False, trace_cache=None):
+        self.cfg = dict(SWEEP_DEFAULTS, **cfg)
+        self.traces = {t: p['path'] if isinstance(p, dict) else p for t, p in self.cfg['traces'].items()}
+        self.warmup = int(self.cfg.get('warmup_instructions', 0))
+        self.search_dir, self.build_root, self.jobs, self.dry_run = search_dir, build_root, jobs, dry_run
+        self.trace_cache = trace_cache
+        os.makedirs(search_dir, exist_ok=True)
+        self.cache = ResultCache(os.path.join(search_dir, 'results.sqlite'))
+        self.binaries, self.digests = {}, {}
+        self.scores = []
+        self.simulated = 0
+
+    def run_config(self, params):
+        run = {k: self.cfg[k] for k in ('hierarchy', 'replacement', 'branch', 'num_cores')}
+        run['l2c_prefetcher'] = self.cfg['l2c_prefetcher'] if params is not None else 'no'
+        if params:
+            run['pf_params'] = params
+        return run
+
+    def key(self, params):
+        return build_key(self.run_config(params))
+
+    def build(self, keys):
+        """Build (or reuse) the binaries of `keys` concurrently, as sweep.py does."""
+        keys = [k for k in dict.fromkeys(keys) if k not in self.binaries]
+        if not keys:
+            return
+        make_jobs = max(1, self.jobs // len(keys))
+        with ThreadPoolExecutor(max_workers=max(1, min(self.jobs, len(keys)))) as pool:
+            for key, (binary, built) in zip(keys, pool.map(lambda k: build_binary(k, self.build_root, make_jobs), keys)):
+                self.binaries[key] = binary
+                print(f"{'built ' if built else 'reused'} {binary}")
+
+    def digest(self, key):
+        if key not in self.digests:
+            self.digests[key] = build_hash(key)
+        return self.digests[key]
+
+    def evaluate(self, candidates, budget):
+        """IPC of each candidate (params dict, or None for the baseline) on every trace at `budget`."""
+        todo, records = [], {}
+        for params in candidates:
+            key = self.key(params)
+            for trace, path in self.traces.items():
+                ckey = (self.digest(key), path, self.warmup, budget)
+                rec = self.cache.get(ckey)
+                if rec is None:
+                    todo.append((params, key, trace, path, ckey))
+                else:
+                    records[(name(params) if params is not None else BASELINE, trace)] = rec
+        if self.dry_run:
+            for params, key, trace, _, _ in todo:
+                print(f"  would run {name(params) if params is not None else BASELINE} on {trace} at {budget}")
+            return pd.DataFrame()
+        self.build(t[1] for t in todo)
+
+        def simulate(item):
+            params, key, trace, path, ckey = item
+            run = {'trace_folder': trace, 'log': f"{build_id(key, ckey[0])}-{budget}.txt", 'trace': path,
+                   'warmup_instructions': self.warmup, 'simulation_instructions': budget}
+            status, elapsed = run_sim(run, self.binaries[key], os.path.join(self.search_dir, 'logs'),
+                                      trace_cache=self.trace_cache)
+            if status != 'done':
+                print(f"WARNING: {trace} {name(params) if params is not None else BASELINE} at {budget}: {status}")
+                return item, None
+            rec = parse_file(os.path.join(self.search_dir, 'logs', trace, run['log']))
+            rec['wall_sec'] = elapsed
+            return item, rec
+
+        with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as pool:
+            for (params, key, trace, path, ckey), rec in pool.map(simulate, todo):
+                self.simulated += 1
+                if rec is None: continue
+                self.cache.put(ckey, rec)
+                records[(name(params) if params is not None else BASELINE, trace)] = rec
+        rows = [{'variant': v, 'trace_folder': t, 'ipc': rec.get('ipc')} for (v, t), rec in records.items()]
+        return pd.DataFrame(rows, columns=['variant', 'trace_folder', 'ipc'])
+
+    def score(self, candidates, budget):
+        """{name: geomean speedup over the baseline} at `budget` (NaN for failed candidates)."""
+        df = self.evaluate([None] + candidates, budget)
+        if df.empty:
+            return {name(p): float('nan') for p in candidates}
+        sp = geomean(normalize(pivot(df, 'ipc'), BASELINE))
+        scores = {name(p): float(sp.get(name(p), float('nan'))) for p in candidates}
+        for p in candidates:
+            self.scores.append(dict(p, candidate=name(p), budget=budget, geomean_speedup=scores[name(p)]))
+        return scores
+
+    def successive_halving(self, candidates, budgets, eta):
+        for i, budget in enumerate(budgets):
+            t0 = time.time()
+            scores = self.score(candidates, budget)
+            if self.dry_run:
+                return candidates[0], float('nan')
+            ranked = sorted(candidates, key=lambda p: math.inf if math.isnan(scores[name(p)]) else -scores[name(p)])
+            print(f"  rung {i}: {len(candidates)} candidates at {budget} instructions ({time.time() - t0:.0f} s), "
+                  f"best {name(ranked[0])} = {scores[name(ranked[0])]:.4f}")
+            if i == len(budgets) - 1:
+                return ranked[0], scores[name(ranked[0])]
+            candidates = ranked[:max(1, len(candidates) // eta)]
+
+    def run(self, method='hyperband', n=None, min_budget=1000000, max_budget=25000000, eta=3, seed=0):
+        grid = candidate_grid(self.cfg.get('space') or {})
+        rng = random.Random(seed)
+        budgets = rungs(min_budget, max_budget, eta)
+        if method == 'sh':
+            brackets = [(min(n or len(grid), len(grid)), budgets)]
+        else:
+            s_max = len(budgets) - 1
+            brackets = [(min(len(grid), math.ceil((s_max + 1) / (s + 1) * eta ** s)), budgets[s_max - s:])
+                        for s in range(s_max, -1, -1)]
+        best = []
+        for b, (size, bracket_budgets) in enumerate(brackets):
+            candidates = rng.sample(grid, size)
+            print(f"Bracket {b}: {size} candidates, budgets {', '.join(map(str, bracket_budgets))}")
+            best.append(self.successive_halving(candidates, bracket_budgets, eta))
+        return best
+
+    def save(self):
+        board = pd.DataFrame(self.scores)
+        if not board.empty:
+            board = board.drop_duplicates(['candidate', 'budget']).sort_values(
+                ['budget', 'geomean_speedup'], ascending=[False, False])
+            board.to_csv(os.path.join(self.search_dir, 'leaderboard.csv'), index=False)
+        return board
+
+def main(config_path, search_dir, build_root, jobs, method, dry_run, trace_cache=None):
+    cfg = load_config(config_path)
+    search = Search(cfg, search_dir, build_root, jobs, dry_run, trace_cache)
+    t0 = time.time()
+    best = search.run(method or cfg.get('method', 'hyperband'), cfg.get('candidates'),
+                      int(cfg.get('min_budget', 1000000)), int(cfg.get('max_budget', 25000000)),
+                      int(cfg.get('eta', 3)), cfg.get('seed', 0))
+    search.cache.close()
+    if dry_run:
+        return 0
+    board = search.save()
+    print(f"\nSearch finished in {time.time() - t0:.0f} s: {search.simulated} simulations run, "
+          f"{search.cache.hits} results reused from {os.path.join(search_dir, 'results.sqlite')}")
+    if trace_cache is not None:
+        print(trace_cache.summary())
+    top = max(best, key=lambda x: -math.inf if math.isnan(x[1]) else x[1])
+    print(f"Best: {name(top[0])} (geomean speedup {top[1]:.4f} at {int(cfg.get('max_budget', 25000000))} instructions)")
+    if not board.empty:
+        print(board.head(10).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    return 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('config', help='Search config (.json/.yaml)')
+    parser.add_argument('--search-dir', default='search_out', help='Logs, result cache and leaderboard go here')
+    parser.add_argument('--build-dir', default='./build', help='Root of the per-binary build directories')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Concurrent simulations')
+    parser.add_argument('--method', choices=['sh', 'hyperband'], default=None,
+                        help='Successive halving or Hyperband (default: the config\'s "method", else hyperband)')
+    parser.add_argument('--dry-run', action='store_true', help='Print the first rung of every bracket only')
+    parser.add_argument('--trace-cache', default=None, help='Decompress each trace once into this shared cache directory')
+    parser.add_argument('--trace-cache-budget', default=None, help='Disk budget of the trace cache, e.g. 200G (default: unbounded)')
+    args = parser.parse_args()
+    trace_cache = None
+    if args.trace_cache:
+        from trace_cache import TraceCache, parse_size
+        budget = parse_size(args.trace_cache_budget) if args.trace_cache_budget else None
+        trace_cache = TraceCache(args.trace_cache, budget)
+    sys.exit(main(args.config, args.search_dir, args.build_dir, args.jobs, args.method, args.dry_run, trace_cache))
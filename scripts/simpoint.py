@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+simpoint.py
+
+SimPoint-weighted results for benchmarks simulated as several slices.
+
+Each output/<trace_folder> is one slice: a short SimPoint region of a
+benchmark, run like any other trace. A slice carries the benchmark it belongs
+to and its SimPoint weight (the fraction of the benchmark's execution its
+cluster stands for), taken from, in order of preference:
+
+ - a --weights file, CSV with columns trace_folder, weight and optionally
+   benchmark, or JSON/YAML of the form {"<benchmark>": {"<trace_folder>": weight}};
+ - `benchmark` and `weight` fields of the manifest runs (sweep.py copies them
+   from trace entries written as {"path": ..., "benchmark": ..., "weight": ...}),
+   read from --manifest, or else from the results the parser joined them into.
+   Only a weights file or the manifest knows about slices that have no log.
+
+A slice without a benchmark is attributed to benchmark_of(trace_folder), i.e.
+'602.gcc_s-734B' -> '602.gcc_s'.
+
+Per (benchmark, variant), over the slices with a result (positive IPC), in
+one group-by:
+
+    CPI       = sum_i w_i CPI_i / sum_i w_i        IPC = 1 / CPI
+    MPKI      = sum_i w_i MPKI_i / sum_i w_i
+    accuracy  = sum_i w_i useful_i / n_i  /  sum_i w_i issued_i / n_i
+
+(n_i = slice instructions, so slices of different lengths count by weight
+only). Weights are renormalized over the slices present, and missing_weight
+reports the part of the benchmark's listed weight that has no result: a
+benchmark at missing_weight 0.3 is extrapolated from 70% of its execution.
+With --baseline, speedup is the baseline's weighted CPI over the variant's,
+both over the slices the two have in common, so a slice missing on one side
+does not bias it; benchmarks above --max-missing are left out of the geomean.
+
+Usage:
+    python3 scripts/simpoint.py --weights simpoints.csv --baseline baseline_noninc
+    python3 scripts/simpoint.py --manifest experiments.json --baseline baseline_noninc --variants table64
+    python3 scripts/simpoint.py --source outputs_parsed_all.parquet --max-missing 0.1 --save-csv benchmarks.csv
+"""
+import os, re, sys, json, argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from results_store import load_results, with_baseline
+from speedup import pivot, geomean
+from manifest import load_manifest
+
+MPKI = ('l1d_mpki', 'l2_mpki', 'llc_mpki')
+re_slice = re.compile(r'[-_.](\d+B?)$')
+
+def benchmark_of(name):
+    """'602.gcc_s-734B' -> '602.gcc_s'; names without a slice suffix are their own benchmark."""
+    return re_slice.sub('', name) or name
+
+def load_weights(path):
+    """(trace_folder, benchmark, weight) frame from a CSV, JSON or YAML weights file."""
+    if path.endswith('.csv'):
+        w = pd.read_csv(path)
+    else:
+        with open(path) as f:
+            if path.endswith(('.yaml', '.yml')):
+                import yaml
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        w = pd.DataFrame([{'benchmark': b, 'trace_folder': s, 'weight': x}
+                          for b, slices in data.items() for s, x in slices.items()])
+    missing = [c for c in ('trace_folder', 'weight') if c not in w]
+    if missing:
+        raise SystemExit(f"{path} has no {', '.join(missing)} column")
+    return slice_weights(w)
+
+def slice_weights(df):
+    """One (trace_folder, benchmark, weight) row per slice from a frame with trace_folder/weight columns."""
+    w = df.drop_duplicates('trace_folder').copy()
+    if 'benchmark' not in w:
+        w['benchmark'] = None
+    w['benchmark'] = w['benchmark'].where(w['benchmark'].notna(), w['trace_folder'].map(benchmark_of))
+    w['weight'] = pd.to_numeric(w['weight'], errors='coerce')
+    bad = w['weight'].isna() | (w['weight'] < 0)
+    if bad.any():
+        print(f"WARNING: {int(bad.sum())} slices have no usable weight and are left out, e.g. "
+              f"{w.loc[bad, 'trace_folder'].iloc[0]}")
+    return w.loc[~bad, ['trace_folder', 'benchmark', 'weight']].reset_index(drop=True)
+
+def aggregate(df, weights, baseline=None):
+    """One row per (benchmark, variant): weighted IPC/CPI, MPKI, prefetch accuracy and weight coverage."""
+    df = df.drop(columns=[c for c in ('benchmark', 'weight') if c in df]) \
+           .merge(weights, on='trace_folder', how='inner')
+    df = df[df['ipc'].astype(float) > 0].copy()
+    w = df['weight'].astype(float)
+    df['cpi'] = 1 / df['ipc'].astype(float)
+    sums = {'w': w, 'w_cpi': w * df['cpi'], 'slices': pd.Series(1, index=df.index)}
+    for m in MPKI:
+        if m in df:
+            x = df[m].astype(float)
+            sums[f"w_{m}"], sums[f"n_{m}"] = w * x.fillna(0), w.where(x.notna(), 0)
+    if 'prefetch_issued' in df:
+        n = df['instructions'].astype(float) if 'instructions' in df else pd.Series(1.0, index=df.index)
+        issued, useful = df['prefetch_issued'].astype(float) / n, df['prefetch_useful'].astype(float) / n
+        counted = issued.notna() & useful.notna()
+        sums['w_issued'], sums['w_useful'] = (w * issued).where(counted, 0), (w * useful).where(counted, 0)
+    if baseline is not None:
+        paired = with_baseline(df, baseline, metrics=('ipc',))['base_ipc'].astype(float).to_numpy()
+        common = paired > 0
+        sums['c_cpi'] = (w * df['cpi']).where(common, 0)
+        sums['c_base_cpi'] = pd.Series(np.where(common, w / np.where(common, paired, 1), 0), index=df.index)
+    g = pd.DataFrame(sums).join(df[['benchmark', 'variant']]).groupby(['benchmark', 'variant']).sum()
+    out = pd.DataFrame(index=g.index)
+    out['cpi'] = g['w_cpi'] / g['w']
+    out['ipc'] = 1 / out['cpi']
+    for m in MPKI:
+        if f"w_{m}" in g:
+            out[m] = g[f"w_{m}"] / g[f"n_{m}"].where(g[f"n_{m}"] > 0)
+    if 'w_issued' in g:
+        out['prefetch_accuracy'] = g['w_useful'] / g['w_issued'].where(g['w_issued'] > 0)
+    if baseline is not None:
+        out['speedup'] = g['c_base_cpi'] / g['c_cpi'].where(g['c_cpi'] > 0)
+    total = weights.groupby('benchmark').agg(weight_total=('weight', 'sum'), slices_total=('weight', 'size'))
+    out['slices'] = g['slices']
+    out = out.join(total, on='benchmark')
+    out['weight_present'] = g['w']
+    out['missing_weight'] = (1 - g['w'] / out['weight_total'].where(out['weight_total'] > 0)).clip(lower=0)
+    return out.reset_index()
+
+def summarize(bench, max_missing=0.0):
+    """Per-variant geomean speedup over benchmarks with at most `max_missing` of their weight missing."""
+    ok = bench[bench['missing_weight'] <= max_missing + 1e-9]
+    # variants whose every benchmark is left out still get a row
+    sp = pivot(ok, 'speedup', index='benchmark').reindex(columns=sorted(bench['variant'].unique()))
+    out = pd.DataFrame({'geomean_speedup': geomean(sp), 'benchmarks': sp.notna().sum(),
+                        'left_out': bench.groupby('variant')['benchmark'].size().reindex(sp.columns, fill_value=0)
+                                    - sp.notna().sum()})
+    out.index.name = 'variant'
+    return out.sort_values('geomean_speedup', ascending=False)
+
+def main(source, weights_path, manifest_path, baseline, variants, max_missing, save_csv):
+    df = load_results(source)
+    if variants:
+        df = df[df['variant'].isin(variants + ([baseline] if baseline else []))]
+    if weights_path:
+        weights = load_weights(weights_path)
+    elif manifest_path:
+        runs = load_manifest(manifest_path).frame()
+        if 'weight' not in runs:
+            raise SystemExit(f"{manifest_path} gives no run a weight")
+        weights = slice_weights(runs[runs['weight'].notna()])
+    elif 'weight' in df:
+        weights = slice_weights(df[df['weight'].notna()])
+    else:
+        raise SystemExit("No slice weights: pass --weights, or give the manifest runs benchmark/weight fields")
+    bench = aggregate(df, weights, baseline)
+    if bench.empty:
+        raise SystemExit("No weighted slices have results.")
+    cols = ['benchmark', 'variant', 'ipc', 'cpi', *[m for m in MPKI if m in bench],
+            *[c for c in ('prefetch_accuracy', 'speedup') if c in bench], 'slices', 'slices_total', 'missing_weight']
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(bench[cols].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    incomplete = bench[bench['missing_weight'] > 0]
+    if len(incomplete):
+        worst = incomplete.groupby('benchmark')['missing_weight'].max().sort_values(ascending=False)
+        print(f"\nWARNING: {len(worst)} benchmarks are missing slices, e.g. "
+              + ', '.join(f"{b} ({x:.0%} of weight)" for b, x in worst.head(5).items()))
+    if baseline:
+        print(f"\nSpeedup over {baseline}, benchmarks with at most {max_missing:.0%} of their weight missing:")
+        print(summarize(bench, max_missing).to_string(float_format=lambda x: f"{x:.4f}"))
+    if save_csv:
+        bench.to_csv(save_csv, index=False)
+        print(f"Saved per-benchmark results to {save_csv}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', default=None,
+                        help='Parquet store or CSV (default: outputs_parsed_all.parquet, else outputs_parsed_all.csv)')
+    parser.add_argument('--weights', default=None, help='Slice weights (.csv/.json/.yaml); default: the results\' weight column')
+    parser.add_argument('--manifest', default=None, help='Experiment manifest whose runs carry benchmark/weight fields')
+    parser.add_argument('--baseline', default=None, help='Variant to compute weighted speedups against')
+    parser.add_argument('--variants', default=None, help='Comma-separated variants to keep (default: all)')
+    parser.add_argument('--max-missing', type=float, default=0.0,
+                        help='Leave benchmarks missing more than this fraction of their weight out of the geomean')
+    parser.add_argument('--save-csv', default=None, help='Write the per-(benchmark, variant) table to this CSV')
+    args = parser.parse_args()
+    main(args.source, args.weights, args.manifest, args.baseline, args.variants.split(',') if args.variants else None,
+         args.max_missing, args.save_csv)
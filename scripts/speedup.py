@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+speedup.py
+
+Vectorized speedup / normalization engine over parsed results.
+
+Results are pivoted into a (trace x variant) matrix per metric, and every
+variant is normalized against a chosen baseline variant in one broadcast
+division. On top of that:
+
+ - geometric-mean speedup per variant across traces
+ - MPKI deltas against the baseline (absolute and relative)
+ - per-trace rankings of the variants (1 = fastest)
+
+Missing baselines and non-positive baseline IPC give NaN, never 0 or inf, and
+are left out of the geomean; each summary row says how many traces it covers.
+
+Usage:
+    python3 scripts/speedup.py --baseline baseline_noninc --traces-prefix 1st_trace
+    python3 scripts/speedup.py --baseline baseline_exclusive --mpki l2_mpki,llc_mpki --save-csv speedups.csv
+"""
+import os, sys, argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from results_store import load_results
+
+def pivot(df, metric='ipc', index='trace_folder', columns='variant'):
+    """(index x columns) matrix of `metric`.
+
+    Raises ValueError if two rows share an (index, columns) pair, e.g. two logs
+    of a trace labelled with the same variant, rather than keep one of them.
+    """
+    dup = df.duplicated([index, columns], keep=False)
+    if dup.any():
+        first = df.loc[dup].iloc[0]
+        raise ValueError(f"{int(dup.sum())} rows share their ({index}, {columns}) with another row, "
+                         f"e.g. ({first[index]}, {first[columns]})")
+    m = df.pivot(index=index, columns=columns, values=metric)
+    m.columns.name = None
+    return m.astype(float)
+
+def normalize(matrix, baseline):
+    """Divide every column by the `baseline` column in one broadcast.
+
+    Rows whose baseline is missing or not positive come back as NaN. A
+    baseline that no trace has gives an all-NaN matrix.
+    """
+    if baseline not in matrix:
+        return pd.DataFrame(np.nan, index=matrix.index, columns=matrix.columns)
+    return matrix.div(matrix[baseline].where(matrix[baseline] > 0), axis=0)
+
+def geomean(matrix):
+    """Geometric mean of each column over its positive, non-NaN entries."""
+    logs = np.log(matrix.where(matrix > 0))
+    return np.exp(logs.mean(axis=0, skipna=True))
+
+def delta(matrix, baseline):
+    """(absolute, relative) difference of every column from the `baseline` column."""
+    if baseline not in matrix:
+        nan = pd.DataFrame(np.nan, index=matrix.index, columns=matrix.columns)
+        return nan, nan.copy()
+    base = matrix[baseline]
+    absolute = matrix.sub(base, axis=0)
+    relative = absolute.div(base.where(base != 0), axis=0)
+    return absolute, relative
+
+def rank(speedups):
+    """Per-trace rank of each variant by speedup (1 = best; NaN where no speedup)."""
+    return speedups.rank(axis=1, ascending=False, method='min')
+
+def summarize(df, baseline, mpki=('l2_mpki',), variants=None):
+    """One row per variant: geomean/min/max speedup, traces covered, wins and MPKI deltas.
+
+    The baseline is kept whether or not `variants` lists it; a baseline with
+    no results at all raises ValueError instead of giving all-NaN speedups.
+    """
+    ipc = pivot(df, 'ipc')
+    if baseline not in ipc:
+        raise ValueError(f"no {baseline} results to compute speedups against")
+    if variants:
+        ipc = ipc[[baseline] + [v for v in variants if v in ipc and v != baseline]]
+    sp = normalize(ipc, baseline)
+    ranks = rank(sp.drop(columns=baseline, errors='ignore'))
+    out = pd.DataFrame({
+        'geomean_speedup': geomean(sp),
+        'min_speedup': sp.min(),
+        'max_speedup': sp.max(),
+        'traces': sp.notna().sum(),
+        'wins': (ranks == 1).sum().reindex(sp.columns, fill_value=0),
+        'mean_rank': ranks.mean().reindex(sp.columns),
+    })
+    for metric in mpki:
+        if metric not in df: continue
+        absolute, relative = delta(pivot(df, metric).reindex(columns=ipc.columns), baseline)
+        out[f'{metric}_delta'] = absolute.mean()
+        out[f'{metric}_rel_delta'] = relative.mean()
+    out.index.name = 'variant'
+    return out.sort_values('geomean_speedup', ascending=False)
+
+def missing_baseline(df, baseline):
+    """Traces that have no usable (positive IPC) `baseline` run."""
+    ipc = pivot(df, 'ipc')
+    if baseline not in ipc:
+        return list(ipc.index)
+    return list(ipc.index[~(ipc[baseline] > 0)])
+
+def main(source, baseline, traces_prefix, variants, mpki, save_csv):
+    columns = ['trace_folder', 'variant', 'ipc', *mpki]
+    df = load_results(source, columns=columns)
+    if traces_prefix:
+        df = df[df['trace_folder'].str.startswith(traces_prefix)]
+    if df.empty:
+        print("No results to summarize.")
+        return
+    if baseline not in set(df['variant']):
+        raise SystemExit(f"No {baseline} results to compute speedups against.")
+    lacking = missing_baseline(df, baseline)
+    if lacking:
+        print(f"WARNING: {len(lacking)} traces have no {baseline} run and are left out: {', '.join(lacking)}")
+    sp = normalize(pivot(df, 'ipc'), baseline)
+    print(f"Speedup over {baseline} (trace x variant):")
+    print(sp.to_string(float_format=lambda x: f"{x:.4f}"))
+    summary = summarize(df, baseline, mpki, variants)
+    print("\nAcross traces:")
+    with pd.option_context('display.width', 160, 'display.max_columns', None):
+        print(summary.to_string(float_format=lambda x: f"{x:.4f}"))
+    if save_csv:
+        summary.to_csv(save_csv)
+        print(f"Saved summary to {save_csv}")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', default=None,
+                        help='Parquet store or CSV (default: outputs_parsed_all.parquet, else outputs_parsed_all.csv)')
+    parser.add_argument('--baseline', default='baseline_noninc', help='Variant every other variant is normalized to')
+    parser.add_argument('--traces-prefix', default=None, help='Only traces whose folder starts with this (e.g. 1st_trace)')
+    parser.add_argument('--variants', default=None, help='Comma-separated variants to keep (default: all)')
+    parser.add_argument('--mpki', default='l2_mpki', help='Comma-separated MPKI columns to report deltas for')
+    parser.add_argument('--save-csv', default=None, help='Write the per-variant summary to this CSV')
+    args = parser.parse_args()
+    main(args.source, args.baseline, args.traces_prefix,
+         args.variants.split(',') if args.variants else None,
+         [m for m in args.mpki.split(',') if m], args.save_csv)
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+sweep.py
+
+Parallel build-and-run driver for ChampSim sweeps.
+
+A sweep config (JSON or YAML) gives a matrix of hierarchy x L2C prefetcher x
+table size x traces:
+
+    {
+      "warmup_instructions": 25000000,
+      "simulation_instructions": 25000000,
+      "traces": {"trace1": "../traces/trace1.champsimtrace.xz",
+                 "trace2": "../traces/trace2.champsimtrace.xz"},
+      "matrix": [
+        {"hierarchy": ["non_inclusive_cache"], "l2c_prefetcher": ["no", "offset_prefetcher"],
+         "table_size": [32, 64, 128]},
+        {"hierarchy": ["exclusive_cache"], "l2c_prefetcher": ["no", "offset_prefetcher_exclusive"],
+         "table_size": [32, 64, 128]}
+      ]
+    }
+
+Top-level keys are defaults for every "matrix" entry (without "matrix" the top
+level is the only entry). Each list is crossed with the others; table_size is
+only crossed with real prefetchers, since it is a runtime knob (OFFSET_TABLE)
+that a "no" build ignores. Optional keys: replacement (LLC policy, default
+lru), branch (default hashed_perceptron), num_cores (default 1), trace_folder
+(format string, default "{trace}"), and pf_params, a map from offset
+prefetcher knob (PF_PARAMS) to value or list of values, crossed like the
+rest and compiled into the binary as OFFSET_PF_<NAME> defines. A trace may
+also be given as {"path": ..., "benchmark": ..., "weight": ...}, a SimPoint
+slice of a benchmark; benchmark and weight go into its manifest runs for
+simpoint.py.
+
+Every distinct (hierarchy, prefetcher, replacement, branch, cores) binary is
+built once, in its own copy of the sources under build/<id>/ with its own
+src/cache.cc and obj/, so builds never touch the working tree and can run
+concurrently. A build is skipped when its stamp matches the hash of its
+inputs. Simulations then run on a pool of --jobs workers (default: one per
+core). Each writes output/<trace_folder>/<variant>.txt.part and renames it on
+success, so a re-run resumes by skipping logs that are already complete. With
+--prune-margin, prefetcher runs that their baseline beats by more than the
+margin are stopped early (see prune.py). With --trace-cache, each trace is
+decompressed once into a shared cache and every run reads the raw copy (see
+trace_cache.py). With --checkpoints, the warmup of each (traces, hierarchy,
+replacement, branch, cores, warmup length) is simulated once by the
+no-prefetcher binary and saved (ChampSim -save_checkpoint); every prefetcher
+variant then restores it (-restore_checkpoint) and simulates only the ROI.
+Prefetchers start the ROI untrained and the pipeline starts empty, so IPC
+moves slightly against a full warmup (by 0.02-0.04% on a test trace).
+The runs are merged into the experiment manifest (see manifest.py) so the
+parser joins them by exact key.
+
+Usage:
+    python3 scripts/sweep.py sweep.json --dry-run
+    python3 scripts/sweep.py sweep.json --jobs 32 --output-dir ./output --manifest experiments.json
+    python3 scripts/sweep.py sweep.json --prune-margin 0.05
+    python3 scripts/sweep.py sweep.json --trace-cache /scratch/trace_cache --trace-cache-budget 200G
+    python3 scripts/sweep.py sweep.json --checkpoints /scratch/checkpoints
+"""
+import os, sys, json, shutil, hashlib, argparse, itertools, subprocess, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from manifest import Manifest, load_manifest, save_manifest, variant_name
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_DIRS = ('src', 'inc', 'branch', 'prefetcher', 'replacement')
+BUILD_FIELDS = ('hierarchy', 'l2c_prefetcher', 'replacement', 'branch', 'num_cores')
+# compile-time knobs of the offset prefetchers, injected as #define OFFSET_PF_<NAME>
+PF_PARAMS = ('DEFAULT_TABLE_SIZE', 'TOPK', 'CONF_THRESH', 'FREQ_MIN_FOR_USE', 'RECENT_DEMAND_MAX')
+SWEEP_DEFAULTS = {'hierarchy': 'non_inclusive_cache', 'l2c_prefetcher': 'no', 'table_size': None,
+                  'replacement': 'lru', 'branch': 'hashed_perceptron', 'num_cores': 1,
+                  'trace_folder': '{trace}'}
+# SimPoint slice fields a trace entry may carry into its runs (see simpoint.py)
+SLICE_FIELDS = ('benchmark', 'weight')
+COMPLETE_MARKER = 'ChampSim completed all CPUs'
+
+def load_config(path):
+    with open(path) as f:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
+
+def _as_list(v):
+    return list(v) if isinstance(v, (list, tuple)) else [v]
+
+def expand_runs(cfg):
+    """Expand a sweep config into manifest-style run dicts (deterministic order)."""
+    top = {k: v for k, v in cfg.items() if k != 'matrix'}
+    runs, seen = [], {}
+    for entry in cfg.get('matrix') or [{}]:
+        spec = dict(SWEEP_DEFAULTS, **top, **entry)
+        traces = spec['traces']
+        for hierarchy, pf, repl in itertools.product(
+                _as_list(spec['hierarchy']), _as_list(spec['l2c_prefetcher']), _as_list(spec['replacement'])):
+            sizes = [None] if pf == 'no' else _as_list(spec['table_size'])
+            params = [None] if pf == 'no' else pf_param_grid(spec.get('pf_params'))
+            for size, pf_params, trace in itertools.product(sizes, params, traces):
+                entry_trace = traces[trace] if isinstance(traces[trace], dict) else {'path': traces[trace]}
+                run = {'trace_folder': spec['trace_folder'].format(trace=trace), 'trace': entry_trace['path'],
+                       'hierarchy': hierarchy, 'l2c_prefetcher': pf, 'replacement': repl,
+                       'branch': spec['branch'], 'num_cores': int(spec['num_cores']),
+                       'warmup_instructions': int(spec['warmup_instructions']),
+                       'simulation_instructions': int(spec['simulation_instructions'])}
+                if size is not None:
+                    run['table_size'] = int(size)
+                if pf_params:
+                    run['pf_params'] = pf_params
+                run.update((k, entry_trace[k]) for k in SLICE_FIELDS if k in entry_trace)
+                run['variant'] = variant_name(run)
+                run['log'] = run['variant'] + '.txt'
+                key = (run['trace_folder'], run['log'])
+                if key in seen:
+                    if seen[key] == run:
+                        continue  # listed twice by overlapping matrix entries
+                    raise ValueError(f"two different runs map to {key[0]}/{key[1]}; "
+                                     f"split them with distinct trace_folder formats")
+                seen[key] = run
+                runs.append(run)
+    return runs
+
+def pf_param_grid(spec):
+    """{'CONF_THRESH': [2, 3], 'TOPK': 4} -> [{'CONF_THRESH': 2, 'TOPK': 4}, {'CONF_THRESH': 3, 'TOPK': 4}]."""
+    if not spec:
+        return [None]
+    unknown = set(spec) - set(PF_PARAMS)
+    if unknown:
+        raise ValueError(f"unknown pf_params {', '.join(sorted(unknown))}; known: {', '.join(PF_PARAMS)}")
+    names = sorted(spec)
+    return [dict(zip(names, map(int, values))) for values in itertools.product(*(_as_list(spec[n]) for n in names))]
+
+def build_key(run):
+    """Hashable build configuration; prefetcher parameters only appear when set, so plain keys keep their hash."""
+    key = tuple(run[k] for k in BUILD_FIELDS)
+    params = tuple(sorted((run.get('pf_params') or {}).items()))
+    return key + (params,) if params else key
+
+def selections(key):
+    """(source, target) copies that pick the components, as build_champsim.sh does."""
+    hierarchy, pf, repl, branch, cores = key[:5]
+    sel = [(f'branch/{branch}.bpred', 'branch/branch_predictor.cc'),
+           (f'prefetcher/{pf}.l2c_pref', 'prefetcher/l2c_prefetcher.cc'),
+           (f'replacement/{repl}.llc_repl', 'replacement/llc_replacement.cc')]
+    for level in ('l1i', 'l1d', 'llc', 'itlb', 'dtlb', 'stlb'):
+        sel.append((f'prefetcher/no.{level}_pref', f'prefetcher/{level}_prefetcher.cc'))
+    for level in ('btb', 'l1i', 'l1d', 'l2c', 'itlb', 'dtlb', 'stlb'):
+        sel.append((f'replacement/lru.{level}_repl', f'replacement/{level}_replacement.cc'))
+    return sel
+
+def build_inputs(key, root=ROOT):
+    """Files a build depends on, as (path relative to the build dir, source path).
+
+    The component files the build scripts overwrite in place (src/cache.cc,
+    prefetcher/l2c_prefetcher.cc, ...) are not read from the working tree, so
+    running build_champsim.sh does not invalidate sweep builds.
+    """
+    generated = {dst for _, dst in selections(key)} | {'src/cache.cc'}
+    files = [('Makefile', os.path.join(root, 'Makefile')),
+             ('src/cache.cc', os.path.join(root, 'cache_hierarchies', f'{key[0]}.cc'))]
+    for d in SOURCE_DIRS:
+        for dirpath, _, names in os.walk(os.path.join(root, d)):
+            for n in sorted(names):
+                rel = os.path.relpath(os.path.join(dirpath, n), root)
+                if rel not in generated:
+                    files.append((rel, os.path.join(dirpath, n)))
+    return sorted(files)
+
+_BUILD_HASHES = {}   # (key, root) -> hash; every run and checkpoint of a build key shares it
+
+def build_hash(key, root=ROOT):
+    """Hash of a build key and its input files, read once per key in this process."""
+    if (key, root) not in _BUILD_HASHES:
+        h = hashlib.sha1(repr(key).encode())
+        for rel, src in build_inputs(key, root):
+            h.update(rel.encode())
+            with open(src, 'rb') as f:
+                h.update(f.read())
+        _BUILD_HASHES[key, root] = h.hexdigest()
+    return _BUILD_HASHES[key, root]
+
+def build_id(key, digest):
+    hierarchy, pf, repl, branch, cores = key[:5]
+    return f"{hierarchy}-{pf}-{repl}-{branch}-{cores}core-{digest[:10]}"
+
+def build_binary(key, build_root, make_jobs=1, root=ROOT):
+    """Build (or reuse) the binary for one build key; returns its path."""
+    digest = build_hash(key, root)
+    bdir = os.path.join(build_root, build_id(key, digest))
+    binary = os.path.join(bdir, 'bin', 'champsim')
+    stamp = os.path.join(bdir, 'BUILD_STAMP')
+    if os.path.exists(binary) and os.path.exists(stamp) and open(stamp).read().strip() == digest:
+        return binary, False
+    cores, params = key[4], key[5] if len(key) > 5 else ()
+    os.makedirs(bdir, exist_ok=True)
+    for rel, src in build_inputs(key, root):
+        dst = os.path.join(bdir, rel)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        shutil.copyfile(src, dst)
+    # same component selection as build_champsim.sh, but inside the private copy
+    for src, dst in selections(key):
+        src_path = os.path.join(bdir, src)
+        if not os.path.exists(src_path):
+            raise FileNotFoundError(f"cannot find {src} for build {build_id(key, digest)}")
+        shutil.copyfile(src_path, os.path.join(bdir, dst))
+    if cores != 1:
+        header = os.path.join(bdir, 'inc', 'champsim.h')
+        with open(header) as f:
+            text = f.read()
+        with open(header, 'w') as f:
+            f.write(text.replace('#define NUM_CPUS 1\n', f'#define NUM_CPUS {cores}\n'))
+    if params:
+        pf_path = os.path.join(bdir, 'prefetcher', 'l2c_prefetcher.cc')
+        with open(pf_path) as f:
+            text = f.read()
+        with open(pf_path, 'w') as f:
+            f.writelines(f"#define OFFSET_PF_{name} {value}\n" for name, value in params)
+            f.write(text)
+    with open(os.path.join(bdir, 'build.log'), 'w') as log:
+        subprocess.run(['make', 'clean'], cwd=bdir, stdout=log, stderr=subprocess.STDOUT)
+        proc = subprocess.run(['make', f'-j{make_jobs}'], cwd=bdir, stdout=log, stderr=subprocess.STDOUT)
+    if proc.returncode != 0 or not os.path.exists(binary):
+        raise RuntimeError(f"build failed, see {os.path.join(bdir, 'build.log')}")
+    with open(stamp, 'w') as f:
+        f.write(digest + '\n')
+    return binary, True
+
+def is_complete(path, tail_bytes=1 << 20, markers=(COMPLETE_MARKER,)):
+    """True if a log exists and ChampSim reported completing all CPUs (or one of `markers` is in its tail)."""
+    if not os.path.exists(path):
+        return False
+    with open(path, 'rb') as f:
+        f.seek(max(0, os.path.getsize(path) - tail_bytes))
+        tail = f.read()
+    return any(m.encode() in tail for m in markers)
+
+def sim_command(run, binary):
+    cmd = [binary, '-warmup_instructions', str(run['warmup_instructions']),
+           '-simulation_instructions', str(run['simulation_instructions'])]
+    for flag in ('save_checkpoint', 'restore_checkpoint'):
+        if run.get(flag):
+            cmd += ['-' + flag, run[flag]]
+    cmd += ['-traces'] + _as_list(run['trace'])
+    env = dict(os.environ)
+    env.pop('OFFSET_TABLE', None)       # a table size from the caller's shell would silently apply to every run
+    if run.get('table_size'):
+        env['OFFSET_TABLE'] = str(run['table_size'])
+    return cmd, env
+
+def checkpoint_base(run):
+    """The no-prefetcher run whose warmup a checkpoint holds; every L2C prefetcher variant can restore it."""
+    base = {k: v for k, v in run.items() if k not in ('table_size', 'pf_params', 'restore_checkpoint')}
+    return dict(base, l2c_prefetcher='no')
+
+def checkpoint_path(run, checkpoint_dir, root=ROOT):
+    """Checkpoint file of a run's (traces, hierarchy, replacement, branch, cores, warmup).
+
+    The name includes the hash of the no-prefetcher build, so a source change
+    gives new checkpoints instead of restoring stale ones.
+    """
+    key = build_key(checkpoint_base(run))
+    traces = _as_list(run['trace'])
+    h = hashlib.sha1(repr((build_hash(key, root), traces, run['warmup_instructions'])).encode()).hexdigest()
+    name = '+'.join(os.path.basename(t).split('.')[0] for t in traces)
+    return os.path.join(os.path.abspath(checkpoint_dir),
+                        f"{name}-{build_id(key, h)}-w{run['warmup_instructions']}.ckpt")
+
+def make_checkpoint(run, binary, path, root=ROOT, trace_cache=None):
+    """Warm up once with the no-prefetcher binary and save the state to `path`; returns (status, seconds)."""
+    if trace_cache is not None:
+        traces = [os.path.join(root, t) for t in _as_list(run['trace'])]
+        with trace_cache.lease(traces) as paths:
+            return make_checkpoint(dict(run, trace=paths), binary, path, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cmd, env = sim_command(dict(checkpoint_base(run), save_checkpoint=path), binary)
+    t0 = time.time()
+    with open(path + '.log', 'w') as out:
+        out.write(f"$ {' '.join(cmd)}\n")
+        out.flush()
+        proc = subprocess.run(cmd, cwd=root, env=env, stdout=out, stderr=subprocess.STDOUT)
+    if proc.returncode == 0 and os.path.exists(path):
+        return 'done', time.time() - t0
+    return f"failed (exit {proc.returncode}, see {path}.log)", time.time() - t0
+
+def run_sim(run, binary, output_dir, root=ROOT, pruner=None, trace_cache=None):
+    """Run one simulation into output/<trace_folder>/<log>; returns (status, seconds).
+
+    With a prune.Pruner the log is checked every pruner.interval seconds, and a
+    run dominated by its baseline is killed and kept as a pruned log. With a
+    trace_cache.TraceCache the run reads its traces from the cache.
+    """
+    if trace_cache is not None:
+        traces = [os.path.join(root, t) for t in _as_list(run['trace'])]
+        with trace_cache.lease(traces) as paths:
+            cached = dict(run, trace=paths if isinstance(run['trace'], (list, tuple)) else paths[0])
+            return run_sim(cached, binary, output_dir, root, pruner)
+    final = os.path.join(output_dir, run['trace_folder'], run['log'])
+    part = final + '.part'
+    os.makedirs(os.path.dirname(final), exist_ok=True)
+    cmd, env = sim_command(run, binary)
+    t0 = time.time()
+    with open(part, 'w') as out:
+        prefix = f"OFFSET_TABLE={env['OFFSET_TABLE']} " if run.get('table_size') else ''
+        out.write(f"$ {prefix}{' '.join(cmd)}\n")
+        out.flush()
+        proc = subprocess.Popen(cmd, cwd=root, env=env, stdout=out, stderr=subprocess.STDOUT)
+        pruned = None
+        while pruned is None:
+            try:
+                proc.wait(timeout=pruner.interval if pruner else None)
+                break
+            except subprocess.TimeoutExpired:
+                pruned = pruner.check(run, part)
+        if pruned:
+            proc.terminate()
+            proc.wait()
+            out.writelines(pruned)
+    elapsed = time.time() - t0
+    if pruned:
+        os.replace(part, final)
+        return f"pruned ({pruned[0].strip()})", elapsed
+    if proc.returncode == 0 and is_complete(part):
+        os.replace(part, final)
+        return 'done', elapsed
+    return f'failed (exit {proc.returncode}, log kept at {part})', elapsed
+
+def update_manifest(path, runs):
+    """Merge sweep runs into the manifest at `path` (sweep entries replace same-key runs)."""
+    existing = load_manifest(path).runs if os.path.exists(path) else []
+    new_keys = {(r['trace_folder'], r['log']) for r in runs}
+    merged = [r for r in existing if (r['trace_folder'], r['log']) not in new_keys] + runs
+    save_manifest(Manifest(merged), path)
+
+def main(config_path, output_dir, build_root, manifest_path, jobs, dry_run, force, prune=None,
+         trace_cache=None, checkpoint_dir=None):
+    runs = expand_runs(load_config(config_path))
+    keys = sorted({build_key(r) for r in runs})
+    markers = (COMPLETE_MARKER,)
+    pruner = None
+    if prune:
+        from prune import Pruner, PRUNED_MARKER
+        markers += (PRUNED_MARKER,)
+        pruner = Pruner(runs, output_dir, **prune)
+    todo = [r for r in runs
+            if force or not is_complete(os.path.join(output_dir, r['trace_folder'], r['log']), markers=markers)]
+    if pruner:
+        todo.sort(key=lambda r: r['l2c_prefetcher'] != 'no')   # baselines first, so there is something to compare with
+    print(f"{len(runs)} runs over {len(keys)} binaries; {len(runs) - len(todo)} already complete, "
+          f"{len(todo)} to run on {jobs} workers")
+    checkpoints = {}    # path -> a run it warms up
+    if checkpoint_dir:
+        todo = [dict(r, restore_checkpoint=checkpoint_path(r, checkpoint_dir)) if r['warmup_instructions'] > 0 else r
+                for r in todo]
+        checkpoints = {r['restore_checkpoint']: r for r in todo if r.get('restore_checkpoint')}
+        missing = [p for p in checkpoints if not os.path.exists(p)]
+        print(f"{len(checkpoints)} warmup checkpoints, {len(missing)} to create")
+        checkpoints = {p: checkpoints[p] for p in missing}
+    if dry_run:
+        for key in sorted(set(keys) | {build_key(checkpoint_base(r)) for r in checkpoints.values()}):
+            print(f"  build {build_id(key, build_hash(key))}")
+        for path, r in checkpoints.items():
+            print(f"  warm  {os.path.basename(path)}")
+        for r in todo:
+            print(f"  run   {r['trace_folder']}/{r['log']}: {' '.join(sim_command(r, '<' + '-'.join(map(str, build_key(r))) + '>')[0])}")
+        return 0
+    if manifest_path:
+        update_manifest(manifest_path, runs)
+        print(f"Updated manifest {manifest_path}")
+
+    needed = sorted({build_key(r) for r in todo} | {build_key(checkpoint_base(r)) for r in checkpoints.values()})
+    binaries, failed_builds = {}, {}
+    make_jobs = max(1, jobs // max(1, len(needed)))
+    with ThreadPoolExecutor(max_workers=max(1, min(jobs, len(needed)))) as pool:
+        futures = {pool.submit(build_binary, key, build_root, make_jobs): key for key in needed}
+        for fut in as_completed(futures):
+            key = futures[fut]
+            try:
+                binaries[key], built = fut.result()
+                print(f"{'built ' if built else 'reused'} {binaries[key]}")
+            except Exception as e:
+                failed_builds[key] = str(e)
+                print(f"ERROR: {e}")
+
+    t0 = time.time()
+    if checkpoints:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(make_checkpoint, r, binaries[build_key(checkpoint_base(r))], path,
+                                   trace_cache=trace_cache): path
+                       for path, r in checkpoints.items() if build_key(checkpoint_base(r)) in binaries}
+            for fut in as_completed(futures):
+                status, elapsed = fut.result()
+                print(f"checkpoint {os.path.basename(futures[fut])}: {status} in {elapsed:.0f} s")
+        # runs whose checkpoint could not be made warm up in full, as without --checkpoints
+        todo = [r if os.path.exists(r.get('restore_checkpoint') or '') else
+                {k: v for k, v in r.items() if k != 'restore_checkpoint'} for r in todo]
+
+    failures = pruned = 0
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(run_sim, r, binaries[build_key(r)], output_dir, pruner=pruner, trace_cache=trace_cache): r
+                   for r in todo if build_key(r) in binaries}
+        for i, fut in enumerate(as_completed(futures), 1):
+            r = futures[fut]
+            status, elapsed = fut.result()
+            pruned += status.startswith('pruned')
+            failures += not status.startswith(('done', 'pruned'))
+            print(f"[{i}/{len(futures)}] {r['trace_folder']}/{r['log']}: {status} in {elapsed:.0f} s")
+    skipped = sum(1 for r in todo if build_key(r) in failed_builds)
+    print(f"Sweep finished in {time.time() - t0:.0f} s: {len(todo) - failures - skipped - pruned} done, "
+          f"{pruned} pruned, {failures} failed, {skipped} skipped after failed builds")
+    if trace_cache is not None:
+        print(trace_cache.summary())
+    return 1 if failures or skipped else 0
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('config', help='Sweep config (.json/.yaml)')
+    parser.add_argument('--output-dir', default='./output', help='Where output/<trace>/<variant>.txt logs go')
+    parser.add_argument('--build-dir', default='./build', help='Root of the per-binary build directories')
+    parser.add_argument('--manifest', default='experiments.json', help='Manifest to merge the runs into ("" to skip)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Concurrent builds/simulations')
+    parser.add_argument('--dry-run', action='store_true', help='Print the build and run plan only')
+    parser.add_argument('--force', action='store_true', help='Re-run simulations whose logs are already complete')
+    parser.add_argument('--prune-margin', type=float, default=None,
+                        help='Kill prefetcher runs dominated by their baseline by more than this margin (see prune.py)')
+    parser.add_argument('--prune-z', type=float, default=2.0, help='Standard errors for the pruning upper bound')
+    parser.add_argument('--prune-min-heartbeats', type=int, default=3,
+                        help='Heartbeat intervals compared before a run may be pruned')
+    parser.add_argument('--prune-interval', type=float, default=30, help='Seconds between pruning checks of a run')
+    parser.add_argument('--trace-cache', default=None, help='Decompress each trace once into this shared cache directory')
+    parser.add_argument('--checkpoints', default=None,
+                        help='Warm up once per (traces, hierarchy) into checkpoints in this directory and restore them')
+    parser.add_argument('--trace-cache-budget', default=None, help='Disk budget of the trace cache, e.g. 200G (default: unbounded)')
+    args = parser.parse_args()
+    prune = None if args.prune_margin is None else {
+        'margin': args.prune_margin, 'z': args.prune_z, 'min_heartbeats': args.prune_min_heartbeats,
+        'interval': args.prune_interval}
+    trace_cache = None
+    if args.trace_cache:
+        from trace_cache import TraceCache, parse_size
+        budget = parse_size(args.trace_cache_budget) if args.trace_cache_budget else None
+        trace_cache = TraceCache(args.trace_cache, budget)
+    sys.exit(main(args.config, args.output_dir, args.build_dir, args.manifest, args.jobs, args.dry_run, args.force,
+                  prune, trace_cache, args.checkpoints))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+synth_logs.py
+
+Generates synthetic ChampSim logs at scale (1k-100k runs) from the real logs
+in output/, to benchmark and stress the results pipeline (see
+bench_pipeline.py).
+
+Synthetic trace folder j copies the file set of real folder j mod n
+(baseline.txt, table32.txt, ...), so infer_variant() and the Q1/Q2/Q3 logic
+see the usual variants. Every file is rebuilt from its real counterpart:
+
+ - the header names one `CPU i runs` trace per core; runs get 1..N cores
+   (--cores) and a random number of heartbeats per core (--heartbeats), with
+   Warmup complete/Finished lines and Simulation time stamps at a random KIPS;
+ - every single-core folder runs its own trace, synth<j>; a multi-core folder
+   runs a mix of distinct traces of earlier single-core folders copied from
+   the same real folder (so the same variants exist), which gives multicore.py
+   a single-core baseline for every core. Until a real folder has as many
+   single-core copies as the mix needs, its copies are single-core;
+ - every number in the ROI statistics is rescaled per CPU, counts by one
+   random factor and rates (IPC, MPKI, %, latency) by another, so columns
+   vary but keep their magnitudes; the CPU line's cycles follow its IPC;
+ - multi-core runs get the `Total Simulation Statistics` section and one
+   prefetcher block per CPU, laid out like real multi-core logs, and
+   --extra-blocks of the runs carry an unregistered prefetcher block.
+
+The output is deterministic for a given --seed. Logs average 15-30 KB, so
+100k runs take a few GB.
+
+Usage:
+    python3 scripts/synth_logs.py --dst /tmp/synth_1k --runs 1000
+    python3 scripts/synth_logs.py --dst /tmp/synth_100k --runs 100000 --cores 1,2,4 --heartbeats 0:200
+"""
+import os, re, sys, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parse_and_plot_all_questions import collect_logs
+from manifest import re_offset_table
+
+HEARTBEAT_PERIOD = 10000000
+# bump whenever the output for a given seed changes, so bench_pipeline.py regenerates its logs
+GENERATOR_VERSION = 2
+# numbers that are configuration, not statistics, in prefetcher blocks
+FIXED_LABELS = ('Table size', 'TOPK', 'CONF_THRESH')
+HEADER_SKIP = ('Warmup Instructions', 'Simulation Instructions', 'Number of CPUs', 'CPU ')
+re_number = re.compile(r'(?<![\w.\-])(\d+(?:\.\d+)?(?:e[-+]?\d+)?)(?![\w.])')
+EXTRA_BLOCK = ['=== L2 Stream Prefetcher Stats ===\n', 'Streams tracked : 4096\n', 'Prefetches issued : 1830021\n',
+               'Prefetches useful : 1122193\n', 'Accuracy          : 0.613213\n', '==================================\n']
+
+class Section:
+    """Lines whose numbers are rescaled: one format string plus the numbers in it."""
+
+    def __init__(self, lines, scale=True):
+        parts, values, is_int = [], [], []
+        for line in lines:
+            line = line.replace('{', '{{').replace('}', '}}')
+            if scale and not line.startswith(FIXED_LABELS):
+                for m in re_number.finditer(line):
+                    values.append(float(m.group(1)))
+                    is_int.append('.' not in m.group(1) and 'e' not in m.group(1))
+                line = re_number.sub('{}', line)
+            parts.append(line)
+        self.fmt = ''.join(parts)
+        self.values, self.is_int = np.array(values), np.array(is_int, bool)
+
+    def render(self, count_scale, rate_scale):
+        if not len(self.values):
+            return self.fmt.format()
+        ints = np.rint(self.values[self.is_int] * count_scale).astype(np.int64).astype(str)
+        rates = np.char.mod('%.6g', self.values[~self.is_int] * rate_scale)
+        out = np.empty(len(self.values), dtype=object)
+        out[self.is_int], out[~self.is_int] = ints, rates
+        return self.fmt.format(*out)
+
+class Template:
+    """A real log split into the sections a synthetic log is assembled from."""
+
+    def __init__(self, path):
+        with open(path, errors='ignore') as f:
+            lines = f.readlines()
+        banner = next(i for i, l in enumerate(lines) if l.startswith('***'))
+        m = re_offset_table.search(''.join(lines[:banner]))
+        self.env = f"OFFSET_TABLE={m.group(1)} " if m else ''
+        start = next(i for i, l in enumerate(lines) if l.startswith(('Heartbeat', 'Warmup complete')))
+        header = [l for l in lines[banner + 1:start] if l.strip() and not l.startswith(HEADER_SKIP)
+                  and l.strip() != '.xz']
+        # `CPU n runs` lines follow the machine description (LLC and DRAM lines)
+        split = next((i + 1 for i, l in enumerate(header) if l.startswith('Off-chip')), 0)
+        self.machine, self.setup = header[:split], header[split:]
+        roi = next(i for i, l in enumerate(lines) if l.startswith('Region of Interest'))
+        cpu = next(i for i, l in enumerate(lines) if i > roi and l.startswith('CPU 0 cumulative IPC'))
+        self.ipc = float(lines[cpu].split()[4])
+        dram = next(i for i, l in enumerate(lines) if l.startswith('DRAM Statistics'))
+        block = next((i for i in range(cpu, dram) if lines[i].startswith('=== ')), dram)
+        branch = next(i for i, l in enumerate(lines) if l.startswith('CPU 0 Branch Prediction'))
+        branch_end = next(i for i in range(branch, len(lines)) if lines[i].startswith('BRANCH_OTHER')) + 1
+        self.cpu = Section(lines[cpu + 1:block])
+        self.blocks = Section(lines[block:dram])
+        self.dram = Section(lines[dram:branch])
+        self.branch = Section(lines[branch + 1:branch_end])
+        self.branch_line = lines[branch]
+        self.tail = lines[branch_end:]
+
+    def render(self, rng, traces, heartbeats, extra_block=False):
+        n = len(traces)
+        count_scale = rng.lognormal(0, 0.25, n)
+        rate_scale = rng.lognormal(0, 0.1, n)
+        ipc = self.ipc * rate_scale
+        sim = max(1, heartbeats) * HEARTBEAT_PERIOD // 2
+        kips = rng.uniform(40, 400)
+        out = [f"$ {self.env}./bin/champsim -warmup_instructions {sim} -simulation_instructions {sim} "
+               f"-traces {' '.join(traces)}\n", '\n',
+               '*** ChampSim Multicore Out-of-Order Simulator ***\n', '\n',
+               f"Warmup Instructions: {sim}\n", f"Simulation Instructions: {sim}\n", f"Number of CPUs: {n}\n"]
+        out += self.machine + [f"CPU {c} runs {t}\n" for c, t in enumerate(traces)] + self.setup
+        out += self._progress(sim, heartbeats, ipc, kips)
+        out += ['\n', 'ChampSim completed all CPUs\n', '\n']
+        blocks = [self.blocks.render(count_scale[c], rate_scale[c]) for c in range(n)]
+        if extra_block:
+            blocks += EXTRA_BLOCK
+        sections = (('Total Simulation Statistics (not including warmup)', True),) if n > 1 else ()
+        for title, with_blocks in sections + (('Region of Interest Statistics', False),):
+            out += [title + '\n', '\n']
+            for c in range(n):
+                out.append(f"CPU {c} cumulative IPC: {ipc[c]:.6g} instructions: {sim} cycles: {int(sim / ipc[c])}\n")
+                out.append(self.cpu.render(count_scale[c], rate_scale[c]))
+                if with_blocks:
+                    out.append(blocks[c])
+        out += blocks
+        out.append(self.dram.render(count_scale.mean(), rate_scale.mean()))
+        for c in range(n):
+            out.append(self.branch_line.replace('CPU 0', f"CPU {c}", 1))
+            out.append(self.branch.render(count_scale[c], rate_scale[c]))
+        out += self.tail
+        return ''.join(out)
+
+    @staticmethod
+    def _progress(sim, heartbeats, ipc, kips):
+        """Heartbeat, Warmup complete and Finished lines of every CPU, in time order."""
+        events = []
+        for c, x in enumerate(ipc):
+            for k in range(1, heartbeats + 1):
+                instr = k * HEARTBEAT_PERIOD
+                events.append((instr, 1, f"Heartbeat CPU {c} instructions: {instr} cycles: {int(instr / x)} "
+                                         f"heartbeat IPC: {x:.6g} cumulative IPC: {x:.6g}"))
+            events.append((sim, 0, f"Warmup complete CPU {c} instructions: {sim} cycles: {int(sim / x)}"))
+            events.append((2 * sim, 2, f"Finished CPU {c} instructions: {sim} cycles: {int(sim / x)} "
+                                       f"cumulative IPC: {x:.6g}"))
+        out = []
+        for instr, _, line in sorted(events, key=lambda e: (e[0], e[1])):
+            secs = int(instr / kips / 1000)
+            out.append(f"{line} (Simulation time: {secs // 3600} hr {secs // 60 % 60} min {secs % 60} sec) \n")
+        return out
+
+def generate(dst, runs, templates_dir='./output', cores=(1,), heartbeats=(0, 50), extra_blocks=0.05, seed=0):
+    """Write `runs` synthetic logs under dst/<trace folder>/; returns their paths."""
+    rng = np.random.default_rng(seed)
+    folders = {}
+    for trace_folder, fname, path in collect_logs(templates_dir):
+        folders.setdefault(trace_folder, []).append((fname, Template(path)))
+    if not folders:
+        raise SystemExit(f"No template logs under {templates_dir}")
+    folders = list(folders.items())
+    singles = [[] for _ in folders]     # single-core traces per real folder, for mixes to reuse
+    paths, j = [], 0
+    while len(paths) < runs:
+        r = j % len(folders)
+        real, files = folders[r]
+        folder = os.path.join(dst, f"{real}_s{j:06d}")
+        os.makedirs(folder, exist_ok=True)
+        n = int(rng.choice(cores))
+        if n > len(singles[r]) and 1 in cores:
+            n = 1
+        if n == 1:
+            traces = [f"../traces/synth{j}.champsimtrace.xz"]
+            if len(files) <= runs - len(paths):
+                singles[r].append(traces[0])
+        elif n <= len(singles[r]):
+            traces = [str(t) for t in rng.choice(singles[r], n, replace=False)]
+        else:                           # no single-core runs to mix (--cores without 1)
+            traces = [f"../traces/synth{j}_{c}.champsimtrace.xz" for c in range(n)]
+        for fname, tpl in files[:runs - len(paths)]:
+            hb = int(rng.integers(heartbeats[0], heartbeats[1] + 1))
+            path = os.path.join(folder, fname)
+            with open(path, 'w') as f:
+                f.write(tpl.render(rng, traces, hb, rng.random() < extra_blocks))
+            paths.append(path)
+        j += 1
+    return paths
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Real logs to use as templates')
+    parser.add_argument('--dst', required=True, help='Directory to write the synthetic output/<trace>/<variant>.txt tree to')
+    parser.add_argument('--runs', type=int, default=1000, help='Number of logs to generate')
+    parser.add_argument('--cores', default='1', help='Comma-separated core counts to draw from, e.g. 1,2,4')
+    parser.add_argument('--heartbeats', default='0:50', help='MIN:MAX heartbeats per core')
+    parser.add_argument('--extra-blocks', type=float, default=0.05, help='Fraction of runs with an unregistered prefetcher block')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    args = parser.parse_args()
+    lo, _, hi = args.heartbeats.partition(':')
+    paths = generate(args.dst, args.runs, args.output_dir, [int(c) for c in args.cores.split(',')],
+                     (int(lo), int(hi or lo)), args.extra_blocks, args.seed)
+    print(f"Wrote {len(paths)} logs to {args.dst} "
+          f"({sum(os.path.getsize(p) for p in paths) / 2**20:.1f} MB)")
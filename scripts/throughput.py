@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+throughput.py
+
+Simulator speed report: how many simulated instructions per wall-second
+(KIPS) each configuration achieves in warmup and in the region of interest,
+and which configurations or commits got slower.
+
+The parser derives the columns from the `(Simulation time: ...)` stamps of
+the `Warmup complete` and `Finished` lines:
+
+    warmup_kips   warmup instructions / wall seconds until warmup completed
+    roi_kips      ROI instructions / wall seconds from warmup to Finished
+    warmup_seconds, roi_seconds, sim_seconds
+
+Two comparisons are made, both as geometric means over traces of per-trace
+KIPS ratios:
+
+ - against a baseline variant in the same results (--baseline), e.g. the
+   cost of the offset prefetcher's bookkeeping over no prefetcher;
+ - against older results of the same runs (--against), e.g. a results CSV or
+   store produced before a change to cache_hierarchies/ or prefetcher/.
+
+A comparison is flagged when its geomean ratio is below 1 - threshold.
+The stamps have one-second resolution, so runs with a phase shorter than
+--min-seconds are left out of that phase's comparison. --fail makes the
+script exit with status 1 when anything is flagged, for use in scripts.
+
+Usage:
+    python3 scripts/throughput.py --source outputs_parsed_all.csv --baseline baseline_noninc
+    python3 scripts/throughput.py --source outputs_parsed_all.csv --against old/outputs_parsed_all.csv --threshold 0.1 --fail
+"""
+import os, sys, argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from results_store import load_results
+from speedup import pivot, normalize, geomean
+
+PHASES = ('warmup', 'roi')
+COLUMNS = ['trace_folder', 'variant'] + [f"{p}_{c}" for p in PHASES for c in ('kips', 'seconds')]
+
+def kips(df, phase, min_seconds=5):
+    """(trace x variant) KIPS matrix of a phase, NaN where the phase ran under `min_seconds`."""
+    if f"{phase}_kips" not in df:
+        return pd.DataFrame()
+    df = df.assign(**{f"{phase}_kips": df[f"{phase}_kips"].where(df[f"{phase}_seconds"] >= min_seconds)})
+    return pivot(df, f"{phase}_kips")
+
+def summarize(ratios, threshold):
+    """Per-variant geomean ratio, trace count and flag from a (trace x variant) ratio matrix."""
+    return pd.DataFrame({'ratio': geomean(ratios), 'traces': ratios.notna().sum(axis=0),
+                         'worst': ratios.min(axis=0)}).assign(flagged=lambda s: s['ratio'] < 1 - threshold)
+
+def report(df, baseline=None, old=None, threshold=0.05, min_seconds=5):
+    """One row per (variant, phase): median KIPS and the flagged comparisons."""
+    rows = []
+    for phase in PHASES:
+        cur = kips(df, phase, min_seconds)
+        if cur.empty:
+            continue
+        summary = pd.DataFrame({'phase': phase, 'median_kips': cur.median(axis=0), 'traces': cur.notna().sum(axis=0)})
+        if baseline is not None:
+            vs = summarize(normalize(cur, baseline), threshold)
+            summary['vs_baseline'] = vs['ratio']
+            summary['slower_than_baseline'] = vs['flagged'] & (summary.index != baseline)
+        if old is not None:
+            prev = kips(old, phase, min_seconds).reindex(index=cur.index, columns=cur.columns)
+            vs = summarize(cur / prev.where(prev > 0), threshold)
+            summary['vs_previous'] = vs['ratio']
+            summary['worst_trace_vs_previous'] = vs['worst']
+            summary['regressed'] = vs['flagged']
+        rows.append(summary)
+    if not rows:
+        return pd.DataFrame()
+    out = pd.concat(rows).rename_axis('variant').reset_index()
+    return out.sort_values(['phase', 'variant'], kind='stable').reset_index(drop=True)
+
+def flagged(summary):
+    cols = [c for c in ('slower_than_baseline', 'regressed') if c in summary]
+    return summary[summary[cols].fillna(False).astype(bool).any(axis=1)] if cols else summary.iloc[:0]
+
+def load(source, variants=None):
+    df = load_results(source)
+    missing = [c for c in COLUMNS if c not in df]
+    if missing:
+        raise SystemExit(f"{source} has no {', '.join(missing)}: re-parse the logs "
+                         f"(parse_and_plot_all_questions.py --rebuild) to add the throughput columns")
+    if variants:
+        df = df[df['variant'].isin(variants)]
+    return df
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--source', default=None,
+                        help='Results store directory or CSV (default: outputs_parsed_all.parquet, else the CSV)')
+    parser.add_argument('--baseline', default=None, help='Variant every other variant is compared to')
+    parser.add_argument('--against', default=None, help='Older results (store or CSV) of the same runs to compare to')
+    parser.add_argument('--variants', default=None, help='Comma-separated variants to keep (default: all)')
+    parser.add_argument('--threshold', type=float, default=0.05, help='Flag KIPS ratios below 1 - threshold')
+    parser.add_argument('--min-seconds', type=float, default=5, help='Leave out phases shorter than this many wall seconds')
+    parser.add_argument('--save-csv', default=None, help='Write the report to this CSV')
+    parser.add_argument('--fail', action='store_true', help='Exit with status 1 if anything is flagged')
+    args = parser.parse_args()
+    variants = args.variants.split(',') if args.variants else None
+    df = load(args.source, variants)
+    old = load(args.against, variants) if args.against else None
+    summary = report(df, args.baseline, old, args.threshold, args.min_seconds)
+    if summary.empty:
+        raise SystemExit("No runs with throughput stats.")
+    print(summary.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    if args.save_csv:
+        summary.to_csv(args.save_csv, index=False)
+        print(f"Saved throughput report to {args.save_csv}")
+    bad = flagged(summary)
+    if len(bad):
+        print(f"\n{len(bad)} throughput drops beyond {args.threshold:.0%}: "
+              + ', '.join(bad['variant'] + ' (' + bad['phase'] + ')'))
+    if args.fail and len(bad):
+        sys.exit(1)
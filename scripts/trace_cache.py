@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+trace_cache.py
+
+Shared cache of decompressed traces for sweep.py and search.py.
+
+ChampSim reads a trace through `xz -dc` / `gunzip -c`, one decompressor per
+core per run (and again whenever it wraps around the trace), so a sweep of N
+configurations over one trace decompresses it N times in parallel. With
+--trace-cache, each trace is decompressed once into
+
+    <cache>/<sha256 of the compressed file>/<name>.raw
+
+and every run that uses it is handed that path; ChampSim reads .raw traces
+through `cat`. The file keeps the trace's name tokens, which main.cc seeds
+the simulator from, so results are the same as with the compressed trace.
+
+Entries are content-addressed: a copied or renamed trace shares its entry and
+a changed one gets a new entry. Digests are remembered by (path, size,
+mtime) in <cache>/index.json, next to each entry's size and last use. When
+the cache grows past its budget the least recently used entries are deleted,
+except ones a run still holds (a shared flock on the entry's lease file, so
+sweeps sharing a cache respect each other's runs). A trace larger than the
+whole budget is not cached; its runs read the compressed trace as before.
+Its uncompressed size is read from the container first (`xz --robot --list`,
+`gzip -l`, `zstd -lv`) where the format records it, so it is usually not
+decompressed at all, and it is kept in the index as a bypass record (evictions
+leave those alone), so later runs skip it without even checking.
+
+Raw files are used rather than a pipe fanned out to every run: ChampSim
+rewinds a trace by re-running its read command, which a one-shot FIFO cannot
+serve, and a fan-out pipe would pace every run to the slowest one.
+
+Usage:
+    python3 scripts/sweep.py sweep.json --trace-cache /scratch/trace_cache --trace-cache-budget 200G
+    python3 scripts/trace_cache.py /scratch/trace_cache
+    python3 scripts/trace_cache.py /scratch/trace_cache --budget 100G
+    python3 scripts/trace_cache.py /scratch/trace_cache --clear
+"""
+import os, re, json, time, fcntl, shutil, hashlib, argparse, threading, subprocess
+from contextlib import contextmanager
+
+DECOMPRESSORS = {'.xz': ['xz', '-dc'], '.gz': ['gzip', '-dc'], '.zst': ['zstd', '-dc']}
+INDEX = 'index.json'
+LEASE = '.lease'
+UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+def parse_size(s):
+    """'200G' -> bytes (K/M/G/T are powers of 1024; a plain number is bytes)."""
+    s = str(s).strip().upper().rstrip('B')
+    unit = s[-1] if s and s[-1] in UNITS else ''
+    return int(float(s[:len(s) - len(unit)]) * UNITS[unit])
+
+def uncompressed_size(trace):
+    """Uncompressed size recorded in a compressed trace, or None if the format does not say.
+
+    gzip stores the size modulo 4 GiB, so its value is only a lower bound.
+    """
+    ext = os.path.splitext(trace)[1]
+    cmd = {'.xz': ['xz', '--robot', '--list'], '.gz': ['gzip', '-l'], '.zst': ['zstd', '-lv']}.get(ext)
+    try:
+        out = subprocess.run(cmd + [trace], capture_output=True, text=True, check=True).stdout
+    except (TypeError, OSError, subprocess.CalledProcessError):
+        return None
+    if ext == '.xz':
+        m = re.search(r'^totals\t\d+\t\d+\t\d+\t(\d+)', out, re.M)
+    elif ext == '.gz':
+        m = re.search(r'^\s*\d+\s+(\d+)\s', out.split('\n', 1)[-1], re.M)
+    else:
+        m = re.search(r'^Decompressed Size: .*\((\d+) B\)', out, re.M)
+    return int(m.group(1)) if m else None
+
+def file_digest(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def _try_lock(path, mode):
+    """Open `path` and flock it without blocking; the fd, or None if someone holds a conflicting lock."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, mode | fcntl.LOCK_NB)
+        return fd
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+class TraceCache:
+    """Decompress-once cache of traces under `root`, kept within `budget` bytes (None = unbounded)."""
+
+    def __init__(self, root, budget=None):
+        self.root, self.budget = root, budget
+        os.makedirs(root, exist_ok=True)
+        self._mutex = threading.Lock()
+        self._filling = {}          # digest -> lock serialising this process's threads on one entry
+        self.hits = self.fills = self.bypassed = 0
+
+    @contextmanager
+    def _index(self):
+        """The index, locked against other threads and processes; saved on exit."""
+        fd = os.open(os.path.join(self.root, '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            path = os.path.join(self.root, INDEX)
+            index = {'digests': {}, 'entries': {}}
+            if os.path.exists(path):
+                with open(path) as f:
+                    index.update(json.load(f))
+            yield index
+            with open(path + '.tmp', 'w') as f:
+                json.dump(index, f, indent=1, sort_keys=True)
+            os.replace(path + '.tmp', path)
+        finally:
+            os.close(fd)
+
+    def digest(self, path):
+        st = os.stat(path)
+        key = f"{os.path.realpath(path)}:{st.st_size}:{st.st_mtime_ns}"
+        with self._index() as index:
+            known = index['digests'].get(key)
+        if known:
+            return known
+        digest = file_digest(path)
+        with self._index() as index:
+            index['digests'][key] = digest
+        return digest
+
+    def acquire(self, trace):
+        """(path to read, lease fd or None) for `trace`; close the fd when the run is over."""
+        ext = os.path.splitext(trace)[1]
+        if ext not in DECOMPRESSORS or not os.path.exists(trace):
+            return trace, None
+        digest = self.digest(trace)
+        if self.budget is not None:
+            with self._index() as index:
+                known = index['entries'].get(digest)
+                if known and known.get('bypass') and known['size'] > self.budget:
+                    known['last_used'] = time.time()
+                    self.bypassed += 1
+                    return trace, None
+            size = uncompressed_size(trace)
+            if size is not None and size > self.budget:
+                self._bypass(digest, size, trace)
+                return trace, None
+        entry = os.path.join(self.root, digest[:32])
+        raw = os.path.join(entry, os.path.splitext(os.path.basename(trace))[0] + '.raw')
+        with self._mutex:
+            lock = self._filling.setdefault(digest, threading.Lock())
+        with lock:
+            with self._index():     # eviction holds the index lock, so the entry cannot vanish under us
+                os.makedirs(entry, exist_ok=True)
+                lease = os.open(os.path.join(entry, LEASE), os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(lease, fcntl.LOCK_SH)
+            if os.path.exists(raw):
+                self.hits += 1
+            else:
+                fill = os.open(os.path.join(entry, '.fill'), os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fill, fcntl.LOCK_EX)    # another process may be filling it
+                    if not os.path.exists(raw):
+                        tmp = f"{raw}.tmp{os.getpid()}"
+                        with open(tmp, 'wb') as out:
+                            subprocess.run(DECOMPRESSORS[ext] + [trace], stdout=out, check=True)
+                        os.replace(tmp, raw)
+                        self.fills += 1
+                    else:
+                        self.hits += 1
+                finally:
+                    os.close(fill)
+            size = os.path.getsize(raw)
+            with self._index() as index:
+                index['entries'][digest] = {'path': raw, 'size': size, 'last_used': time.time(),
+                                            'source': os.path.abspath(trace)}
+            if self.budget is not None and size > self.budget:
+                os.close(lease)
+                self.evict(0, only=[digest])
+                self._bypass(digest, size, trace)
+                return trace, None
+            if self.budget is not None:
+                self.evict(self.budget)
+        return raw, lease
+
+    def _bypass(self, digest, size, trace):
+        """Remember that `trace` is over budget, so later runs read it compressed straight away."""
+        with self._index() as index:
+            index['entries'][digest] = {'size': size, 'bypass': True, 'last_used': time.time(),
+                                        'source': os.path.abspath(trace)}
+        self.bypassed += 1
+
+    @contextmanager
+    def lease(self, traces):
+        """Cached paths for `traces`, held (not evictable) until the block exits."""
+        fds, paths = [], []
+        try:
+            for trace in traces:
+                path, fd = self.acquire(trace)
+                paths.append(path)
+                if fd is not None:
+                    fds.append(fd)
+            yield paths
+        finally:
+            for fd in fds:
+                os.close(fd)
+
+    def evict(self, budget, only=None):
+        """Delete least recently used entries nobody holds until the cache fits in `budget` bytes.
+
+        Bypass records of over-budget traces take no space and are kept. Returns
+        the bytes freed.
+        """
+        freed = 0
+        with self._index() as index:
+            entries = index['entries']
+            total = sum(e['size'] for e in entries.values() if not e.get('bypass'))
+            for digest, e in sorted(entries.items(), key=lambda kv: kv[1]['last_used']):
+                if total <= budget:
+                    break
+                if e.get('bypass') or (only is not None and digest not in only):
+                    continue
+                entry = os.path.dirname(e['path'])
+                fd = _try_lock(os.path.join(entry, LEASE), fcntl.LOCK_EX) if os.path.isdir(entry) else None
+                if fd is None and os.path.isdir(entry):
+                    continue        # a run is reading it
+                try:
+                    shutil.rmtree(entry, ignore_errors=True)
+                finally:
+                    if fd is not None:
+                        os.close(fd)
+                del entries[digest]
+                total -= e['size']
+                freed += e['size']
+            live = set(entries)
+            index['digests'] = {k: d for k, d in index['digests'].items() if d in live}
+        return freed
+
+    def entries(self):
+        with self._index() as index:
+            return dict(index['entries'])
+
+    def summary(self):
+        return f"trace cache {self.root}: {self.fills} decompressed, {self.hits} reused, {self.bypassed} over budget"
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('cache', help='Trace cache directory')
+    parser.add_argument('--budget', default=None, help='Evict least recently used entries down to this size (e.g. 100G)')
+    parser.add_argument('--clear', action='store_true', help='Evict every entry no run is holding')
+    args = parser.parse_args()
+    cache = TraceCache(args.cache)
+    if args.clear or args.budget is not None:
+        freed = cache.evict(0 if args.clear else parse_size(args.budget))
+        print(f"Freed {freed / (1 << 30):.2f} GiB")
+    entries = sorted(cache.entries().items(), key=lambda kv: kv[1]['last_used'], reverse=True)
+    cached = [e for _, e in entries if not e.get('bypass')]
+    for digest, e in entries:
+        used = time.strftime('%Y-%m-%d %H:%M', time.localtime(e['last_used']))
+        print(f"{digest[:12]}  {e['size'] / (1 << 30):8.2f} GiB  {used}  {e['source']}"
+              f"{'  (over budget, not cached)' if e.get('bypass') else ''}")
+    print(f"{len(cached)} traces, {sum(e['size'] for e in cached) / (1 << 30):.2f} GiB")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+watch.py
+
+Live view of in-flight simulations: tails output/<trace_folder>/*.txt (and the
+*.txt.part files sweep.py writes while a run is going) as ChampSim writes them.
+
+Every --interval seconds each log is read from the byte offset where the last
+poll stopped, so a poll costs only the new lines. Heartbeat lines update the
+run's progress, cumulative IPC and wall time (the `Warmup complete` and `Finished CPU`
+lines do the same at the phase boundaries). Cumulative IPC is only shown for
+the ROI: it is cleared at `Warmup complete`, since warmup runs with zero
+latencies. The ETA is the remaining instructions (Warmup + Simulation
+Instructions from the log header) at the ROI rate, i.e. instructions per
+`(Simulation time: ...)` second since `Warmup complete`; there is none during
+warmup. Offsets and run state are saved in <output-dir>/.watch_state.json, so
+a restarted watcher resumes where it left off.
+
+Each poll then
+ - prints one line per run: phase, progress, ROI cumulative IPC, speedup over
+   the trace's --baseline run, ETA, and STALLED when a log has not grown for
+   --stall seconds. The speedup compares both runs over the same ROI
+   instructions: the baseline's ROI heartbeat cycles are interpolated at the
+   run's latest ROI heartbeat (prune.compare), so it is only shown once both
+   have ROI heartbeats;
+ - renders live_speedup_<trace_folder>.png per trace into --plots-dir (plots
+   whose data did not change are skipped, see render.py);
+ - when runs have finished, re-parses the final stats (only the new logs,
+   through the parse cache) and rewrites --save-csv and, with --save-store,
+   the Parquet results store.
+
+Polling is used rather than inotify so it works on NFS and needs no extra
+module.
+
+Usage:
+    python3 scripts/watch.py --output-dir ./output --interval 10
+    python3 scripts/parse_and_plot_all_questions.py --watch 10 --manifest experiments.json
+"""
+import os, re, sys, json, time, argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from parse_and_plot_all_questions import is_log, infer_variant, parse_all, results_frame
+from heartbeats import re_heartbeat
+from manifest import load_manifest, re_header
+from champsim_stats import PARSER_VERSION, FINAL_STATS_MARKER
+from parse_cache import ParseCache, cache_path_for
+from render import job, render_all
+from prune import PRUNED_MARKER, compare
+
+STATE_FILE = '.watch_state.json'
+re_warmup_complete = re.compile(
+    r'^Warmup complete CPU (\d+) instructions: (\d+) cycles: (\d+) \(Simulation time: (\d+) hr (\d+) min (\d+) sec\)')
+re_finished = re.compile(
+    r'^Finished CPU (\d+) instructions: (\d+) cycles: (\d+) cumulative IPC: (\S+) '
+    r'\(Simulation time: (\d+) hr (\d+) min (\d+) sec\)')
+PART = '.part'
+SETTLE_SEC = 2
+
+class LogTail:
+    """Incremental reader for one log: remembers its offset and the latest heartbeat of each CPU."""
+
+    def __init__(self, trace_folder, log, path, state=None):
+        self.trace_folder, self.log, self.path = trace_folder, log, path
+        self.load(state or {})
+
+    def load(self, state):
+        self.offset = state.get('offset', 0)
+        self.warmup_instructions = state.get('warmup_instructions')
+        self.simulation_instructions = state.get('simulation_instructions')
+        self.cpus = {int(k): v for k, v in state.get('cpus', {}).items()}
+        self.done = state.get('done', False)
+        self.pruned = state.get('pruned', False)
+        self.grew_at = state.get('grew_at', time.time())
+
+    def state(self):
+        return {'offset': self.offset, 'warmup_instructions': self.warmup_instructions,
+                'simulation_instructions': self.simulation_instructions,
+                'cpus': self.cpus, 'done': self.done, 'pruned': self.pruned, 'grew_at': self.grew_at}
+
+    def poll(self):
+        """Read the lines appended since the last poll; returns the number of bytes consumed."""
+        size = os.path.getsize(self.path)
+        if size < self.offset:          # truncated or replaced by a new run: start over
+            self.load({})
+        if size == self.offset:
+            return 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end = data.rfind(b'\n') + 1     # leave a partial last line for the next poll
+        if end == 0:
+            return 0
+        self.offset += end
+        self.grew_at = time.time()
+        for line in data[:end].decode(errors='ignore').splitlines():
+            if line.startswith('Heartbeat'):
+                m = re_heartbeat.match(line)
+                if not m: continue
+                cpu = self.cpus.setdefault(int(m.group(1)), {'roi': False})
+                cpu.update(instructions=int(m.group(2)), cycles=int(m.group(3)),
+                           heartbeat_ipc=float(m.group(4)),
+                           wall_sec=int(m.group(6)) * 3600 + int(m.group(7)) * 60 + int(m.group(8)))
+                if cpu.get('roi'):
+                    cpu['cumulative_ipc'] = float(m.group(5))
+                    cpu.setdefault('roi_beats', []).append([cpu['instructions'], cpu['cycles']])
+            elif line.startswith('Warmup complete'):
+                m = re_warmup_complete.match(line)
+                if not m: continue
+                cpu = self.cpus.setdefault(int(m.group(1)), {})
+                cpu.update(roi=True, instructions=int(m.group(2)), cycles=int(m.group(3)), cumulative_ipc=None,
+                           wall_sec=int(m.group(4)) * 3600 + int(m.group(5)) * 60 + int(m.group(6)))
+                # ROI start: heartbeats are cumulative from the start of the trace
+                cpu.update(roi_instructions=cpu['instructions'], roi_cycles=cpu['cycles'],
+                           roi_wall_sec=cpu['wall_sec'], roi_beats=[])
+            elif line.startswith('Finished CPU'):
+                m = re_finished.match(line)
+                if not m: continue      # instructions and cycles are ROI-only here; the CPU has reached its target
+                cpu = self.cpus.setdefault(int(m.group(1)), {})
+                start = (cpu.setdefault('roi_instructions', self.warmup_instructions or 0), cpu.setdefault('roi_cycles', 0))
+                cpu.update(roi=True, instructions=start[0] + int(m.group(2)), cycles=start[1] + int(m.group(3)),
+                           cumulative_ipc=float(m.group(4)),
+                           wall_sec=int(m.group(5)) * 3600 + int(m.group(6)) * 60 + int(m.group(7)))
+                cpu.setdefault('roi_beats', []).append([cpu['instructions'], cpu['cycles']])
+            elif line.startswith(FINAL_STATS_MARKER.decode()):
+                self.done = True
+            elif line.startswith(PRUNED_MARKER):
+                self.done = self.pruned = True
+            elif self.simulation_instructions is None and line.startswith(('Warmup Instructions', 'Simulation Instructions')):
+                for field in ('warmup_instructions', 'simulation_instructions'):
+                    m = re_header[field].match(line)
+                    if m: setattr(self, field, int(m.group(1)))
+        return end
+
+    def progress(self):
+        """(instructions of the slowest CPU, target instructions, wall seconds, cumulative IPC of CPU 0)."""
+        if not self.cpus or self.simulation_instructions is None:
+            return None, None, None, None
+        beats = [c for c in self.cpus.values() if 'instructions' in c]
+        if not beats:
+            return None, None, None, None
+        instr = min(c['instructions'] for c in beats)
+        target = (self.warmup_instructions or 0) + self.simulation_instructions
+        return instr, target, max(c['wall_sec'] for c in beats), self.cpus.get(0, beats[0]).get('cumulative_ipc')
+
+    def eta(self):
+        """Seconds left for the slowest CPU at its ROI rate; None until every CPU has an ROI rate."""
+        if self.done:
+            return 0.0
+        instr, target, _, _ = self.progress()
+        if instr is None:
+            return None
+        left = []
+        for c in self.cpus.values():
+            if 'roi_wall_sec' not in c or c['wall_sec'] <= c['roi_wall_sec'] or c['instructions'] <= c['roi_instructions']:
+                return None
+            rate = (c['instructions'] - c['roi_instructions']) / (c['wall_sec'] - c['roi_wall_sec'])
+            left.append(max(0, target - c['instructions']) / rate)
+        return max(left) if left else None
+
+    def roi_series(self):
+        """ROI heartbeats as a prune.compare series, counted from each CPU's `Warmup complete` point."""
+        cpu, instr, cyc = [], [], []
+        for n, c in sorted(self.cpus.items()):
+            if 'roi_instructions' not in c: continue
+            for i, y in c.get('roi_beats', ()):
+                cpu.append(n)
+                instr.append(i - c['roi_instructions'])
+                cyc.append(y - c['roi_cycles'])
+        return {'cpu': np.array(cpu, dtype=np.int64), 'instructions': np.array(instr, dtype=np.int64),
+                'cycles': np.array(cyc, dtype=np.int64)}
+
+    def phase(self):
+        if self.pruned:
+            return 'pruned'
+        if self.done:
+            return 'done'
+        if not self.cpus:
+            return 'starting'
+        return 'roi' if all(c.get('roi') for c in self.cpus.values()) else 'warmup'
+
+def discover(output_dir):
+    """{(trace_folder, log): path} for finished logs and in-flight <log>.part files."""
+    found = {}
+    for trace_folder in sorted(os.listdir(output_dir)):
+        folder = os.path.join(output_dir, trace_folder)
+        if not os.path.isdir(folder): continue
+        for fname in sorted(os.listdir(folder)):
+            log = fname[:-len(PART)] if fname.endswith(PART) else fname
+            if not is_log(log): continue
+            if fname == log or (trace_folder, log) not in found:
+                found[(trace_folder, log)] = os.path.join(folder, fname)
+    return found
+
+def _fmt_eta(sec):
+    if sec is None: return '?'
+    sec = int(sec)
+    return f"{sec // 3600}h{sec % 3600 // 60:02d}m{sec % 60:02d}s"
+
+class Watcher:
+    def __init__(self, output_dir, baseline='baseline_noninc', manifest_path=None, plots_dir=None,
+                 save_csv=None, save_store=None, stall=300):
+        self.output_dir, self.baseline, self.stall = output_dir, baseline, stall
+        self.manifest = load_manifest(manifest_path) if manifest_path else None
+        self.plots_dir, self.save_csv, self.save_store = plots_dir, save_csv, save_store
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        try:
+            with open(self.state_path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            saved = {}
+        self.saved = saved
+        self.tails = {}
+        self.finished = set()
+
+    def variant(self, trace_folder, log):
+        return self.manifest.variant(trace_folder, log) if self.manifest else infer_variant(log)
+
+    def poll(self):
+        """One polling pass; returns the runs that finished during it."""
+        newly_done = []
+        for key, path in discover(self.output_dir).items():
+            tail = self.tails.get(key)
+            if tail is None:
+                tail = self.tails[key] = LogTail(*key, path, self.saved.get('/'.join(key)))
+            elif tail.path != path:     # <log>.part renamed to <log>: same bytes, keep the offset
+                tail.path = path
+            try:
+                grew = tail.poll()
+            except OSError:
+                continue                # renamed between listing and reading; picked up next pass
+            if not tail.done:
+                self.finished.discard(key)      # truncated or restarted: track the new run
+            # the final stats follow the completion line, so wait until the log stops growing
+            settled = not grew or time.time() - os.path.getmtime(tail.path) > SETTLE_SEC
+            if tail.done and settled and not tail.path.endswith(PART) and key not in self.finished:
+                self.finished.add(key)
+                newly_done.append(key)
+        with open(self.state_path, 'w') as f:
+            json.dump({'/'.join(k): t.state() for k, t in self.tails.items()}, f)
+        return newly_done
+
+    def rows(self):
+        """One dict per run with its live status and speedup over the trace's baseline."""
+        rows = []
+        for (trace_folder, log), tail in sorted(self.tails.items()):
+            instr, target, wall, ipc = tail.progress()
+            rows.append({'trace_folder': trace_folder, 'log': log, 'variant': self.variant(trace_folder, log),
+                         'phase': tail.phase(), 'progress': min(1.0, instr / target) if instr and target else 0.0,
+                         'ipc': ipc, 'eta': tail.eta(),
+                         'stalled': not tail.done and time.time() - tail.grew_at > self.stall})
+        base = {trace_folder: tail.roi_series() for (trace_folder, log), tail in self.tails.items()
+                if self.variant(trace_folder, log) == self.baseline}
+        for r in rows:
+            b = base.get(r['trace_folder'])
+            r['speedup'] = None
+            if b is not None and len(b['cpu']):
+                # same ROI instructions on both sides, up to what the baseline has simulated
+                cmp = compare(b, self.tails[(r['trace_folder'], r['log'])].roi_series())
+                if cmp:
+                    r['speedup'] = cmp.get(0, next(iter(cmp.values())))['speedup']
+        return rows
+
+    def report(self, rows):
+        print(time.strftime('\n[%H:%M:%S]'), f"{sum(r['phase'] in ('done', 'pruned') for r in rows)}/{len(rows)} runs done", flush=True)
+        for r in rows:
+            ipc = f"{r['ipc']:.4f}" if r['ipc'] is not None else '-'
+            sp = f"{r['speedup']:.3f}" if r['speedup'] is not None else '-'
+            print(f"  {r['trace_folder'] + '/' + r['log']:40s} {r['phase']:8s} {r['progress']:6.1%}  "
+                  f"IPC {ipc:>7s}  speedup {sp:>6s}  ETA {_fmt_eta(r['eta']):>10s}"
+                  f"{'  STALLED' if r['stalled'] else ''}", flush=True)
+
+    def plot(self, rows):
+        jobs = []
+        by_trace = {}
+        for r in rows:
+            by_trace.setdefault(r['trace_folder'], []).append(r)
+        for trace_folder, runs in by_trace.items():
+            runs = [r for r in runs if r['speedup'] is not None]
+            if not runs: continue
+            jobs.append(job(f"live_speedup_{trace_folder}.png", 'live', 'bar', figsize=(7, 5),
+                            x=[f"{r['variant']}\n({r['phase']} {r['progress']:.0%})" for r in runs],
+                            y=[round(r['speedup'], 3) for r in runs],
+                            title=f"Live speedup over {self.baseline} — {trace_folder}",
+                            ylabel="Baseline ROI cycles / ROI cycles, same instructions",
+                            color="steelblue", edgecolor="black", annotate=True, baseline=1.0,
+                            baseline_label=self.baseline))
+        if jobs:
+            render_all(jobs, self.plots_dir, verbose=False)
+
+    def update_results(self):
+        """Re-parse finished logs (new ones only, via the parse cache) and rewrite the CSV/store."""
+        logs = sorted((t, l, self.tails[(t, l)].path) for t, l in self.finished)
+        cache = ParseCache(cache_path_for(self.save_csv), PARSER_VERSION)
+        rows = parse_all(logs, cache=cache)
+        cache.close()
+        df = results_frame(rows, self.manifest)
+        df.to_csv(self.save_csv, index=False)
+        print(f"Updated {self.save_csv} ({len(df)} finished runs)")
+        if self.save_store:
+            from results_store import write_store
+            write_store(df, self.save_store)
+            print(f"Updated results store {self.save_store}")
+
+    def run(self, interval=10, once=False, until_done=False):
+        while True:
+            newly_done = self.poll()
+            rows = self.rows()
+            self.report(rows)
+            if self.plots_dir:
+                self.plot(rows)
+            if newly_done and self.save_csv:
+                self.update_results()
+            if once or (until_done and rows and len(self.finished) == len(rows)):
+                return rows
+            time.sleep(interval)
+
+def watch(output_dir, interval=10, **kwargs):
+    once, until_done = kwargs.pop('once', False), kwargs.pop('until_done', False)
+    try:
+        return Watcher(output_dir, **kwargs).run(interval, once, until_done)
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--output-dir', default='./output', help='Path to output folder')
+    parser.add_argument('--interval', type=float, default=10, help='Seconds between polls')
+    parser.add_argument('--baseline', default='baseline_noninc', help='Variant live speedups are relative to')
+    parser.add_argument('--manifest', default=None, help='Experiment manifest giving each log its variant')
+    parser.add_argument('--plots-dir', default=None, help='Where live_speedup_<trace>.png go (default: --output-dir)')
+    parser.add_argument('--no-plots', action='store_true', help='Do not render the live speedup plots')
+    parser.add_argument('--save-csv', default='outputs_parsed_all.csv', help='CSV rewritten when runs finish ("" to disable)')
+    parser.add_argument('--save-store', default=None, help='Also rewrite this Parquet results store when runs finish')
+    parser.add_argument('--stall', type=float, default=300, help='Flag runs whose log has not grown for this many seconds')
+    parser.add_argument('--once', action='store_true', help='Poll once and exit')
+    parser.add_argument('--until-done', action='store_true', help='Exit when every watched run has finished')
+    args = parser.parse_args()
+    watch(args.output_dir, args.interval, baseline=args.baseline, manifest_path=args.manifest,
+          plots_dir=None if args.no_plots else args.plots_dir or args.output_dir, save_csv=args.save_csv or None, save_store=args.save_store,
+          stall=args.stall, once=args.once, until_done=args.until_done)
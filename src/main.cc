@@ -6,6 +6,7 @@
 #include <fstream>
 #include <string.h>
 #include <sstream>
+#include <sys/stat.h>
 
 #define PHASE_SIZE_IN_CYCLES 100000
 
@@ -562,6 +563,252 @@ void finish_warmup()
     uncore.LLC.LATENCY = LLC_LATENCY;
 }
 
+// Warmup checkpoints: -save_checkpoint writes the state at the end of warmup
+// and exits, -restore_checkpoint starts the ROI from such a file. Variants that
+// share traces, cache hierarchy and warmup length can then warm up once (see
+// scripts/sweep.py --checkpoints). Saved: each CPU's trace position and cycle,
+// cache/TLB/BTB/MMU-cache blocks (with their LRU state), the branch predictor,
+// page tables and the page allocator, DRAM open rows and the random number
+// generators. Not saved: the pipeline, queues and MSHRs, which a restored run
+// refills within a few thousand cycles, and prefetcher state, which starts
+// cold at the ROI.
+#define CHECKPOINT_MAGIC 0x43484b50434d5343ULL
+#define CHECKPOINT_VERSION 1
+
+char *save_checkpoint_file = NULL, *restore_checkpoint_file = NULL;
+char rand_state[128]; // rand() state, kept here so checkpoints can carry it
+
+void checkpoint_io(FILE *f, void *data, size_t size, bool save)
+{
+    size_t n = save ? fwrite(data, 1, size, f) : fread(data, 1, size, f);
+    if (n != size) {
+        cerr << endl << "*** Checkpoint " << (save ? "write" : "read") << " failed ***" << endl;
+        assert(0);
+    }
+}
+
+template <typename T> void checkpoint_value(FILE *f, T &value, bool save)
+{
+    checkpoint_io(f, &value, sizeof(T), save);
+}
+
+void checkpoint_map(FILE *f, map <uint64_t, uint64_t> &table, bool save)
+{
+    uint64_t size = table.size(), key, value;
+    checkpoint_value(f, size, save);
+    if (save) {
+        for (auto &entry : table) {
+            key = entry.first, value = entry.second;
+            checkpoint_value(f, key, save);
+            checkpoint_value(f, value, save);
+        }
+        return;
+    }
+    table.clear();
+    for (uint64_t i=0; i<size; i++) {
+        checkpoint_value(f, key, save);
+        checkpoint_value(f, value, save);
+        table[key] = value;
+    }
+}
+
+void checkpoint_cache(FILE *f, CACHE *cache, bool save)
+{
+    uint32_t geometry[2] = {cache->NUM_SET, cache->NUM_WAY};
+    checkpoint_io(f, geometry, sizeof(geometry), save);
+    if ((geometry[0] != cache->NUM_SET) || (geometry[1] != cache->NUM_WAY)) {
+        cerr << endl << "*** Checkpoint " << cache->NAME << " has " << geometry[0] << " sets x " << geometry[1]
+             << " ways, this build " << cache->NUM_SET << " x " << cache->NUM_WAY << " ***" << endl;
+        assert(0);
+    }
+    for (uint32_t set=0; set<cache->NUM_SET; set++)
+        checkpoint_io(f, cache->block[set], cache->NUM_WAY * sizeof(BLOCK), save);
+}
+
+void checkpoint_page_table(FILE *f, PAGE_TABLE_PAGE *&page, bool save)
+{
+    uint8_t present = (page != NULL);
+    checkpoint_value(f, present, save);
+    if (!present)
+        return;
+    if (!save)
+        page = new PAGE_TABLE_PAGE();
+    checkpoint_io(f, page->next_level_base_addr, sizeof(page->next_level_base_addr), save);
+    for (int i=0; i<NUM_ENTRIES_PER_PAGE; i++)
+        checkpoint_page_table(f, page->entry[i], save);
+}
+
+void checkpoint_rng(FILE *f, bool save)
+{
+    // setstate() on the current buffer records the generator's position in it
+    setstate(rand_state);
+    checkpoint_io(f, rand_state, sizeof(rand_state), save);
+    if (!save)
+        setstate(rand_state);
+
+    stringstream engine;
+    string text;
+    uint64_t length;
+    if (save) {
+        engine << champsim_rand.engine;
+        text = engine.str();
+        length = text.size();
+    }
+    checkpoint_value(f, length, save);
+    text.resize(length);
+    checkpoint_io(f, &text[0], length, save);
+    if (!save) {
+        engine.str(text);
+        engine >> champsim_rand.engine;
+    }
+}
+
+void checkpoint(FILE *f, bool save)
+{
+    uint64_t header[6] = {CHECKPOINT_MAGIC, CHECKPOINT_VERSION, NUM_CPUS, sizeof(BLOCK), champsim_seed, warmup_instructions};
+    uint64_t expected[5] = {header[0], header[1], header[2], header[3], header[4]};
+    checkpoint_io(f, header, sizeof(header), save);
+    if (memcmp(header, expected, sizeof(expected))) {
+        cerr << endl << "*** Checkpoint does not match this binary or these traces"
+             << " (magic/version/CPUs/block size/trace seed) ***" << endl;
+        assert(0);
+    }
+    warmup_instructions = header[5];
+
+    for (uint32_t i=0; i<NUM_CPUS; i++) {
+        O3_CPU *cpu = &ooo_cpu[i];
+        checkpoint_value(f, cpu->num_retired, save);
+        checkpoint_value(f, current_core_cycle[i], save);
+        cpu->checkpoint_branch_predictor(f, save);
+
+        CACHE *caches[] = {&cpu->ITLB, &cpu->DTLB, &cpu->STLB, &cpu->L1I, &cpu->L1D, &cpu->L2C, &cpu->BTB,
+                           &cpu->PTW.PSCL5, &cpu->PTW.PSCL4, &cpu->PTW.PSCL3, &cpu->PTW.PSCL2};
+        for (CACHE *cache : caches)
+            checkpoint_cache(f, cache, save);
+#ifdef PUSH_DTLB_PB
+        checkpoint_cache(f, &cpu->DTLB_PB, save);
+#endif
+
+        checkpoint_page_table(f, cpu->PTW.L5, save);
+        checkpoint_value(f, cpu->PTW.CR3_addr, save);
+        checkpoint_value(f, cpu->PTW.CR3_set, save);
+        checkpoint_value(f, cpu->PTW.next_translation_virtual_address, save);
+        checkpoint_map(f, cpu->PTW.page_table, save);
+        checkpoint_map(f, unique_cl[i], save);
+        checkpoint_value(f, num_cl[i], save);
+        checkpoint_value(f, num_page[i], save);
+        checkpoint_value(f, minor_fault[i], save);
+        checkpoint_value(f, major_fault[i], save);
+    }
+    checkpoint_cache(f, &uncore.LLC, save);
+
+    checkpoint_map(f, page_table, save);
+    checkpoint_map(f, inverse_table, save);
+    checkpoint_map(f, recent_page, save);
+    checkpoint_value(f, previous_ppage, save);
+    checkpoint_value(f, num_adjacent_page, save);
+    checkpoint_value(f, allocated_pages, save);
+
+    // page_queue is a FIFO: save it front to back, restore by pushing in that order
+    uint64_t size = page_queue.size(), vpage;
+    checkpoint_value(f, size, save);
+    for (uint64_t i=0; i<size; i++) {
+        if (save) {
+            vpage = page_queue.front();
+            page_queue.pop();
+        }
+        checkpoint_value(f, vpage, save);
+        page_queue.push(vpage);
+    }
+
+    for (uint32_t i=0; i<DRAM_CHANNELS; i++)
+        for (uint32_t j=0; j<DRAM_RANKS; j++)
+            for (uint32_t k=0; k<DRAM_BANKS; k++)
+                checkpoint_value(f, uncore.DRAM.bank_request[i][j][k].open_row, save);
+
+    checkpoint_rng(f, save);
+}
+
+void save_checkpoint(const char *path)
+{
+    string tmp = string(path) + ".tmp";
+    FILE *f = fopen(tmp.c_str(), "wb");
+    if (f == NULL) {
+        cerr << endl << "*** Cannot write checkpoint: " << path << " ***" << endl;
+        assert(0);
+    }
+    checkpoint(f, true);
+    fclose(f);
+    rename(tmp.c_str(), path);
+    for (uint32_t i=0; i<NUM_CPUS; i++)
+        cout << "Checkpoint CPU " << i << " instructions: " << ooo_cpu[i].num_retired << " cycles: " << current_core_cycle[i] << endl;
+    cout << "Checkpoint saved to " << path << endl;
+}
+
+// Position CPU cpu's trace after `records` instructions, the way read_from_trace
+// would have left it: next_instr holds the last record consumed.
+void seek_trace(uint32_t cpu, uint64_t records)
+{
+    O3_CPU *core = &ooo_cpu[cpu];
+    uint64_t skip = records - 1;
+    char *last_dot = strrchr(core->trace_string, '.');
+    struct stat st;
+    if (last_dot && last_dot[1] == 'r' && stat(core->trace_string, &st) == 0 && st.st_size >= (off_t)sizeof(input_instr)) {
+        // raw trace: start reading at the record's offset (the trace wraps around like in read_from_trace)
+        char command[1100];
+        skip %= st.st_size / sizeof(input_instr);
+        sprintf(command, "tail -c +%llu %s", (unsigned long long)(skip * sizeof(input_instr) + 1), core->trace_string);
+        pclose(core->trace_file);
+        core->trace_file = popen(command, "r");
+        skip = 0;
+    }
+    uint64_t read = 0, reopened_at = UINT64_MAX;
+    while (read <= skip) {
+        if (fread(&core->next_instr, sizeof(input_instr), 1, core->trace_file)) {
+            read++;
+            continue;
+        }
+        // end of trace: wrap around like read_from_trace, unless it is empty
+        pclose(core->trace_file);
+        core->trace_file = (reopened_at == read) ? NULL : popen(core->gunzip_command, "r");
+        if (core->trace_file == NULL) {
+            cerr << endl << "*** CANNOT POSITION TRACE FILE: " << core->trace_string << " ***" << endl;
+            assert(0);
+        }
+        reopened_at = read;
+    }
+    core->current_instr = core->next_instr;
+    core->instr_unique_id = records;
+}
+
+void restore_checkpoint(const char *path)
+{
+    if (knob_cloudsuite || knob_context_switch) {
+        cerr << endl << "*** Checkpoints do not support cloudsuite traces or context switches ***" << endl;
+        assert(0);
+    }
+    FILE *f = fopen(path, "rb");
+    if (f == NULL) {
+        cerr << endl << "*** Checkpoint file not found: " << path << " ***" << endl;
+        assert(0);
+    }
+    checkpoint(f, false);
+    fclose(f);
+    cout << "Restored checkpoint " << path << " (warmup instructions: " << warmup_instructions << ")" << endl;
+
+    for (uint32_t i=0; i<NUM_CPUS; i++) {
+        O3_CPU *cpu = &ooo_cpu[i];
+        seek_trace(i, cpu->num_retired);
+        cpu->warmup_instructions = warmup_instructions;
+        cpu->last_sim_instr = cpu->num_retired;
+        cpu->last_sim_cycle = current_core_cycle[i];
+        cpu->next_print_instruction = (cpu->num_retired / STAT_PRINTING_PERIOD + 1) * STAT_PRINTING_PERIOD;
+        warmup_complete[i] = 1;
+    }
+    all_warmup_complete = NUM_CPUS + 1;
+    finish_warmup();
+}
+
 void print_deadlock(uint32_t i)
 {
     cout << "DEADLOCK! CPU " << i << " instr_id: " << ooo_cpu[i].ROB.entry[ooo_cpu[i].ROB.head].instr_id;
@@ -997,6 +1244,8 @@ int main(int argc, char** argv)
             {"low_bandwidth",  no_argument, 0, 'b'},
             {"traces",  no_argument, 0, 't'},
       	    {"context_switch", required_argument, 0, 's'},
+            {"save_checkpoint", required_argument, 0, 'k'},
+            {"restore_checkpoint", required_argument, 0, 'r'},
             {0,0,0,0}	    
         };
 
@@ -1034,6 +1283,12 @@ int main(int argc, char** argv)
 			case 's':
 				knob_context_switch = 1;
 				break;
+            case 'k':
+                save_checkpoint_file = optarg;
+                break;
+            case 'r':
+                restore_checkpoint_file = optarg;
+                break;
 			case 'v': //CVP TRACE
 				reg_instruction_pointer = 103;
 				reg_stack_pointer = 102;
@@ -1108,8 +1363,10 @@ int main(int argc, char** argv)
                 sprintf(ooo_cpu[count_traces].gunzip_command, "gunzip -c %s", argv[i]);
             else if (full_name[last_dot - full_name + 1] == 'x') // xz
                 sprintf(ooo_cpu[count_traces].gunzip_command, "xz -dc %s", argv[i]);
+            else if (full_name[last_dot - full_name + 1] == 'r') // raw, already decompressed (scripts/trace_cache.py)
+                sprintf(ooo_cpu[count_traces].gunzip_command, "cat %s", argv[i]);
             else {
-                cout << "ChampSim does not support traces other than gz or xz compression!" << endl; 
+                cout << "ChampSim does not support traces other than gz, xz or raw!" << endl; 
                 assert(0);
             }
 
@@ -1195,7 +1452,7 @@ int main(int argc, char** argv)
     }
     // end trace file setup
     // TODO: can we initialize these variables from the class constructor?
-    srand(seed_number);
+    initstate(seed_number, rand_state, sizeof(rand_state)); // srand(seed_number), with the state in rand_state
     champsim_seed = seed_number;
     for (int i=0; i<NUM_CPUS; i++) {
 
@@ -1375,6 +1632,8 @@ int main(int argc, char** argv)
 
     // simulation entry point
     start_time = time(NULL);
+    if (restore_checkpoint_file)
+        restore_checkpoint(restore_checkpoint_file);
     uint8_t run_simulation = 1;
     int cs_index = 0;
     while (run_simulation) {
@@ -1650,6 +1909,10 @@ int main(int argc, char** argv)
             if (all_warmup_complete == NUM_CPUS) { // this part is called only once when all cores are warmed up
                 all_warmup_complete++;
                 finish_warmup();
+                if (save_checkpoint_file) {
+                    save_checkpoint(save_checkpoint_file);
+                    return 0;
+                }
             }
 
             /*
@@ -0,0 +1,90 @@
+import os, re, gzip, math
+
+import champsim_stats
+from champsim_stats import parse_file, parse_file_cpus, RECORD_FIELDS
+from conftest import OUTPUT
+
+def log(trace_folder, fname):
+    return os.path.join(OUTPUT, trace_folder, fname)
+
+def same(a, b):
+    return a.keys() == b.keys() and all(
+        a[k] == b[k] or (isinstance(a[k], float) and math.isnan(a[k]) and math.isnan(b[k])) for k in a)
+
+def test_legacy_fields_offset_block():
+    rec = parse_file(log('1st_trace1', 'table32.txt'))
+    assert [rec[k] for k in RECORD_FIELDS] == [0.597019, 66.0501, 40.3299, 40.1091, 457608, 457601]
+    assert rec['offset_table_size'] == 32
+
+def test_legacy_fields_exclusive_block_use_useful_total():
+    rec = parse_file(log('3rd_trace1', 'table32.txt'))
+    assert rec['prefetch_issued'] == 410992
+    assert rec['prefetch_useful'] == 441284
+    assert rec['offset_useful_timely'] == 258711
+    assert rec['offset_topk'] == 5
+
+def test_baseline_has_no_prefetcher_block():
+    rec = parse_file(log('1st_trace1', 'baseline.txt'))
+    assert rec['ipc'] == 0.529026
+    assert rec['prefetch_issued'] is None and rec['prefetch_useful'] is None
+
+def test_cache_access_and_roi_lines():
+    rec = parse_file(log('1st_trace1', 'table32.txt'))
+    assert rec['trace'] == '../traces/trace1.champsimtrace.xz'
+    assert (rec['instructions'], rec['cycles']) == (25000004, 41874740)
+    assert (rec['l1d_load_access'], rec['l1d_load_miss']) == (1566979, 250207)
+    assert math.isnan(rec['itlb_pf_accuracy'])
+    assert rec['branch_mpki'] == 0.34208
+
+def test_dram_rows_are_summed_over_channels(tmp_path):
+    with open(log('1st_trace1', 'table32.txt')) as f:
+        text = f.read()
+    hits = [int(m.group(1)) for m in re.finditer(r'^ RQ ROW_BUFFER_HIT:\s*(\d+)', text, re.M)]
+    assert parse_file(log('1st_trace1', 'table32.txt'))['dram_rq_row_buffer_hit'] == sum(hits)
+    # a second channel printing the same rows doubles the totals
+    channel = text[text.index(' CHANNEL 0'):text.index(' AVG_CONGESTED_CYCLE')]
+    path = tmp_path / 'two_channels.txt'
+    path.write_text(text.replace(channel, channel + channel.replace('CHANNEL 0', 'CHANNEL 1'), 1))
+    assert parse_file(str(path))['dram_rq_row_buffer_hit'] == 2 * sum(hits)
+
+def test_every_sample_log_parses():
+    for trace_folder in sorted(os.listdir(OUTPUT)):
+        for fname in sorted(os.listdir(os.path.join(OUTPUT, trace_folder))):
+            rec = parse_file(log(trace_folder, fname))
+            assert rec['ipc'] > 0 and rec['l2_mpki'] is not None, (trace_folder, fname)
+
+def test_compressed_and_mmapped_logs_give_the_same_record(tmp_path, monkeypatch):
+    path = log('3rd_trace2', 'table64.txt')
+    ref = parse_file(path)
+    gz = str(tmp_path / 'table64.txt.gz')
+    with open(path, 'rb') as src, gzip.open(gz, 'wb') as dst:
+        dst.write(src.read())
+    got = parse_file(gz)
+    assert same(dict(got, file=ref['file']), ref)
+    monkeypatch.setattr(champsim_stats, 'MMAP_MIN_BYTES', 0)
+    assert same(parse_file(path), ref)
+
+def test_fields_stops_with_the_same_values():
+    path = log('1st_trace2', 'table128.txt')
+    full, legacy = parse_file(path), parse_file(path, fields=RECORD_FIELDS)
+    assert [legacy[k] for k in RECORD_FIELDS] == [full[k] for k in RECORD_FIELDS]
+
+def test_multicore_log_is_split_per_cpu_and_skips_total_section(tmp_path):
+    lines = ['CPU 0 runs a.champsimtrace.xz\n', 'CPU 1 runs b.champsimtrace.xz\n',
+             'ChampSim completed all CPUs\n',
+             'Total Simulation Statistics (not including warmup)\n',
+             'CPU 0 cumulative IPC: 9.9 instructions: 1 cycles: 1\n',
+             'L1D TOTAL     ACCESS:       99  HIT:       99  MISS:        0  HIT %:  100  MISS %:  0   MPKI: 9\n',
+             '=== L2 Offset Prefetcher Stats ===\n', 'Prefetches issued : 999\n', '=====\n',
+             'Region of Interest Statistics\n',
+             'CPU 0 cumulative IPC: 0.5 instructions: 100 cycles: 200\n',
+             'L1D TOTAL     ACCESS:       10  HIT:        8  MISS:        2  HIT %:   80  MISS %: 20   MPKI: 20\n',
+             'CPU 1 cumulative IPC: 0.25 instructions: 100 cycles: 400\n',
+             'L1D TOTAL     ACCESS:       20  HIT:       10  MISS:       10  HIT %:   50  MISS %: 50   MPKI: 100\n',
+             '=== L2 Offset Prefetcher Stats ===\n', 'Prefetches issued : 7\n', '=====\n',
+             '=== L2 Offset Prefetcher Stats ===\n', 'Prefetches issued : 8\n', '=====\n']
+    path = tmp_path / 'mix.txt'
+    path.write_text(''.join(lines))
+    cpus = parse_file_cpus(str(path))
+    assert [(c['cpu'], c['trace'], c['ipc'], c['l1d_total_mpki'], c['offset_issued']) for c in cpus] == [
+        (0, 'a.champsimtrace.xz', 0.5, 20, 7), (1, 'b.champsimtrace.xz', 0.25, 100, 8)]
@@ -0,0 +1,42 @@
+import os
+import pandas as pd
+
+from manifest import Manifest, load_manifest, variant_name
+from parse_and_plot_all_questions import collect_logs, parse_all, results_frame
+from conftest import ROOT, OUTPUT
+
+def test_variant_names():
+    assert variant_name({'hierarchy': 'non_inclusive_cache', 'l2c_prefetcher': 'no'}) == 'baseline_noninc'
+    assert variant_name({'hierarchy': 'exclusive_cache', 'l2c_prefetcher': 'no'}) == 'baseline_exclusive'
+    assert variant_name({'hierarchy': 'exclusive_cache', 'l2c_prefetcher': 'offset_prefetcher',
+                         'table_size': 64}) == 'exclusive_table64'
+    assert variant_name({'l2c_prefetcher': 'offset_prefetcher', 'table_size': 32,
+                         'pf_params': {'TOPK': 4}, 'replacement': 'srrip'}) == 'table32_topk4_srrip'
+
+def test_join_is_by_exact_key(capsys):
+    m = Manifest([{'trace_folder': 't1', 'log': 'a.txt', 'l2c_prefetcher': 'offset_prefetcher', 'table_size': 64},
+                  {'trace_folder': 't1', 'log': 'b.txt'},
+                  {'trace_folder': 't2', 'log': 'a.txt', 'variant': 'custom'}])
+    stats = pd.DataFrame({'trace_folder': ['t1', 't1', 't2', 't3'], 'file': ['b.txt', 'a.txt', 'a.txt', 'a.txt'],
+                          'ipc': [1.0, 2.0, 3.0, 4.0], 'variant': ['guess'] * 4})
+    out = m.join(stats).set_index(['trace_folder', 'file'])
+    assert out.loc[('t1', 'a.txt'), 'variant'] == 'table64'
+    assert out.loc[('t1', 'a.txt'), 'ipc'] == 2.0
+    assert out.loc[('t1', 'b.txt'), 'variant'] == 'baseline_noninc'
+    assert out.loc[('t2', 'a.txt'), 'variant'] == 'custom'
+    assert out.loc[('t3', 'a.txt'), 'variant'] == 'unknown'
+    assert str(out['table_size'].dtype) == 'Int64'
+    assert '1 logs are not in the manifest' in capsys.readouterr().out
+
+def test_sample_logs_join_the_checked_in_manifest():
+    manifest = load_manifest(os.path.join(ROOT, 'experiments.json'))
+    df = results_frame(parse_all(collect_logs(OUTPUT)), manifest)
+    assert len(df) == 44 and (df['variant'] != 'unknown').all()
+    row = df.set_index(['trace_folder', 'file']).loc[('1st_trace1', 'table32.txt')]
+    assert (row['variant'], row['table_size'], row['ipc']) == ('table32', 32, 0.597019)
+    assert df.set_index(['trace_folder', 'file']).loc[('3rd_trace1', 'table64.txt'), 'variant'] == 'exclusive_table64'
+
+def test_checked_in_variants_match_their_configuration():
+    manifest = load_manifest(os.path.join(ROOT, 'experiments.json'))
+    wrong = [(r['trace_folder'], r['log'], r['variant']) for r in manifest.runs if r['variant'] != variant_name(r)]
+    assert wrong == []
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from multicore import mp_metrics, benchmark_name
+
+def test_benchmark_name():
+    assert benchmark_name('../traces/602.gcc_s-734B.champsimtrace.xz') == '602.gcc_s-734B'
+
+def test_weighted_harmonic_speedup_and_max_slowdown():
+    cols = ['trace_folder', 'file', 'cpu', 'benchmark', 'ipc', 'cores', 'variant']
+    cores = pd.DataFrame([
+        ('sa', 'x.txt', 0, 'A', 1.0, 1, 'v'),
+        ('sb', 'x.txt', 0, 'B', 2.0, 1, 'v'),
+        ('sb', 'y.txt', 0, 'B', 4.0, 1, 'w'),
+        ('mix', 'x.txt', 0, 'A', 0.5, 2, 'v'),
+        ('mix', 'x.txt', 1, 'B', 1.0, 2, 'v'),
+        ('mix2', 'x.txt', 0, 'A', 0.5, 2, 'v'),
+        ('mix2', 'x.txt', 1, 'C', 1.0, 2, 'v'),
+    ], columns=cols)
+    out, _ = mp_metrics(cores)
+    mix = out.set_index('trace_folder').loc['mix']
+    assert mix['weighted_speedup'] == pytest.approx(1.0)      # 0.5/1 + 1/2
+    assert mix['harmonic_speedup'] == pytest.approx(0.5)      # 2 / (2 + 2)
+    assert mix['max_slowdown'] == pytest.approx(2.0)
+    mix2 = out.set_index('trace_folder').loc['mix2']
+    assert mix2['missing_baselines'] == 1 and np.isnan(mix2['weighted_speedup'])
+
+    fixed, _ = mp_metrics(cores, baseline_variant='w')        # only B has a `w` single-core run
+    assert fixed.set_index('trace_folder').loc['mix', 'missing_baselines'] == 1
@@ -0,0 +1,40 @@
+import os, shutil
+
+from parse_cache import ParseCache
+from champsim_stats import parse_file
+from conftest import OUTPUT
+
+def test_cache_hits_until_the_log_or_the_parser_changes(tmp_path):
+    path = str(tmp_path / 'table32.txt')
+    shutil.copy(os.path.join(OUTPUT, '1st_trace1', 'table32.txt'), path)
+    db = str(tmp_path / 'cache.sqlite')
+    cache = ParseCache(db, 5)
+    rec, key = cache.get(path)
+    assert rec is None
+    cache.put_many([(key, parse_file(path))])
+    assert cache.get(path)[0]['ipc'] == 0.597019
+
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))   # touched
+    assert cache.get(path)[0] is None
+    cache.put_many([(cache.get(path)[1], parse_file(path))])
+    assert cache.get(path)[0] is not None
+
+    with open(path, 'a') as f:                                        # grew
+        f.write('Heartbeat\n')
+    assert cache.get(path)[0] is None
+    cache.close()
+
+    other = ParseCache(db, 6)                                         # parser version bumped
+    assert other.get(path)[0] is None
+    assert (other.hits, other.misses) == (0, 1)
+    other.close()
+
+def test_entries_of_deleted_logs_are_evicted(tmp_path):
+    path = str(tmp_path / 'baseline.txt')
+    shutil.copy(os.path.join(OUTPUT, '1st_trace1', 'baseline.txt'), path)
+    cache = ParseCache(str(tmp_path / 'cache.sqlite'), 5)
+    cache.put_many([(cache.get(path)[1], parse_file(path))])
+    os.remove(path)
+    assert cache.evict_missing() == 1
+    cache.close()
@@ -0,0 +1,33 @@
+import numpy as np
+
+from prefetch_model import residency, train, load_stream, DUMP_DTYPE, LINES_PER_PAGE
+
+def test_direct_mapped_residency():
+    page = np.array([1, 2, 1, 1, 5, 1])            # 1 and 5 share slot 1 of a 4-entry table
+    reset, conflict = residency(page, 4)
+    assert reset.tolist() == [True, True, False, False, True, True]
+    assert conflict.tolist() == [False, False, False, False, True, True]
+
+def test_dump_records_are_split_by_cpu(tmp_path):
+    recs = np.zeros(4, DUMP_DTYPE)
+    recs['addr'] = [64, 128, 192, 256]
+    recs['type'] = [0, 0, 2, 0]
+    recs['hit'] = [1, 0, 0, 0]
+    recs['cpu'] = [0, 1, 0, 0]
+    path = tmp_path / 'l2c.dump'
+    recs.tofile(path)
+    line, hit = load_stream(str(path))
+    assert line.tolist() == [1, 4] and hit.tolist() == [True, False]
+    assert load_stream(str(path), cpu=1)[0].tolist() == [2]
+
+def test_train_learns_a_repeated_delta_and_restarts_after_a_reset():
+    page = np.zeros(5, np.int64)
+    offset = np.array([0, 2, 4, 6, 8])
+    keep = np.array([True, False, False, False, False])
+    evicted = np.array([True, False, False, True, False])
+    cfg, access, target, rank = train(page, offset, [keep, evicted], topk=5, freq_min=2)
+    got = sorted(zip(cfg.tolist(), access.tolist(), target.tolist(), rank.tolist()))
+    # delta +2 is seen at accesses 1 and 2, so it is used from access 2 on;
+    # the reset at access 3 empties the entry, which has to be trained again
+    assert got == [(0, 2, 6, 0), (0, 3, 8, 0), (0, 4, 10, 0), (1, 2, 6, 0)]
+    assert target.max() < LINES_PER_PAGE
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from prune import compare, dominated, roi_series
+
+def series(instructions, cycles, cpu=0):
+    return {'cpu': np.full(len(instructions), cpu), 'instructions': np.array(instructions),
+            'cycles': np.array(cycles)}
+
+def test_compare_at_the_same_instructions():
+    base = series([10, 20, 30], [20, 40, 60])
+    cand = series([10, 20, 30], [25, 50, 75])
+    c = compare(base, cand)[0]
+    assert (c['intervals'], c['instructions']) == (3, 30)
+    assert c['speedup'] == pytest.approx(0.8)
+    assert c['upper'] == pytest.approx(0.8)
+    assert dominated({0: c}, [0], margin=0.05, min_heartbeats=3)
+    assert not dominated({0: c}, [0], margin=0.05, min_heartbeats=4)
+
+def test_compare_interpolates_baseline_cycles_and_stops_where_the_baseline_is():
+    base = series([10, 20, 30], [20, 40, 60])
+    cand = series([15, 30, 45], [30, 60, 90])
+    c = compare(base, cand)[0]
+    assert (c['intervals'], c['instructions']) == (2, 30)
+    assert c['speedup'] == pytest.approx(1.0)
+
+def test_compare_needs_a_heartbeat_within_the_baseline():
+    assert compare(series([10], [20]), series([20], [30])) == {}
+
+def test_warmup_heartbeats_are_left_out_and_roi_is_rebased(tmp_path):
+    def log(name, roi_cycles):
+        # warmup at zero latency (IPC ~3.9) is the same for both runs; the ROI differs
+        lines = ['Heartbeat CPU 0 instructions: 10000000 cycles: 2548093 heartbeat IPC: 3.9245 '
+                 'cumulative IPC: 3.9245 (Simulation time: 0 hr 0 min 11 sec)\n',
+                 'Warmup complete CPU 0 instructions: 20000000 cycles: 5000000 (Simulation time: 0 hr 0 min 21 sec)\n']
+        for k, c in enumerate(roi_cycles, 1):
+            lines.append(f'Heartbeat CPU 0 instructions: {20000000 + k * 10000000} cycles: {5000000 + c} '
+                         f'heartbeat IPC: 0.5 cumulative IPC: 0.5 (Simulation time: 0 hr 1 min {k} sec)\n')
+        path = tmp_path / name
+        path.write_text(''.join(lines))
+        return str(path)
+    base = roi_series(log('baseline.txt', [20000000, 40000000, 60000000]))
+    cand = roi_series(log('table32.txt', [25000000, 50000000, 75000000]))
+    assert base['instructions'].tolist() == [10000000, 20000000, 30000000]
+    assert cand['cycles'].tolist() == [25000000, 50000000, 75000000]
+    c = compare(base, cand)[0]
+    # with the warmup heartbeats the cumulative speedup would be 65/80 = 0.8125
+    assert (c['intervals'], c['speedup'], c['upper']) == (3, pytest.approx(0.8), pytest.approx(0.8))
+    assert dominated({0: c}, [0], margin=0.1)
@@ -0,0 +1,30 @@
+import json, os
+
+from render import job, render_all, summary_jobs, HASH_FILE
+
+def bars(names, y=1.0):
+    return [job(n, 'q1', 'bar', figsize=(3, 2), x=['a', 'b'], y=[y, 2.0], title=n) for n in names]
+
+def test_unchanged_plots_are_skipped(tmp_path):
+    out = str(tmp_path)
+    assert set(render_all(bars(['a.png', 'b.png']), out, verbose=False)) == {'a.png', 'b.png'}
+    assert render_all(bars(['a.png', 'b.png']), out, verbose=False) == {}
+    assert set(render_all(bars(['a.png'], y=3.0) + bars(['b.png']), out, verbose=False)) == {'a.png'}
+    os.remove(os.path.join(out, 'b.png'))
+    assert set(render_all(bars(['a.png', 'b.png'], y=3.0), out, verbose=False)) == {'b.png'}
+
+def test_callers_sharing_a_directory_keep_each_others_hashes(tmp_path):
+    out = str(tmp_path)
+    render_all(bars(['q1.png']), out, verbose=False)
+    render_all(bars(['live.png']), out, verbose=False)
+    assert render_all(bars(['q1.png']), out, verbose=False) == {}
+    os.remove(os.path.join(out, 'live.png'))
+    render_all(bars(['q1.png']), out, verbose=False)
+    with open(os.path.join(out, HASH_FILE)) as f:
+        assert sorted(json.load(f)) == ['q1.png']
+
+def test_summary_pages_hold_at_most_per_page_panels():
+    jobs = bars([f'p{i}.png' for i in range(5)]) + [job('x.png', 'q2', 'line', x=[1], y=[1])]
+    pages = summary_jobs(jobs, ncols=2, per_page=2)
+    assert [(p['name'], len(p['data']['panels'])) for p in pages] == [
+        ('q1_summary_01.png', 2), ('q1_summary_02.png', 2), ('q1_summary_03.png', 1), ('q2_summary.png', 1)]
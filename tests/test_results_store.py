@@ -0,0 +1,38 @@
+import math
+import pandas as pd
+import pytest
+
+from results_store import write_store, load, load_results, with_baseline
+
+def frame():
+    return pd.DataFrame({
+        'trace_folder': ['t1', 't1', 't1', 't2'],
+        'variant': ['baseline_noninc', 'table32', 'exclusive_table64', 'table32'],
+        'hierarchy': ['non_inclusive_cache', 'non_inclusive_cache', 'exclusive_cache', 'non_inclusive_cache'],
+        'l2c_prefetcher': ['no', 'offset_prefetcher', 'offset_prefetcher_exclusive', 'offset_prefetcher'],
+        'table_size': pd.array([pd.NA, 32, 64, 32], dtype='Int64'),
+        'trace': ['a.xz', 'a.xz', ['a.xz', 'b.xz'], 'b.xz'],
+        'ipc': [0.5, 0.6, 0.55, 0.7],
+        'prefetch_issued': pd.array([pd.NA, 1010958, 5, 7], dtype='Int64')})
+
+def test_store_round_trip_prunes_partitions_and_keeps_integers(tmp_path):
+    pytest.importorskip('pyarrow')
+    root = write_store(frame(), str(tmp_path / 'store'))
+    assert (tmp_path / 'store' / 'hierarchy=exclusive_cache' / 'l2c_prefetcher=offset_prefetcher_exclusive').is_dir()
+    df = load(root, columns=['trace_folder', 'variant', 'trace', 'prefetch_issued'], hierarchy='non_inclusive_cache')
+    assert sorted(df['variant']) == ['baseline_noninc', 'table32', 'table32']
+    assert df.loc[df['trace_folder'] == 't1', 'prefetch_issued'].dropna().tolist() == [1010958]
+    assert str(df['prefetch_issued'].dtype) == 'Int64'
+    assert load_results(root, traces='t1', variants=['exclusive_table64'])['trace'].tolist() == ['a.xz,b.xz']
+
+def test_csv_fallback_applies_the_same_filters(tmp_path):
+    path = tmp_path / 'results.csv'
+    frame().to_csv(path, index=False)
+    df = load_results(str(path), columns=['trace_folder', 'variant', 'ipc'], traces=['t1'], variants='table32')
+    assert df[['trace_folder', 'variant', 'ipc']].values.tolist() == [['t1', 'table32', 0.6]]
+
+def test_with_baseline_gives_nan_without_a_baseline():
+    out = with_baseline(frame(), 'baseline_noninc').set_index(['trace_folder', 'variant'])
+    assert out.loc[('t1', 'table32'), 'base_speedup'] == pytest.approx(1.2)
+    assert out.loc[('t1', 'baseline_noninc'), 'base_speedup'] == 1.0
+    assert math.isnan(out.loc[('t2', 'table32'), 'base_speedup'])
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from search import Search, ResultCache, BASELINE, candidate_grid, rungs, name
+
+def test_rungs_end_at_max_budget():
+    assert rungs(1000000, 25000000, 3) == [1000000, 3000000, 9000000, 25000000]
+    assert rungs(5, 5, 3) == [5]
+
+def test_candidate_grid_orders_knobs_and_rejects_unknown_ones():
+    grid = candidate_grid({'TOPK': [3, 5], 'DEFAULT_TABLE_SIZE': [64]})
+    assert grid == [{'DEFAULT_TABLE_SIZE': 64, 'TOPK': 3}, {'DEFAULT_TABLE_SIZE': 64, 'TOPK': 5}]
+    assert name(grid[0]) == 'default_table_size64_topk3'
+    with pytest.raises(ValueError):
+        candidate_grid({'TABLE': [1]})
+
+def test_result_cache_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path / 'results.sqlite'))
+    key = ('abc', '../traces/t1.xz', 1000, 5000)
+    assert cache.get(key) is None
+    cache.put(key, {'ipc': 0.5})
+    assert cache.get(key) == {'ipc': 0.5} and (cache.hits, cache.misses) == (1, 1)
+    cache.close()
+
+class FakeSearch(Search):
+    """IPC grows with TOPK and, at small budgets only, with CONF_THRESH."""
+
+    def evaluate(self, candidates, budget):
+        self.calls.append((len(candidates), budget))
+        rows = []
+        for p in candidates:
+            ipc = 1.0 if p is None else 1 + p['TOPK'] / 10 + (p['CONF_THRESH'] / 5 if budget < 9 else 0)
+            rows += [{'variant': BASELINE if p is None else name(p), 'trace_folder': t, 'ipc': ipc}
+                     for t in self.traces]
+        return pd.DataFrame(rows)
+
+def test_successive_halving_keeps_the_best_third_per_rung(tmp_path):
+    cfg = {'traces': {'t1': 'a.xz', 't2': 'b.xz'},
+           'space': {'TOPK': [1, 2, 3], 'CONF_THRESH': [1, 2, 3]}}
+    s = FakeSearch(cfg, str(tmp_path), str(tmp_path / 'build'))
+    s.calls = []
+    (best, score), = s.run('sh', n=9, min_budget=1, max_budget=9, eta=3)
+    assert s.calls == [(10, 1), (4, 3), (2, 9)]     # candidates + the baseline on each rung
+    assert best == {'TOPK': 3, 'CONF_THRESH': 3} and score == pytest.approx(1.3)
+    board = s.save()
+    assert len(board) == 13 and board.iloc[0]['candidate'] == 'topk3_conf_thresh3'
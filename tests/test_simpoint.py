@@ -0,0 +1,39 @@
+import json
+import pandas as pd
+import pytest
+
+from simpoint import benchmark_of, load_weights, aggregate, summarize
+
+def test_benchmark_of_strips_the_slice_suffix():
+    assert benchmark_of('602.gcc_s-734B') == '602.gcc_s'
+    assert benchmark_of('605.mcf_s_1554') == '605.mcf_s'
+    assert benchmark_of('trace1') == 'trace1'
+
+def test_load_weights_from_json_and_csv(tmp_path, capsys):
+    path = tmp_path / 'w.json'
+    path.write_text(json.dumps({'gcc': {'gcc-1': 0.75, 'gcc-2': 0.25}}))
+    assert load_weights(str(path)).values.tolist() == [['gcc-1', 'gcc', 0.75], ['gcc-2', 'gcc', 0.25]]
+    path = tmp_path / 'w.csv'
+    path.write_text('trace_folder,weight\n602.gcc_s-734B,0.5\n602.gcc_s-1B,x\n')
+    assert load_weights(str(path)).values.tolist() == [['602.gcc_s-734B', '602.gcc_s', 0.5]]
+    assert '1 slices have no usable weight' in capsys.readouterr().out
+
+WEIGHTS = pd.DataFrame({'trace_folder': ['s1', 's2', 's3'], 'benchmark': ['b'] * 3, 'weight': [0.5, 0.3, 0.2]})
+RESULTS = pd.DataFrame([('s1', 'base', 1.0, 10.0), ('s2', 'base', 0.5, 20.0), ('s3', 'base', 0.25, 40.0),
+                        ('s1', 'pf', 2.0, 5.0), ('s2', 'pf', 1.0, 10.0)],
+                       columns=['trace_folder', 'variant', 'ipc', 'l2_mpki'])
+
+def test_weighted_cpi_mpki_and_missing_weight():
+    out = aggregate(RESULTS, WEIGHTS, baseline='base').set_index('variant')
+    base, pf = out.loc['base'], out.loc['pf']
+    assert base['cpi'] == pytest.approx(0.5 * 1 + 0.3 * 2 + 0.2 * 4)
+    assert base['l2_mpki'] == pytest.approx(0.5 * 10 + 0.3 * 20 + 0.2 * 40)
+    assert pf['missing_weight'] == pytest.approx(0.2)
+    # speedup only over the slices both have (s1, s2): (0.5 * 1 + 0.3 * 2) / (0.5 * 0.5 + 0.3 * 1)
+    assert pf['speedup'] == pytest.approx(1.1 / 0.55)
+
+def test_summarize_leaves_out_benchmarks_missing_too_much_weight():
+    bench = aggregate(RESULTS, WEIGHTS, baseline='base')
+    strict = summarize(bench)
+    assert (strict.loc['pf', 'benchmarks'], strict.loc['pf', 'left_out']) == (0, 1)
+    assert summarize(bench, max_missing=0.2).loc['pf', 'geomean_speedup'] == pytest.approx(2.0)
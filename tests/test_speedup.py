@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from speedup import pivot, normalize, geomean, summarize
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['trace_folder', 'variant', 'ipc', 'l2_mpki'])
+
+DF = frame([('t1', 'base', 1.0, 10.0), ('t1', 'a', 2.0, 5.0), ('t1', 'b', 0.5, 20.0),
+            ('t2', 'base', 2.0, 10.0), ('t2', 'a', 1.0, 10.0), ('t2', 'b', 4.0, 5.0),
+            ('t3', 'a', 3.0, 1.0)])
+
+def test_normalize_gives_nan_without_a_baseline():
+    sp = normalize(pivot(DF), 'base')
+    assert sp.loc['t1', 'a'] == 2.0 and sp.loc['t2', 'b'] == 2.0
+    assert np.isnan(sp.loc['t3', 'a'])
+
+def test_geomean_skips_nan_and_non_positive():
+    m = pd.DataFrame({'x': [2.0, 8.0, np.nan, 0.0]})
+    assert geomean(m)['x'] == pytest.approx(4.0)
+
+def test_summarize():
+    out = summarize(DF, 'base')
+    assert out.loc['a', 'geomean_speedup'] == pytest.approx(1.0)     # 2x and 0.5x
+    assert out.loc['b', 'geomean_speedup'] == pytest.approx(1.0)
+    assert out.loc['a', 'traces'] == 2
+    assert out.loc['a', 'l2_mpki_delta'] == pytest.approx(-2.5)
+
+def test_summarize_keeps_the_baseline_when_filtering_variants():
+    out = summarize(DF, 'base', variants=['a'])
+    assert set(out.index) == {'a', 'base'}
+    assert out.loc['a', 'geomean_speedup'] == pytest.approx(1.0)
+
+def test_summarize_without_baseline_results_raises():
+    with pytest.raises(ValueError):
+        summarize(DF, 'missing')
+
+def test_pivot_rejects_duplicate_trace_variant_rows():
+    dup = pd.concat([DF, frame([('t2', 'a', 9.0, 1.0)])])
+    with pytest.raises(ValueError, match=r'2 rows .*\(t2, a\)'):
+        pivot(dup)
@@ -0,0 +1,51 @@
+import os
+
+import sweep
+from sweep import expand_runs, sim_command, build_key, build_hash, checkpoint_path, is_complete
+
+CONFIG = {'warmup_instructions': 1000, 'simulation_instructions': 2000,
+          'traces': {'t1': '../traces/t1.champsimtrace.xz'},
+          'matrix': [{'l2c_prefetcher': ['no', 'offset_prefetcher'], 'table_size': [32, 64]},
+                     {'l2c_prefetcher': 'offset_prefetcher', 'table_size': 32, 'pf_params': {'TOPK': [2, 4]}}]}
+
+def test_table_size_is_only_crossed_with_prefetchers():
+    runs = expand_runs(CONFIG)
+    assert [r['log'] for r in runs] == ['baseline_noninc.txt', 'table32.txt', 'table64.txt',
+                                        'table32_topk2.txt', 'table32_topk4.txt']
+    assert 'table_size' not in runs[0] and runs[3]['pf_params'] == {'TOPK': 2}
+    assert build_key(runs[1]) == build_key(runs[2]) != build_key(runs[3])
+
+def test_sim_command_sets_offset_table_only_for_its_own_run(monkeypatch):
+    monkeypatch.setenv('OFFSET_TABLE', '128')
+    base, table64 = expand_runs(CONFIG)[0], expand_runs(CONFIG)[2]
+    cmd, env = sim_command(dict(table64, restore_checkpoint='w.ckpt'), 'bin/champsim')
+    assert cmd == ['bin/champsim', '-warmup_instructions', '1000', '-simulation_instructions', '2000',
+                   '-restore_checkpoint', 'w.ckpt', '-traces', '../traces/t1.champsimtrace.xz']
+    assert env['OFFSET_TABLE'] == '64'
+    assert 'OFFSET_TABLE' not in sim_command(base, 'bin/champsim')[1]
+
+def fake_tree(root):
+    (root / 'cache_hierarchies').mkdir()
+    (root / 'cache_hierarchies' / 'non_inclusive_cache.cc').write_text('// cache\n')
+    (root / 'src').mkdir()
+    (root / 'src' / 'main.cc').write_text('int main() {}\n')
+    (root / 'Makefile').write_text('all:\n')
+
+def test_build_hash_is_read_once_per_key(tmp_path, monkeypatch):
+    fake_tree(tmp_path)
+    reads = []
+    inputs = sweep.build_inputs
+    monkeypatch.setattr(sweep, 'build_inputs', lambda key, root: reads.append(key) or inputs(key, root))
+    monkeypatch.setattr(sweep, '_BUILD_HASHES', {})
+    runs = expand_runs(CONFIG)
+    paths = {checkpoint_path(r, tmp_path / 'ckpt', root=str(tmp_path)) for r in runs}
+    assert len(paths) == 1          # every prefetcher variant restores the baseline's warmup
+    assert build_hash(build_key(runs[0]), str(tmp_path)) and len(reads) == 1
+
+def test_is_complete_looks_for_the_marker_in_the_tail(tmp_path):
+    log = tmp_path / 'table32.txt'
+    assert not is_complete(str(log))
+    log.write_text('Heartbeat CPU 0\n')
+    assert not is_complete(str(log))
+    log.write_text('x' * 100 + 'ChampSim completed all CPUs\n')
+    assert is_complete(str(log), tail_bytes=64)
@@ -0,0 +1,19 @@
+from synth_logs import generate
+from multicore import collect, per_cpu, mp_metrics
+from parse_and_plot_all_questions import infer_variant
+from conftest import OUTPUT
+
+def test_synthetic_mixes_have_single_core_baselines(tmp_path):
+    generate(str(tmp_path), 120, OUTPUT, cores=(1, 2, 4), heartbeats=(0, 2), seed=1)
+    cores = per_cpu(collect(str(tmp_path)))
+    cores['variant'] = cores['file'].map(infer_variant)
+    out, _ = mp_metrics(cores)
+    assert len(out) > 0
+    assert (out['missing_baselines'] == 0).all() and out['weighted_speedup'].notna().all()
+
+def test_generation_is_deterministic(tmp_path):
+    a = generate(str(tmp_path / 'a'), 20, OUTPUT, cores=(1, 2), heartbeats=(0, 3), seed=7)
+    b = generate(str(tmp_path / 'b'), 20, OUTPUT, cores=(1, 2), heartbeats=(0, 3), seed=7)
+    for pa, pb in zip(a, b):
+        with open(pa) as fa, open(pb) as fb:
+            assert fa.read() == fb.read()
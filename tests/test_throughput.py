@@ -0,0 +1,36 @@
+import os
+import pandas as pd
+import pytest
+
+from champsim_stats import parse_file
+from throughput import report, flagged
+from conftest import OUTPUT
+
+def test_phase_seconds_and_kips_come_from_the_simulation_time_stamps():
+    rec = parse_file(os.path.join(OUTPUT, '1st_trace1', 'table32.txt'))
+    assert (rec['warmup_seconds'], rec['sim_seconds'], rec['roi_seconds']) == (26, 137, 111)
+    assert rec['warmup_kips'] == pytest.approx(25000008 / 26 / 1000)
+    assert rec['roi_kips'] == pytest.approx(25000004 / 111 / 1000)
+
+def frame(rows):
+    return pd.DataFrame(rows, columns=['trace_folder', 'variant', 'warmup_kips', 'warmup_seconds',
+                                       'roi_kips', 'roi_seconds'])
+
+CUR = frame([('t1', 'base', 1000, 20, 200, 100), ('t1', 'pf', 990, 20, 150, 130),
+             ('t2', 'base', 1000, 20, 200, 100), ('t2', 'pf', 1000, 2, 160, 120)])
+
+def test_slower_than_baseline_is_flagged_per_phase():
+    out = report(CUR, baseline='base', threshold=0.05).set_index(['phase', 'variant'])
+    assert out.loc[('roi', 'pf'), 'vs_baseline'] == pytest.approx((0.75 * 0.8) ** 0.5)
+    assert out.loc[('roi', 'pf'), 'slower_than_baseline']
+    # t2's 2-second warmup is left out, so only t1 counts
+    assert out.loc[('warmup', 'pf'), 'traces'] == 1
+    assert not out.loc[('warmup', 'pf'), 'slower_than_baseline']
+    assert not out.loc[('roi', 'base'), 'slower_than_baseline']
+
+def test_regression_against_older_results():
+    old = CUR.assign(roi_kips=CUR['roi_kips'] * [1, 1, 1, 2])
+    out = report(CUR, old=old, threshold=0.1)
+    bad = flagged(out)
+    assert list(zip(bad['phase'], bad['variant'])) == [('roi', 'pf')]
+    assert bad['worst_trace_vs_previous'].iloc[0] == pytest.approx(0.5)
@@ -0,0 +1,58 @@
+import os, lzma, shutil
+import pytest
+
+from trace_cache import TraceCache, uncompressed_size, parse_size
+
+pytestmark = pytest.mark.skipif(shutil.which('xz') is None, reason='needs the xz tool')
+
+def trace(tmp_path, name, size):
+    path = tmp_path / f'{name}.champsimtrace.xz'
+    path.write_bytes(lzma.compress(name.encode() * (size // len(name))))
+    return str(path)
+
+def test_parse_size():
+    assert (parse_size('200G'), parse_size('1.5K'), parse_size(4096)) == (200 << 30, 1536, 4096)
+
+def test_fill_then_hit(tmp_path):
+    t = trace(tmp_path, 'a', 1000)
+    cache = TraceCache(str(tmp_path / 'cache'))
+    with cache.lease([t]) as (raw,):
+        assert raw.endswith('a.champsimtrace.raw') and os.path.getsize(raw) == 1000
+    with cache.lease([t]) as (again,):
+        assert again == raw
+    assert (cache.fills, cache.hits) == (1, 1)
+
+def test_lru_eviction_skips_leased_entries(tmp_path):
+    a, b, c = (trace(tmp_path, n, 1000) for n in 'abc')
+    cache = TraceCache(str(tmp_path / 'cache'), budget=2000)
+    with cache.lease([a]) as (raw_a,):
+        with cache.lease([b]):
+            pass
+        with cache.lease([c]):          # over budget: b is the oldest entry nobody holds
+            pass
+        assert os.path.exists(raw_a)
+    assert sorted(e['source'] for e in cache.entries().values()) == [a, c]
+    assert cache.evict(0) == 2000 and cache.entries() == {}
+
+def test_oversize_traces_are_recorded_and_never_decompressed(tmp_path):
+    t = trace(tmp_path, 'big', 3000)
+    assert uncompressed_size(t) == 3000
+    cache = TraceCache(str(tmp_path / 'cache'), budget=2000)
+    with cache.lease([t]) as (path,):
+        assert path == t
+    assert cache.fills == 0 and not [d for d in os.listdir(tmp_path / 'cache') if len(d) == 32]
+    (rec,) = cache.entries().values()
+    assert rec['bypass'] and rec['size'] == 3000
+    cache.evict(0)
+    other = TraceCache(str(tmp_path / 'cache'), budget=2000)
+    assert other.acquire(t) == (t, None) and other.bypassed == 1
+    assert len(other.entries()) == 1
+
+def test_oversize_trace_without_a_recorded_size_is_dropped_after_one_fill(tmp_path, monkeypatch):
+    import trace_cache
+    monkeypatch.setattr(trace_cache, 'uncompressed_size', lambda trace: None)
+    t = trace(tmp_path, 'big', 3000)
+    cache = TraceCache(str(tmp_path / 'cache'), budget=2000)
+    assert cache.acquire(t) == (t, None) and cache.acquire(t) == (t, None)
+    assert (cache.fills, cache.bypassed) == (1, 2)
+    assert not [d for d in os.listdir(tmp_path / 'cache') if len(d) == 32]
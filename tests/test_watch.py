@@ -0,0 +1,60 @@
+import os
+import pytest
+
+from watch import LogTail, Watcher, STATE_FILE
+from conftest import OUTPUT
+
+def lines(trace_folder, fname):
+    with open(os.path.join(OUTPUT, trace_folder, fname)) as f:
+        return f.readlines()
+
+def test_replaying_a_log_prefix(tmp_path):
+    text = lines('1st_trace1', 'table32.txt')
+    path = tmp_path / 'table32.txt.part'
+    path.write_text(''.join(text[:24]))
+    tail = LogTail('1st_trace1', 'table32.txt', str(path))
+    tail.poll()
+    assert tail.phase() == 'warmup' and tail.eta() is None
+    assert tail.progress()[:3] == (20000005, 50000000, 21)
+    assert tail.progress()[3] is None                       # warmup IPC is not shown
+
+    path.write_text(''.join(text[:28]) + 'Heartbeat CPU 0 instr')   # partial last line is left for later
+    tail.poll()
+    assert tail.phase() == 'roi' and tail.cpus[0]['cumulative_ipc'] == 0.578118
+    # ROI rate: 4999999 instructions in 23 s
+    assert tail.eta() == pytest.approx((50000000 - 30000007) / (4999999 / 23))
+    assert tail.roi_series()['instructions'].tolist() == [4999999]
+
+    path.write_text(''.join(text))
+    tail.poll()
+    assert tail.phase() == 'done' and tail.eta() == 0.0
+    assert tail.roi_series()['cycles'].tolist() == [8648749, 25577823, 41874726, 41874740]
+
+def copy(dst, trace_folder, fname, upto=None):
+    os.makedirs(dst / trace_folder, exist_ok=True)
+    (dst / trace_folder / fname).write_text(''.join(lines(trace_folder, fname)[:upto]))
+
+def test_speedup_compares_the_same_roi_instructions(tmp_path):
+    copy(tmp_path, '1st_trace1', 'baseline.txt')
+    copy(tmp_path, '1st_trace1', 'table32.txt', upto=24)
+    w = Watcher(str(tmp_path))
+    w.poll()
+    assert [r['speedup'] for r in w.rows()] == [1.0, None]   # the prefetcher run is still warming up
+    copy(tmp_path, '1st_trace1', 'table32.txt')
+    w.poll()
+    rows = {r['log']: r for r in w.rows()}
+    assert rows['baseline.txt']['speedup'] == pytest.approx(1.0)
+    assert rows['table32.txt']['speedup'] == pytest.approx(0.597019 / 0.529026, rel=1e-3)
+
+def test_restarted_watcher_resumes_from_saved_offsets(tmp_path):
+    copy(tmp_path, '1st_trace1', 'table32.txt', upto=28)
+    Watcher(str(tmp_path)).poll()
+    assert os.path.exists(tmp_path / STATE_FILE)
+    w = Watcher(str(tmp_path))
+    w.poll()
+    tail = w.tails[('1st_trace1', 'table32.txt')]
+    assert tail.phase() == 'roi' and tail.cpus[0]['roi_instructions'] == 25000008
+
+    copy(tmp_path, '1st_trace1', 'table32.txt', upto=5)       # a new run replaced the log
+    w.poll()
+    assert tail.phase() == 'starting' and tail.offset == os.path.getsize(tmp_path / '1st_trace1' / 'table32.txt')